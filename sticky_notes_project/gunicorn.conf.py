@@ -0,0 +1,79 @@
+"""
+Production WSGI server configuration (gunicorn) for sticky_notes_project.
+
+Gunicorn reads ./gunicorn.conf.py from the working directory, so in this
+folder it is enough to run:
+    gunicorn
+
+Settings:
+→ Worker processes default to 2 × CPU cores + 1. Each worker runs
+  threads (the gthread worker), so slow clients and keep-alive
+  connections do not block a whole process.
+→ The app is preloaded in the master before forking. Workers start
+  faster and share the imported code copy-on-write. Database connections
+  opened during preloading are closed in every new worker (`post_fork`),
+  so no SQLite handle is shared across processes.
+→ Workers are recycled after `WSGI_MAX_REQUESTS` requests (with jitter,
+  so they do not all restart at once) to bound memory growth.
+→ Graceful reload: `kill -HUP <master>` replaces the workers one by one
+  and lets in-flight requests finish within `WSGI_GRACEFUL_TIMEOUT`.
+  With a preloaded app HUP reuses the code already loaded; to deploy new
+  code, send USR2 (starts a new master with the new code) and then QUIT
+  to the old master.
+
+All options come from the environment, like asgi_server.py:
+→ WSGI_HOST / WSGI_PORT: where to listen (default 0.0.0.0:8000).
+→ WSGI_WORKERS: worker processes (default: 2 × cores + 1).
+→ WSGI_THREADS: threads per worker.
+→ WSGI_KEEPALIVE: seconds an idle keep-alive connection stays open.
+→ WSGI_TIMEOUT: seconds before a silent worker is killed and replaced.
+→ WSGI_GRACEFUL_TIMEOUT: seconds workers get to finish on reload/stop.
+→ WSGI_MAX_REQUESTS: requests per worker before it is recycled.
+→ WSGI_BACKLOG: pending connections the socket queues.
+
+The Server-Sent Events stream (`events/`) keeps one thread busy per open
+board. For many live boards, run the ASGI server
+(`python -m sticky_notes_project.asgi_server`) instead.
+"""
+
+import multiprocessing
+import os
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+wsgi_app = "sticky_notes_project.wsgi:application"
+
+bind = (
+    f"{os.environ.get('WSGI_HOST', '0.0.0.0')}:"
+    f"{os.environ.get('WSGI_PORT', '8000')}"
+)
+workers = _env_int("WSGI_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+worker_class = "gthread"
+threads = _env_int("WSGI_THREADS", 4)
+preload_app = True
+
+keepalive = _env_int("WSGI_KEEPALIVE", 5)
+timeout = _env_int("WSGI_TIMEOUT", 30)
+graceful_timeout = _env_int("WSGI_GRACEFUL_TIMEOUT", 30)
+max_requests = _env_int("WSGI_MAX_REQUESTS", 1000)
+max_requests_jitter = max_requests // 10
+backlog = _env_int("WSGI_BACKLOG", 2048)
+
+# Worker heartbeats go to a tmpfs when there is one (e.g. in Docker), so a
+# slow disk cannot make healthy workers look dead.
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+accesslog = os.environ.get("WSGI_ACCESS_LOG", "-") or None
+errorlog = "-"
+forwarded_allow_ips = os.environ.get("WSGI_FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+
+def post_fork(server, worker):
+    """Drops database connections inherited from the preloaded master."""
+    from django.db import connections
+
+    connections.close_all()
@@ -4,7 +4,11 @@ via the Django admin interface.
 """
 
 from django.contrib import admin
+from django.template.defaultfilters import pluralize
+from .bulk import ACTION_PIN, ACTION_TRASH, ACTION_UNPIN, apply_bulk_action
 from .models import Note
+from .search import filter_matching, fts_available
+from .trash import restore_notes
 
 # Register the Note model with the admin site, through admin interface.
 
@@ -22,6 +26,99 @@ class NoteAdmin(admin.ModelAdmin):
         search_fields (tuple): Specifies the fields to include in the search
             functionality within the admin interface. Here, "title" and
             "content" are searchable.
+        list_filter (tuple): Filters the changelist by whether notes are
+            in the trash ("deleted_at" empty or not).
+
+    Searches are answered by the full-text index when it is available,
+    instead of `icontains` LIKE scans over both columns.
+
+    Staff users only see and change their own notes, like on the board;
+    superusers see every user's notes. Notes added here belong to the
+    user adding them.
+
+    The admin shows trashed notes too, and deleting a note here deletes
+    it for good.
+
+    The pin, unpin, trash and restore actions change all the selected
+    notes with queryset updates (see bulk.py), not a save per note.
     """
-    list_display = ("title", "created_at")
+    actions = (
+        "pin_selected",
+        "unpin_selected",
+        "trash_selected",
+        "restore_selected",
+    )
+    list_display = ("title", "owner", "created_at", "deleted_at")
+    list_filter = (("deleted_at", admin.EmptyFieldListFilter),)
+    list_select_related = ("owner",)
     search_fields = ("title", "content")
+
+    def get_queryset(self, request):
+        """
+        Restricts the notes to the staff user's own unless superuser.
+        """
+        queryset = super().get_queryset(request)
+        if request.user.is_superuser:
+            return queryset
+        return queryset.filter(owner=request.user)
+
+    def save_model(self, request, obj, form, change):
+        """
+        Makes the user adding a note its owner.
+        """
+        if not change:
+            obj.owner = request.user
+        super().save_model(request, obj, form, change)
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Filters the changelist with the full-text index.
+
+        Falls back to Django's default `search_fields` lookup on databases
+        without FTS5 support.
+        """
+        if not search_term or not fts_available(queryset.db):
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        # The changelist paginates and orders the matches itself.
+        return filter_matching(queryset, search_term), False
+
+    def _report(self, request, count, done):
+        self.message_user(request, f"{count} note{pluralize(count)} {done}.")
+
+    @admin.action(description="Pin selected notes")
+    def pin_selected(self, request, queryset):
+        """
+        Pins the selected live notes.
+        """
+        self._report(
+            request, apply_bulk_action(queryset, ACTION_PIN), "pinned"
+        )
+
+    @admin.action(description="Unpin selected notes")
+    def unpin_selected(self, request, queryset):
+        """
+        Unpins the selected live notes.
+        """
+        self._report(
+            request, apply_bulk_action(queryset, ACTION_UNPIN), "unpinned"
+        )
+
+    @admin.action(description="Move selected notes to the trash")
+    def trash_selected(self, request, queryset):
+        """
+        Moves the selected live notes to the trash.
+        """
+        self._report(
+            request,
+            apply_bulk_action(queryset, ACTION_TRASH),
+            "moved to the trash",
+        )
+
+    @admin.action(description="Restore selected notes from the trash")
+    def restore_selected(self, request, queryset):
+        """
+        Moves the selected trashed notes back to the board.
+        """
+        self._report(request, restore_notes(queryset), "restored")
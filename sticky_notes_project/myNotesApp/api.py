@@ -0,0 +1,396 @@
+"""
+This file contains a small JSON API for notes under `/api/notes/`.
+
+→ `/api/notes/` lists notes (keyset paginated) and creates a note.
+→ `/api/notes/<pk>/` retrieves, updates (PUT/PATCH) and deletes a note.
+→ `/api/notes/batch/` creates (POST), updates (PATCH) or deletes (DELETE)
+  up to `NOTES_API_MAX_BATCH` notes in one request and one transaction,
+  using `bulk_create` / `bulk_update`.
+→ `/api/notes/sync/` returns the notes changed and deleted since a
+  client's cursor (see sync.py).
+→ Deleting moves notes to the trash, like on the board (see trash.py).
+
+Every note is validated with `NoteForm`, so the API accepts exactly what
+the HTML forms accept. Batches are all-or-nothing: if any item is invalid,
+nothing is written and the per-item errors are returned with status 400.
+
+→ Like the HTML forms, unsafe methods are CSRF protected: clients send the
+  token from the `csrftoken` cookie in an `X-CSRFToken` header.
+→ Every endpoint works on the signed-in user's notes only. Without a
+  session the API answers 401 instead of redirecting to the login page;
+  another user's note is reported as not found.
+"""
+
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.views.decorators.http import require_http_methods
+
+from .cache import bump_notes_version
+from .events import publish
+from .forms import NoteForm
+from .models import Note
+from .pagination import paginate_notes
+from .revisions import record_revisions
+from .sync import CursorExpired, changes_since, get_sync_limit
+from .trash import trash_notes
+
+DEFAULT_MAX_BATCH = 100
+
+
+class BadRequest(ValueError):
+    """Raised when a request body cannot be used."""
+
+
+def note_to_dict(note):
+    """
+    Serialises a note for the API.
+
+    Args:
+        note (Note): The note to serialise.
+
+    Returns:
+        dict: The JSON-compatible representation of the note.
+    """
+    return {
+        "id": note.pk,
+        "title": note.title,
+        "content": note.content,
+        "pinned": note.pinned,
+        "created_at": note.created_at.isoformat(),
+        "updated_at": note.updated_at.isoformat(),
+    }
+
+
+def _read_json(request):
+    """Decodes the JSON body of a request."""
+    try:
+        return json.loads(request.body or b"null")
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise BadRequest("Request body must be valid JSON.") from exc
+
+
+def _read_batch(request):
+    """Decodes a JSON array body and enforces the batch size cap."""
+    items = _read_json(request)
+    if not isinstance(items, list):
+        raise BadRequest("Request body must be a JSON array.")
+    limit = getattr(settings, "NOTES_API_MAX_BATCH", DEFAULT_MAX_BATCH)
+    if len(items) > limit:
+        raise BadRequest(f"A batch may contain at most {limit} items.")
+    return items
+
+
+def _is_id(value):
+    """Returns True for a JSON integer; `true` and `false` are not ids."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _error(message, status=400):
+    return JsonResponse({"error": message}, status=status)
+
+
+def api_login_required(view):
+    """
+    Answers 401 with a JSON error unless a user is signed in.
+
+    Args:
+        view (callable): The API view to protect.
+
+    Returns:
+        callable: The wrapped view.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return _error("Authentication required.", status=401)
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def _validate(item, instance=None, partial=False):
+    """
+    Validates one note payload with `NoteForm`.
+
+    Args:
+        item (dict): The payload ("title", "content" and optional
+            "pinned").
+        instance (Note | None): The note being updated, if any.
+        partial (bool): If True, missing fields keep their current value.
+
+    Returns:
+        tuple: (Note | None, dict) with the unsaved note, or None and the
+        field errors.
+    """
+    if not isinstance(item, dict):
+        return None, {"__all__": ["Each item must be a JSON object."]}
+    data = {}
+    if partial and instance is not None:
+        data = {"title": instance.title, "content": instance.content}
+    data.update(
+        {key: item[key] for key in ("title", "content") if key in item}
+    )
+    form = NoteForm(data=data, instance=instance)
+    errors = {} if form.is_valid() else dict(form.errors)
+    pinned = item.get("pinned")
+    if pinned is not None and not isinstance(pinned, bool):
+        errors["pinned"] = ["Must be true or false."]
+    if errors:
+        return None, errors
+    note = form.save(commit=False)
+    if pinned is not None:
+        note.pinned = pinned
+    return note, {}
+
+
+@api_login_required
+@require_http_methods(["GET", "POST"])
+def api_note_list(request):
+    """
+    Lists notes or creates a single note.
+
+    GET returns `{"results": [...], "next": cursor, "previous": cursor}`
+    and accepts the same `cursor` and `page_size` parameters as the HTML
+    note list. POST creates a note from a JSON object.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        JsonResponse: The page of notes, the created note (201) or the
+        validation errors (400).
+    """
+    if request.method == "GET":
+        page = paginate_notes(
+            Note.objects.live().filter(owner=request.user),
+            cursor=request.GET.get("cursor"),
+            page_size=request.GET.get("page_size"),
+        )
+        return JsonResponse(
+            {
+                "results": [note_to_dict(note) for note in page.notes],
+                "next": page.next_cursor,
+                "previous": page.prev_cursor,
+            }
+        )
+
+    try:
+        note, errors = _validate(_read_json(request))
+    except BadRequest as exc:
+        return _error(str(exc))
+    if errors:
+        return JsonResponse({"errors": errors}, status=400)
+    note.owner = request.user
+    note.save()
+    return JsonResponse(note_to_dict(note), status=201)
+
+
+@api_login_required
+@require_http_methods(["GET", "PUT", "PATCH", "DELETE"])
+def api_note_detail(request, pk):
+    """
+    Retrieves, updates or deletes (moves to the trash) a single note.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        pk (int): The primary key of the note.
+
+    Returns:
+        JsonResponse: The note, the validation errors (400), or an empty
+        response (204) after deletion.
+
+    Raises:
+        Http404: If the note does not exist or belongs to another user.
+    """
+    note = get_object_or_404(
+        Note.objects.live(), pk=pk, owner=request.user
+    )
+    if request.method == "GET":
+        return JsonResponse(note_to_dict(note))
+    if request.method == "DELETE":
+        trash_notes(Note.objects.filter(pk=note.pk))
+        return HttpResponse(status=204)
+
+    try:
+        item = _read_json(request)
+    except BadRequest as exc:
+        return _error(str(exc))
+    note, errors = _validate(
+        item, instance=note, partial=request.method == "PATCH"
+    )
+    if errors:
+        return JsonResponse({"errors": errors}, status=400)
+    note.save()
+    return JsonResponse(note_to_dict(note))
+
+
+@api_login_required
+@require_http_methods(["GET"])
+def api_note_sync(request):
+    """
+    Returns the changes after the client's cursor.
+
+    Query parameters are `since` (the `cursor` of the previous response,
+    0 or missing for a full sync) and `limit`. The response is
+    `{"changes": [...], "deleted": [ids], "cursor": n, "has_more": bool}`;
+    each changed note carries its `change_seq`. Clients repeat the call
+    with the new cursor while `has_more` is true.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        JsonResponse: The changes, 400 for an invalid cursor, or 410 with
+        `"reset": true` when the client must resynchronise from 0.
+    """
+    try:
+        since = int(request.GET.get("since") or 0)
+    except ValueError:
+        since = -1
+    if since < 0:
+        return _error("since must be a non-negative integer.")
+    try:
+        changes = changes_since(
+            since,
+            get_sync_limit(request.GET.get("limit")),
+            owner=request.user,
+        )
+    except CursorExpired as exc:
+        return JsonResponse({"error": str(exc), "reset": True}, status=410)
+    return JsonResponse(
+        {
+            "changes": [
+                {**note_to_dict(note), "change_seq": note.change_seq}
+                for note in changes.notes
+            ],
+            "deleted": changes.deleted,
+            "cursor": changes.cursor,
+            "has_more": changes.has_more,
+        }
+    )
+
+
+@api_login_required
+@require_http_methods(["POST", "PATCH", "DELETE"])
+def api_note_batch(request):
+    """
+    Creates, updates or deletes many notes in one transaction.
+
+    → POST: a JSON array of note objects to create.
+    → PATCH: a JSON array of objects with an "id" plus the fields to
+      change.
+    → DELETE: a JSON array of note ids to move to the trash.
+
+    Ids of notes that belong to another user are treated as missing.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        JsonResponse: `{"results": [...]}` on success, or
+        `{"errors": [{"index": i, "errors": {...}}]}` with status 400 if
+        any item is invalid (in which case nothing is written).
+    """
+    try:
+        items = _read_batch(request)
+    except BadRequest as exc:
+        return _error(str(exc))
+
+    if request.method == "DELETE":
+        return _batch_delete(items, request.user)
+    if request.method == "PATCH":
+        return _batch_update(items, request.user)
+    return _batch_create(items, request.user)
+
+
+def _errors_response(errors):
+    return JsonResponse({"errors": errors}, status=400)
+
+
+def _batch_create(items, owner):
+    notes, errors = [], []
+    for index, item in enumerate(items):
+        note, item_errors = _validate(item)
+        if item_errors:
+            errors.append({"index": index, "errors": item_errors})
+        else:
+            note.owner = owner
+            note.refresh_preview()
+            notes.append(note)
+    if errors:
+        return _errors_response(errors)
+
+    with transaction.atomic():
+        created = Note.objects.bulk_create(notes)
+    # bulk_create does not send post_save, so invalidate and publish
+    # explicitly.
+    bump_notes_version()
+    for note in created:
+        publish("created", note)
+    return JsonResponse(
+        {"results": [note_to_dict(note) for note in created]}, status=201
+    )
+
+
+def _batch_update(items, owner):
+    ids = [item.get("id") for item in items if isinstance(item, dict)]
+    with transaction.atomic():
+        owned = Note.objects.live().filter(owner=owner).select_for_update()
+        existing = owned.in_bulk([pk for pk in ids if _is_id(pk)])
+        notes, errors, seen = [], [], set()
+        for index, item in enumerate(items):
+            pk = item.get("id") if isinstance(item, dict) else None
+            if not _is_id(pk) or pk not in existing:
+                errors.append(
+                    {"index": index, "errors": {"id": ["Note not found."]}}
+                )
+                continue
+            # in_bulk returns one instance per id, so a repeated id would
+            # apply both items to it and record two revisions of one save.
+            if pk in seen:
+                errors.append(
+                    {
+                        "index": index,
+                        "errors": {"id": ["Duplicate id in this batch."]},
+                    }
+                )
+                continue
+            seen.add(pk)
+            note, item_errors = _validate(
+                item, instance=existing[pk], partial=True
+            )
+            if item_errors:
+                errors.append({"index": index, "errors": item_errors})
+            else:
+                notes.append(note)
+        if errors:
+            return _errors_response(errors)
+
+        # bulk_update skips auto_now, so stamp updated_at ourselves.
+        now = timezone.now()
+        for note in notes:
+            note.updated_at = now
+            note.refresh_preview()
+        Note.objects.bulk_update(
+            notes, ["title", "content", "preview", "pinned", "updated_at"]
+        )
+        # bulk_update does not send post_save either.
+        record_revisions(notes)
+    bump_notes_version()
+    for note in notes:
+        publish("updated", note)
+    return JsonResponse({"results": [note_to_dict(note) for note in notes]})
+
+
+def _batch_delete(items, owner):
+    if not all(_is_id(pk) for pk in items):
+        return _error("A delete batch must be a JSON array of note ids.")
+    deleted = trash_notes(Note.objects.filter(owner=owner, pk__in=items))
+    return JsonResponse({"deleted": deleted})
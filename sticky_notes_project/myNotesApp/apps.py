@@ -18,3 +18,34 @@ class MyNotesAppConfig(AppConfig):
     """
     default_auto_field = "django.db.models.BigAutoField"
     name = "myNotesApp"
+
+    def ready(self):
+        """
+        Connects the signal handlers that invalidate the note list cache,
+        the hook that tunes new SQLite connections, the request metrics
+        query recorder and the check that restores the note table
+        triggers after migrations, and installs the template render
+        timer when `NOTES_TEMPLATE_TIMING` is on.
+        """
+        from django.conf import settings
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_migrate
+
+        from . import signals  # noqa: F401
+        from .db import configure_sqlite, restore_note_triggers
+        from .metrics import install_query_recorder, install_template_timer
+
+        connection_created.connect(
+            configure_sqlite, dispatch_uid="myNotesApp.configure_sqlite"
+        )
+        connection_created.connect(
+            install_query_recorder,
+            dispatch_uid="myNotesApp.install_query_recorder",
+        )
+        post_migrate.connect(
+            restore_note_triggers,
+            sender=self,
+            dispatch_uid="myNotesApp.restore_note_triggers",
+        )
+        if getattr(settings, "NOTES_TEMPLATE_TIMING", False):
+            install_template_timer()
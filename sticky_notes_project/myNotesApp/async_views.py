@@ -0,0 +1,450 @@
+"""
+This file contains async versions of the note CRUD views for ASGI.
+
+They behave exactly like the views in views.py (same templates, forms,
+pagination, caching and conditional GET handling) but use Django's async
+ORM API (`aget`, `acreate`/`asave`, `aupdate`, `adelete` and async
+iteration), so under an ASGI server a request waiting on the client or
+the database does not hold a thread.
+
+→ The URLconf serves these views instead of the sync ones when
+  `NOTES_ASYNC_VIEWS` is on, which asgi.py enables by default.
+→ Form validation and template rendering do not touch the database, so
+  they run directly on the event loop. The signed-in user is loaded
+  with `request.auser()` first, so templates reading `user` do not query
+  the database either, and the tags that templates and forms show are
+  prefetched. Saving a form's tags runs in a thread (`save_m2m`).
+"""
+
+from calendar import timegm
+
+from asgiref.sync import sync_to_async
+
+from django.contrib.auth.decorators import login_required
+from django.db.models import F
+from django.http import Http404, JsonResponse
+from django.shortcuts import aget_object_or_404, redirect, render
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_POST
+
+from .cache import (
+    aget_or_build,
+    alist_cache_key,
+    arender_note_cards,
+    bump_notes_version,
+    get_cache_mode,
+)
+from .conditional import (
+    adetail_validators,
+    alist_etag,
+    has_pending_messages,
+)
+from .events import aiter_events, apublish, parse_cursor, stream_response
+from .bulk import aapply_bulk_action
+from .forms import BulkActionForm, NoteForm
+from .models import CARD_FIELDS, Note
+from .pagination import apaginate_notes, get_page_size
+from .revisions import arevision_page, parse_before
+from .tags import TagFilter, atag_facets, filter_by_tags, tag_filter_context
+from .trash import arestore_notes, atrash_notes, get_trash_retention
+from .views import bulk_response, history_response
+
+
+def _conditional(request, etag, last_modified):
+    """
+    Answers a conditional GET the way Django's `condition` decorator does.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        etag (str): The unquoted ETag of the resource.
+        last_modified (datetime | None): When the resource last changed.
+
+    Returns:
+        tuple: (HttpResponse | None, callable). The response is a 304 when
+        the client's copy is current; the callable adds the validator
+        headers to a full response. Pages showing flash messages get
+        neither.
+    """
+    if has_pending_messages(request):
+        return None, lambda response: response
+    etag = quote_etag(etag)
+    timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=timestamp
+    )
+
+    def add_headers(response):
+        response.headers.setdefault("ETag", etag)
+        if timestamp:
+            response.headers.setdefault("Last-Modified", http_date(timestamp))
+        return response
+
+    return not_modified, add_headers
+
+
+async def _user(request):
+    """
+    Returns the signed-in user, loaded without blocking the event loop.
+
+    The user is also stored on `request.user`, which the templates read
+    through the auth context processor.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        User: The signed-in user.
+    """
+    request.user = user = await request.auser()
+    return user
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+async def note_list(request):
+    """
+    Async version of `views.note_list`.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: The note list page, a redirect after a successful
+        form submission, or 304 Not Modified.
+    """
+    owner = await _user(request)
+    add_headers = None
+    if request.method == "POST":
+        form = NoteForm(request.POST)
+        if form.is_valid():
+            form.instance.owner = owner
+            await form.save(commit=False).asave()
+            await sync_to_async(form.save_m2m)()
+            return redirect("note_list")
+    else:
+        form = NoteForm()
+        not_modified, add_headers = _conditional(
+            request, await alist_etag(request, owner), None
+        )
+        if not_modified is not None:
+            return not_modified
+
+    tag_filter = TagFilter.from_params(request.GET)
+    page, cards_html = await _note_list_page(
+        owner,
+        request.GET.get("cursor"),
+        get_page_size(request.GET.get("page_size")),
+        tag_filter,
+    )
+    context = {
+        "form": form,
+        "notes": page.notes,
+        "page": page,
+        "cards_html": cards_html,
+        "bulk_form": BulkActionForm(
+            initial={"next": request.get_full_path()}
+        ),
+        **tag_filter_context(tag_filter, await _tag_facets(owner)),
+    }
+    response = render(request, "myNotesApp/note_list.html", context)
+    return add_headers(response) if add_headers else response
+
+
+async def _tag_facets(owner):
+    """Async version of `views._tag_facets`."""
+    if get_cache_mode() is None:
+        return await atag_facets(owner)
+    key = await alist_cache_key("facets", owner.pk)
+    return await aget_or_build(key, lambda: atag_facets(owner))
+
+
+async def _note_list_page(owner, cursor, page_size, tag_filter=TagFilter()):
+    """Async version of `views._note_list_page`."""
+
+    async def build_page():
+        notes = Note.objects.live().filter(owner=owner)
+        return await apaginate_notes(
+            filter_by_tags(notes, owner, tag_filter)
+            .only(*CARD_FIELDS)
+            .prefetch_related("tags"),
+            cursor,
+            page_size,
+        )
+
+    mode = get_cache_mode()
+    if mode is None:
+        return await build_page(), None
+
+    key = await alist_cache_key(
+        owner.pk, cursor or "", page_size, tag_filter.cache_key
+    )
+    if mode == "queryset":
+        page = await aget_or_build(key, build_page)
+        return page, await arender_note_cards(page.notes)
+
+    async def build_fragment():
+        page = await build_page()
+        return page, await arender_note_cards(page.notes)
+
+    return await aget_or_build(key, build_fragment)
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+async def note_detail(request, pk):
+    """
+    Async version of `views.note_detail`.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        pk (int): The primary key of the note to retrieve.
+
+    Returns:
+        HttpResponse: The note detail page, or 304 Not Modified.
+
+    Raises:
+        Http404: If the note does not exist or belongs to another user.
+    """
+    owner = await _user(request)
+    etag, last_modified = await adetail_validators(request, pk, owner)
+    if etag is None:
+        raise Http404("No Note matches the given query.")
+    not_modified, add_headers = _conditional(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    note = await aget_object_or_404(
+        Note.objects.live().prefetch_related("tags"), pk=pk, owner=owner
+    )
+    return add_headers(
+        render(request, "myNotesApp/note_detail.html", {"note": note})
+    )
+
+
+@login_required
+async def note_history(request, pk):
+    """
+    Async version of `views.note_history`.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        pk (int): The primary key of the note.
+
+    Returns:
+        HttpResponse: The history page, or its fragment for scripts.
+
+    Raises:
+        Http404: If the note does not exist or belongs to another user.
+    """
+    note = await aget_object_or_404(
+        Note.objects.live().only("id", "title"),
+        pk=pk,
+        owner=await _user(request),
+    )
+    page = await arevision_page(note, parse_before(request.GET.get("before")))
+    return history_response(request, note, page)
+
+
+@login_required
+async def note_create(request):
+    """
+    Async version of `views.note_create`.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: The form, or a redirect to the new note.
+    """
+    owner = await _user(request)
+    if request.method == "POST":
+        form = NoteForm(request.POST)
+        if form.is_valid():
+            form.instance.owner = owner
+            note = form.save(commit=False)
+            await note.asave()
+            await sync_to_async(form.save_m2m)()
+            return redirect("note_detail", pk=note.pk)
+    else:
+        form = NoteForm()
+    return render(request, "myNotesApp/note_form.html", {"form": form})
+
+
+@login_required
+async def note_update(request, pk):
+    """
+    Async version of `views.note_update`.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        pk (int): The primary key of the note to be updated.
+
+    Returns:
+        HttpResponse: The form, or a redirect to the updated note.
+
+    Raises:
+        Http404: If the note does not exist or belongs to another user.
+    """
+    # The tags are prefetched for the edit form's initial value.
+    note = await aget_object_or_404(
+        Note.objects.live().prefetch_related("tags"),
+        pk=pk,
+        owner=await _user(request),
+    )
+    if request.method == "POST":
+        form = NoteForm(request.POST, instance=note)
+        if form.is_valid():
+            note = form.save(commit=False)
+            await note.asave()
+            await sync_to_async(form.save_m2m)()
+            return redirect("note_detail", pk=note.pk)
+    else:
+        form = NoteForm(instance=note)
+    return render(request, "myNotesApp/note_form.html", {"form": form})
+
+
+@login_required
+@require_POST
+async def note_toggle_pin(request, pk):
+    """
+    Async version of `views.note_toggle_pin`.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        pk (int): The primary key of the note to be toggled.
+
+    Returns:
+        HttpResponse: JSON, the card fragment, or a redirect to the note
+        list.
+
+    Raises:
+        Http404: If the note does not exist or belongs to another user.
+    """
+    owner = await _user(request)
+    updated = await Note.objects.live().filter(pk=pk, owner=owner).aupdate(
+        pinned=~F("pinned"), updated_at=timezone.now()
+    )
+    if not updated:
+        raise Http404("No Note matches the given query.")
+    # aupdate() does not send post_save, so invalidate and publish
+    # explicitly.
+    bump_notes_version()
+
+    note = await Note.objects.prefetch_related("tags").aget(pk=pk)
+    await apublish("pinned", note)
+    if "application/json" in request.headers.get("Accept", ""):
+        return JsonResponse({"id": note.pk, "pinned": note.pinned})
+    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        return render(request, "myNotesApp/_note_card.html", {"note": note})
+    return redirect("note_list")
+
+
+@login_required
+async def note_delete(request, pk):
+    """
+    Async version of `views.note_delete`.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        pk (int): The primary key of the note to be deleted.
+
+    Returns:
+        HttpResponse: A redirect after deletion, or the confirmation page.
+
+    Raises:
+        Http404: If the note does not exist or belongs to another user.
+    """
+    note = await aget_object_or_404(
+        Note.objects.live(), pk=pk, owner=await _user(request)
+    )
+    if request.method == "POST":
+        await atrash_notes(Note.objects.filter(pk=note.pk))
+        return redirect("note_list")
+    return render(request, "myNotesApp/note_delete.html", {"note": note})
+
+
+@login_required
+@require_POST
+async def note_bulk(request):
+    """
+    Async version of `views.note_bulk`.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: JSON, or a redirect back to the list.
+    """
+    owner = await _user(request)
+    form = BulkActionForm(request.POST)
+    changed = None
+    if form.is_valid():
+        changed = await aapply_bulk_action(
+            Note.objects.filter(owner=owner, pk__in=form.cleaned_data["ids"]),
+            form.cleaned_data["action"],
+            form.cleaned_data["tags"],
+        )
+    return bulk_response(request, form, changed)
+
+
+@login_required
+async def note_trash(request):
+    """
+    Async version of `views.note_trash`.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: The rendered trash page.
+    """
+    page = await apaginate_notes(
+        Note.objects.trashed()
+        .filter(owner=await _user(request))
+        .only("deleted_at", *CARD_FIELDS),
+        request.GET.get("cursor"),
+        get_page_size(request.GET.get("page_size")),
+    )
+    context = {"page": page, "retention_days": get_trash_retention()}
+    return render(request, "myNotesApp/note_trash.html", context)
+
+
+@login_required
+@require_POST
+async def note_restore(request, pk):
+    """
+    Async version of `views.note_restore`.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        pk (int): The primary key of the note to restore.
+
+    Returns:
+        HttpResponse: A redirect to the trash.
+
+    Raises:
+        Http404: If the note is not in the user's trash.
+    """
+    owner = await _user(request)
+    if not await arestore_notes(Note.objects.filter(pk=pk, owner=owner)):
+        raise Http404("No Note matches the given query.")
+    return redirect("note_trash")
+
+
+@login_required
+async def note_events(request):
+    """
+    Async version of `views.note_events`.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        StreamingHttpResponse: A text/event-stream response.
+    """
+    owner = await _user(request)
+    return stream_response(
+        aiter_events(*parse_cursor(request), owner_id=owner.pk)
+    )
@@ -0,0 +1,377 @@
+"""
+This file implements online backups of the SQLite database.
+
+Copying db.sqlite3 while the app writes to it can produce a corrupt
+copy, and stopping the app to copy it means downtime. SQLite's online
+backup API copies a live database consistently instead.
+
+→ `copy_database` runs the backup a bounded number of pages per step.
+  The source is only locked while a step runs, so writers wait for one
+  short step at most, and the optional pause between steps leaves the
+  database to them. The time spent in steps is reported as the time
+  writers could have been held up. In WAL mode readers never block
+  writers at all, but a write from another connection makes SQLite
+  restart the copy, so very busy databases take longer to back up.
+→ `backup_database` writes a gzip-compressed snapshot next to a
+  ".sha256" checksum file (in `sha256sum` format), checks the copy with
+  `PRAGMA quick_check` first, and deletes all but the newest `keep`
+  snapshots.
+→ `restore_database` verifies a snapshot's checksum and integrity and
+  copies it over the live database with the same stepwise backup, so
+  open connections see the restored data. Cached pages are invalidated
+  and open boards reload.
+→ A restore rolls the delta sync sequence back (see sync.py), so a
+  client whose cursor is ahead of the snapshot would be told it is up
+  to date and miss every later change. The sequence is therefore moved
+  past its pre-restore value and marked compacted up to there: every
+  existing cursor expires and clients resynchronise from scratch.
+"""
+
+import gzip
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from .cache import bump_notes_version
+from .events import publish_reset
+from .models import SyncState
+
+DEFAULT_BACKUP_PAGES = 1024
+DEFAULT_BACKUP_KEEP = 7
+
+SNAPSHOT_PREFIX = "notes-"
+SNAPSHOT_SUFFIX = ".sqlite3.gz"
+CHECKSUM_SUFFIX = ".sha256"
+
+# Bytes read at a time when compressing and hashing.
+CHUNK_SIZE = 1024 * 1024
+
+
+class BackupError(Exception):
+    """Raised when a backup cannot be made or a snapshot is unusable."""
+
+
+@dataclass
+class CopyStats:
+    """
+    Measurements of one `copy_database` run.
+
+    Attributes:
+        bytes (int): Size of the copied database.
+        seconds (float): Wall time of the whole copy.
+        steps (int): Backup steps run.
+        locked_seconds (float): Time spent inside steps, when writers to
+            the source could be held up.
+        longest_step (float): Seconds of the longest step.
+    """
+    bytes: int = 0
+    seconds: float = 0.0
+    steps: int = 0
+    locked_seconds: float = 0.0
+    longest_step: float = 0.0
+
+    @property
+    def mb_per_s(self):
+        """Throughput of the copy in MB/s."""
+        return self.bytes / 1e6 / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class Snapshot:
+    """
+    A written backup snapshot.
+
+    Attributes:
+        path (Path): The compressed snapshot.
+        sha256 (str): Hex digest of the compressed file.
+        compressed_bytes (int): Size of the compressed file.
+        stats (CopyStats): How the copy went.
+        removed (list): Older snapshots deleted by the rotation.
+    """
+    path: Path
+    sha256: str
+    compressed_bytes: int
+    stats: CopyStats
+    removed: list
+
+
+def database_path(alias="default"):
+    """
+    Returns the file of an SQLite database.
+
+    Args:
+        alias (str): The database alias.
+
+    Returns:
+        str: The database file name.
+
+    Raises:
+        BackupError: If the database is not an SQLite file.
+    """
+    config = settings.DATABASES[alias]
+    name = str(config["NAME"])
+    if "sqlite" not in config["ENGINE"] or name.startswith(
+        (":memory:", "file:")
+    ):
+        raise BackupError(f"Database {alias!r} is not an SQLite file.")
+    return name
+
+
+def copy_database(source, target, pages=DEFAULT_BACKUP_PAGES, pause=0.0):
+    """
+    Copies an SQLite database with the online backup API, step by step.
+
+    Args:
+        source (str): The database file to copy.
+        target (str): The file to copy it to; overwritten in place.
+        pages (int): Pages copied per step.
+        pause (float): Seconds to sleep between steps.
+
+    Returns:
+        CopyStats: The size, duration and step times of the copy.
+    """
+    stats = CopyStats()
+    step_started = [0.0]
+
+    def progress(status, remaining, total):
+        now = time.perf_counter()
+        step = now - step_started[0]
+        stats.steps += 1
+        stats.locked_seconds += step
+        stats.longest_step = max(stats.longest_step, step)
+        if remaining and pause:
+            time.sleep(pause)
+        step_started[0] = time.perf_counter()
+
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(target)
+    try:
+        started = step_started[0] = time.perf_counter()
+        src.backup(dst, pages=pages, progress=progress)
+        stats.seconds = time.perf_counter() - started
+        page_count = dst.execute("PRAGMA page_count").fetchone()[0]
+        page_size = dst.execute("PRAGMA page_size").fetchone()[0]
+        stats.bytes = page_count * page_size
+    finally:
+        dst.close()
+        src.close()
+    return stats
+
+
+def file_sha256(path):
+    """Returns the hex SHA-256 digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _check_integrity(path):
+    connection = sqlite3.connect(path)
+    try:
+        result = connection.execute("PRAGMA quick_check").fetchone()[0]
+    finally:
+        connection.close()
+    if result != "ok":
+        raise BackupError(f"Integrity check failed: {result}")
+
+
+def list_snapshots(directory):
+    """
+    Lists the snapshots in a directory, oldest first.
+
+    Args:
+        directory (str | Path): The backup directory.
+
+    Returns:
+        list: Paths of the snapshots.
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    return sorted(
+        directory.glob(f"{SNAPSHOT_PREFIX}*{SNAPSHOT_SUFFIX}"),
+        key=lambda path: path.name,
+    )
+
+
+def rotate_snapshots(directory, keep):
+    """
+    Deletes all but the newest `keep` snapshots and their checksums.
+
+    Args:
+        directory (str | Path): The backup directory.
+        keep (int): Number of snapshots to keep.
+
+    Returns:
+        list: Paths of the deleted snapshots.
+    """
+    snapshots = list_snapshots(directory)
+    expired = snapshots[:-keep] if keep > 0 else snapshots
+    for path in expired:
+        path.unlink()
+        Path(f"{path}{CHECKSUM_SUFFIX}").unlink(missing_ok=True)
+    return expired
+
+
+def get_backup_dir():
+    """Returns the directory snapshots are written to."""
+    return Path(
+        getattr(settings, "NOTES_BACKUP_DIR", settings.BASE_DIR / "backups")
+    )
+
+
+def backup_database(
+    directory=None,
+    alias="default",
+    keep=None,
+    pages=DEFAULT_BACKUP_PAGES,
+    pause=0.0,
+):
+    """
+    Writes a compressed, checksummed snapshot of a live database.
+
+    Args:
+        directory (str | Path | None): Where to write the snapshot;
+            defaults to `NOTES_BACKUP_DIR`.
+        alias (str): The database to back up.
+        keep (int | None): Snapshots to keep after rotation; defaults to
+            `NOTES_BACKUP_KEEP`.
+        pages (int): Pages copied per backup step.
+        pause (float): Seconds to sleep between backup steps.
+
+    Returns:
+        Snapshot: The new snapshot.
+
+    Raises:
+        BackupError: If the database is not an SQLite file or the copy
+        fails its integrity check.
+    """
+    directory = Path(directory or get_backup_dir())
+    if keep is None:
+        keep = getattr(settings, "NOTES_BACKUP_KEEP", DEFAULT_BACKUP_KEEP)
+    source = database_path(alias)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = timezone.now().strftime("%Y%m%dT%H%M%S%fZ")
+    path = directory / f"{SNAPSHOT_PREFIX}{stamp}{SNAPSHOT_SUFFIX}"
+
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        copy = os.path.join(tmp, "copy.sqlite3")
+        stats = copy_database(source, copy, pages, pause)
+        _check_integrity(copy)
+        partial = os.path.join(tmp, path.name)
+        with open(copy, "rb") as raw, gzip.open(partial, "wb") as packed:
+            shutil.copyfileobj(raw, packed, CHUNK_SIZE)
+        digest = file_sha256(partial)
+        os.replace(partial, path)
+    Path(f"{path}{CHECKSUM_SUFFIX}").write_text(f"{digest}  {path.name}\n")
+
+    return Snapshot(
+        path=path,
+        sha256=digest,
+        compressed_bytes=path.stat().st_size,
+        stats=stats,
+        removed=rotate_snapshots(directory, keep),
+    )
+
+
+def verify_snapshot(path):
+    """
+    Checks a snapshot against its ".sha256" file.
+
+    Args:
+        path (str | Path): The compressed snapshot.
+
+    Raises:
+        BackupError: If the checksum file is missing or does not match.
+    """
+    checksum = Path(f"{path}{CHECKSUM_SUFFIX}")
+    try:
+        expected = checksum.read_text().split()[0]
+    except (OSError, IndexError) as exc:
+        raise BackupError(f"No checksum for {path}.") from exc
+    if file_sha256(path) != expected:
+        raise BackupError(f"Checksum mismatch for {path}.")
+
+
+def _read_change_seq(path):
+    """Returns a database's delta sync sequence, or 0 without one."""
+    connection = sqlite3.connect(path)
+    try:
+        row = connection.execute(
+            f"SELECT change_seq FROM {SyncState._meta.db_table} WHERE id = 1"
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    finally:
+        connection.close()
+    return row[0] if row else 0
+
+
+def _expire_sync_cursors(path, before):
+    """
+    Moves the delta sync sequence of a restored database past `before`
+    and marks everything up to it compacted, so every cursor expires.
+    """
+    connection = sqlite3.connect(path)
+    try:
+        with connection:
+            connection.execute(
+                f"UPDATE {SyncState._meta.db_table} "
+                "SET change_seq = max(change_seq, ?) + 1, "
+                "compacted_seq = max(change_seq, ?) + 1 WHERE id = 1",
+                [before, before],
+            )
+    except sqlite3.OperationalError:
+        # Not a notes database (no sequence to move).
+        pass
+    finally:
+        connection.close()
+
+
+def restore_database(
+    path, alias="default", pages=DEFAULT_BACKUP_PAGES, pause=0.0
+):
+    """
+    Replaces a live database with the contents of a snapshot.
+
+    The snapshot is verified and decompressed first, so a damaged file
+    never touches the database. The copy then runs step by step like a
+    backup, in place, so running processes see the restored notes.
+    Afterwards every delta sync cursor is expired.
+
+    Args:
+        path (str | Path): The compressed snapshot.
+        alias (str): The database to restore into.
+        pages (int): Pages copied per backup step.
+        pause (float): Seconds to sleep between backup steps.
+
+    Returns:
+        CopyStats: How the copy into the database went.
+
+    Raises:
+        BackupError: If the snapshot fails its checksum or integrity
+        check.
+    """
+    target = database_path(alias)
+    verify_snapshot(path)
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = os.path.join(tmp, "restore.sqlite3")
+        with gzip.open(path, "rb") as packed, open(copy, "wb") as raw:
+            shutil.copyfileobj(packed, raw, CHUNK_SIZE)
+        _check_integrity(copy)
+        before = _read_change_seq(target)
+        stats = copy_database(copy, target, pages, pause)
+    _expire_sync_cursors(target, before)
+    bump_notes_version()
+    publish_reset()
+    return stats
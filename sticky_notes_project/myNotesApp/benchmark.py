@@ -0,0 +1,786 @@
+"""
+This file contains the benchmark harness for the note endpoints.
+
+Requests are sent in-process through Django's test client (the same
+request/response cycle as the WSGI handler), so results measure the
+application itself rather than a network or server.
+
+→ `seed_notes` fills the database with a configurable number of notes and
+  a share of pinned and trashed ones, optionally spread over several
+  owners. Every request is sent as the "benchmark" user, who owns the
+  first share.
+→ `run_benchmarks` measures latency percentiles, requests per second and
+  SQL queries per request for the list, detail, search, trash, create,
+  update, toggle-pin and delete endpoints.
+→ `compare_to_baseline` reports every metric that regressed by more than
+  a threshold against a previous JSON result.
+→ `compare_servers` holds many concurrent clients open against the sync
+  views driven by one thread per connection (WSGI) and against the async
+  views on one event loop (ASGI), and reports throughput, latency and the
+  peak number of threads for both.
+→ `compare_runserver` starts `manage.py runserver` and the production
+  gunicorn server as real processes on the benchmark database and
+  measures their throughput over HTTP with keep-alive clients.
+→ `benchmark_card_rendering` measures the time to render 1,000 note
+  cards with and without the cached template loader and the per-card
+  cache.
+→ `benchmark_revisions` measures what recording the revision history
+  adds to saving an edited note, with a short and a long history, and
+  how much the stored deltas save over full copies.
+
+The `benchmark_notes` management command wraps all of this in a
+throwaway database.
+"""
+
+import asyncio
+import http.client
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import ModuleType
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections
+from django.db.models.signals import post_save
+from django.template import Context, Engine
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import include, path, reverse
+from django.utils import timezone
+
+from . import async_views, views
+from .cache import (
+    CARDS_TEMPLATE,
+    get_card_cache,
+    note_card_key,
+    render_note_cards,
+)
+from .models import CARD_FIELDS, Note, NoteRevision
+from .revisions import get_keyframe_interval, get_version, revision_page
+from .signals import record_note_revision
+from .urls import build_urlpatterns
+
+ENDPOINTS = (
+    "note_list",
+    "note_detail",
+    "note_search",
+    "note_trash",
+    "note_create",
+    "note_update",
+    "note_toggle_pin",
+    "note_delete",
+)
+
+SEED_BATCH_SIZE = 5000
+
+BENCHMARK_USERNAME = "benchmark"
+
+# Words the revision benchmark edits notes with.
+REVISION_WORDS = (
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf",
+    "hotel", "india", "juliett", "kilo", "lima", "mike", "november",
+)
+
+
+def benchmark_user(number=1):
+    """
+    Returns a benchmark user, creating it if needed.
+
+    Args:
+        number (int): 1 for the user the benchmarks sign in as; other
+            numbers name the users owning the rest of the seeded notes.
+
+    Returns:
+        User: The user, without a usable password.
+    """
+    username = BENCHMARK_USERNAME
+    if number != 1:
+        username = f"{BENCHMARK_USERNAME}-{number}"
+    user, _ = get_user_model().objects.get_or_create(
+        username=username, defaults={"password": make_password(None)}
+    )
+    return user
+
+
+def seed_notes(
+    count,
+    pinned_ratio=0.05,
+    batch_size=SEED_BATCH_SIZE,
+    owners=1,
+    trashed_ratio=0.0,
+):
+    """
+    Inserts `count` notes with `bulk_create`, in batches.
+
+    Args:
+        count (int): Number of notes to create.
+        pinned_ratio (float): Share of notes that are pinned.
+        batch_size (int): Notes per INSERT batch.
+        owners (int): Number of users the notes are spread over, round
+            robin. The benchmarked user owns `count / owners` of them, so
+            raising this shows how a board scales with other users' notes.
+        trashed_ratio (float): Share of notes that are in the trash.
+
+    Returns:
+        int: The number of notes created.
+    """
+    rng = random.Random(count)
+    now = timezone.now()
+    users = [benchmark_user(number) for number in range(1, owners + 1)]
+    created = 0
+    while created < count:
+        size = min(batch_size, count - created)
+        notes = [
+            Note(
+                owner=users[(created + i) % owners],
+                title=f"Benchmark note {created + i}",
+                content="Benchmark content " * rng.randint(1, 20),
+                pinned=rng.random() < pinned_ratio,
+                deleted_at=now if rng.random() < trashed_ratio else None,
+            )
+            for i in range(size)
+        ]
+        for note in notes:
+            note.refresh_preview()
+        Note.objects.bulk_create(notes)
+        created += size
+    return created
+
+
+def summarize(latencies, queries=None):
+    """
+    Turns raw per-request measurements into summary statistics.
+
+    Args:
+        latencies (list): Seconds per request.
+        queries (list | None): SQL queries per request, if counted.
+
+    Returns:
+        dict: Request count, mean and p50/p90/p95/p99 latency in
+        milliseconds, requests per second and mean queries per request.
+    """
+    ordered = sorted(latencies)
+
+    def percentile(p):
+        index = min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1)))
+        return round(ordered[index] * 1000, 3)
+
+    total = sum(ordered)
+    summary = {
+        "requests": len(ordered),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "p50_ms": percentile(50),
+        "p90_ms": percentile(90),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+        "rps": round(len(ordered) / total, 1) if total else 0.0,
+    }
+    if queries is not None:
+        summary["queries_per_request"] = round(statistics.mean(queries), 2)
+    return summary
+
+
+class _QueryCounter:
+    """A connection execute wrapper that only counts queries."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure(send, iterations):
+    """
+    Calls `send` repeatedly and records latency and query counts.
+
+    Args:
+        send (callable): Sends one request; receives the iteration number
+            and returns the response.
+        iterations (int): Number of requests.
+
+    Returns:
+        dict: The `summarize` result.
+
+    Raises:
+        AssertionError: If a request fails with a server error.
+    """
+    latencies, queries = [], []
+    counter = _QueryCounter()
+    with connection.execute_wrapper(counter):
+        for i in range(iterations):
+            before = counter.count
+            started = time.perf_counter()
+            response = send(i)
+            latencies.append(time.perf_counter() - started)
+            queries.append(counter.count - before)
+            if response.status_code >= 500:
+                raise AssertionError(
+                    f"Request failed with {response.status_code}."
+                )
+    return summarize(latencies, queries)
+
+
+def _note_ids(user, limit):
+    """Returns up to `limit` ids of the user's notes."""
+    notes = Note.objects.live().filter(owner=user).values_list(
+        "pk", flat=True
+    )
+    return list(notes[:limit])
+
+
+def _login_cookie(user):
+    """Signs `user` in and returns the value of the session cookie."""
+    client = Client()
+    client.force_login(user)
+    return client.cookies[settings.SESSION_COOKIE_NAME].value
+
+
+def run_benchmarks(iterations=200, client=None, endpoints=ENDPOINTS):
+    """
+    Benchmarks every note endpoint against the current database.
+
+    Args:
+        iterations (int): Requests per endpoint.
+        client (Client | None): The client to send requests with. It is
+            signed in as the benchmark user.
+        endpoints (iterable): Names of the endpoints to benchmark.
+
+    Returns:
+        dict: One `summarize` result per endpoint name.
+    """
+    user = benchmark_user()
+    client = client or Client()
+    client.force_login(user)
+    rng = random.Random(iterations)
+    ids = _note_ids(user, 10000)
+    if not ids:
+        raise ValueError("Seed the database before running benchmarks.")
+    payload = {"title": "Benchmark", "content": "Benchmark content."}
+    # Notes created by the create benchmark are deleted by the delete one.
+    created = []
+
+    def create(i):
+        response = client.post(reverse("note_create"), payload)
+        created.append(int(response["Location"].rstrip("/").split("/")[-1]))
+        return response
+
+    def delete(i):
+        pk = created.pop() if created else ids.pop()
+        return client.post(reverse("note_delete", kwargs={"pk": pk}))
+
+    senders = {
+        "note_list": lambda i: client.get(reverse("note_list")),
+        "note_detail": lambda i: client.get(
+            reverse("note_detail", kwargs={"pk": rng.choice(ids)})
+        ),
+        "note_search": lambda i: client.get(
+            reverse("note_search"), {"q": "benchmark"}
+        ),
+        "note_trash": lambda i: client.get(reverse("note_trash")),
+        "note_create": create,
+        "note_update": lambda i: client.post(
+            reverse("note_update", kwargs={"pk": rng.choice(ids)}), payload
+        ),
+        "note_toggle_pin": lambda i: client.post(
+            reverse("note_toggle_pin", kwargs={"pk": rng.choice(ids)})
+        ),
+        "note_delete": delete,
+    }
+    return {name: measure(senders[name], iterations) for name in endpoints}
+
+
+def compare_to_baseline(results, baseline, threshold=0.2, metric="p50_ms"):
+    """
+    Lists the endpoints whose metric regressed beyond the threshold.
+
+    Args:
+        results (dict): Endpoint results from `run_benchmarks`.
+        baseline (dict): Endpoint results of an earlier run.
+        threshold (float): Allowed relative slowdown (0.2 is 20 %).
+        metric (str): The latency metric to compare.
+
+    Returns:
+        list: Human-readable descriptions of each regression.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name, {}).get(metric)
+        if not previous:
+            continue
+        change = (result[metric] - previous) / previous
+        if change > threshold:
+            regressions.append(
+                f"{name}: {metric} {previous} -> {result[metric]} "
+                f"(+{change:.0%})"
+            )
+    return regressions
+
+
+def notes_urlconf(pages):
+    """
+    Builds a URLconf serving the note pages from the given views module.
+
+    The login and logout views are included, since the note pages link
+    to them.
+
+    Args:
+        pages (module): `views` or `async_views`.
+
+    Returns:
+        ModuleType: A module usable as `ROOT_URLCONF`.
+    """
+    urlconf = ModuleType(f"notes_urlconf_{pages.__name__.rsplit('.')[-1]}")
+    urlconf.urlpatterns = [
+        path("accounts/", include("django.contrib.auth.urls")),
+        *build_urlpatterns(pages),
+    ]
+    return urlconf
+
+
+class _ThreadGauge:
+    """Tracks the highest number of live threads seen."""
+
+    def __init__(self):
+        self.peak = threading.active_count()
+
+    def sample(self):
+        self.peak = max(self.peak, threading.active_count())
+
+
+def _server_result(latencies, seconds, gauge):
+    result = summarize(latencies)
+    result["rps"] = round(len(latencies) / seconds, 1)
+    result["seconds"] = round(seconds, 3)
+    result["peak_threads"] = gauge.peak
+    return result
+
+
+def _run_wsgi(url, concurrency, requests, client_delay, session):
+    # One thread per open connection, like a threaded WSGI server.
+    latencies, gauge = [], _ThreadGauge()
+
+    def connection_worker(_):
+        client = Client()
+        client.cookies[settings.SESSION_COOKIE_NAME] = session
+        try:
+            for _ in range(requests):
+                started = time.perf_counter()
+                client.get(url)
+                latencies.append(time.perf_counter() - started)
+                gauge.sample()
+                # A slow client keeps its connection (and thread) busy.
+                time.sleep(client_delay)
+        finally:
+            connections.close_all()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(connection_worker, range(concurrency)))
+    return _server_result(latencies, time.perf_counter() - started, gauge)
+
+
+def _run_asgi(url, concurrency, requests, client_delay, session):
+    # Every connection is a task on one event loop.
+    latencies, gauge = [], _ThreadGauge()
+
+    async def connection_task():
+        client = AsyncClient()
+        client.cookies[settings.SESSION_COOKIE_NAME] = session
+        for _ in range(requests):
+            started = time.perf_counter()
+            await client.get(url)
+            latencies.append(time.perf_counter() - started)
+            gauge.sample()
+            await asyncio.sleep(client_delay)
+
+    async def main():
+        await asyncio.gather(*(connection_task() for _ in range(concurrency)))
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    return _server_result(latencies, time.perf_counter() - started, gauge)
+
+
+def compare_servers(
+    concurrency=100, requests=10, client_delay=0.05, endpoint="note_list"
+):
+    """
+    Compares the WSGI and ASGI request paths under many open connections.
+
+    Each of `concurrency` simulated clients sends `requests` requests and
+    waits `client_delay` seconds between them, the way slow or idle
+    keep-alive connections do. The WSGI run uses the sync views and a
+    thread per client; the ASGI run uses the async views on a single
+    event loop. Requests go through the full middleware stack in-process,
+    so the numbers compare the two request paths, not network servers.
+    All clients share one session of the benchmark user.
+
+    Args:
+        concurrency (int): Simultaneous clients.
+        requests (int): Requests per client.
+        client_delay (float): Seconds each client idles between requests.
+        endpoint (str): "note_list" or "note_detail".
+
+    Returns:
+        dict: {"wsgi": {...}, "asgi": {...}} with latency percentiles,
+        requests per second, wall time and peak thread count.
+    """
+    if endpoint not in ("note_list", "note_detail"):
+        raise ValueError(f"Cannot compare servers on {endpoint}.")
+    user = benchmark_user()
+    if endpoint == "note_detail":
+        ids = _note_ids(user, 1)
+        if not ids:
+            raise ValueError("Seed the database before running benchmarks.")
+        kwargs = {"pk": ids[0]}
+    else:
+        kwargs = {}
+    session = _login_cookie(user)
+
+    results = {}
+    for name, pages, run in (
+        ("wsgi", views, _run_wsgi),
+        ("asgi", async_views, _run_asgi),
+    ):
+        with override_settings(ROOT_URLCONF=notes_urlconf(pages)):
+            url = reverse(endpoint, kwargs=kwargs)
+            results[name] = run(
+                url, concurrency, requests, client_delay, session
+            )
+    return results
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _server_commands(port):
+    """The command lines of the servers `compare_runserver` starts."""
+    manage = str(settings.BASE_DIR / "manage.py")
+    return {
+        "runserver": [
+            sys.executable, manage, "runserver", f"127.0.0.1:{port}",
+            "--noreload",
+        ],
+        "gunicorn": [
+            sys.executable, "-m", "gunicorn",
+            "--config", str(settings.BASE_DIR / "gunicorn.conf.py"),
+        ],
+    }
+
+
+def _wait_until_ready(port, process, timeout=30):
+    # Polls the health endpoint, which also checks the database.
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with {process.returncode}.")
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+        try:
+            conn.request("GET", "/healthz/")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        finally:
+            conn.close()
+        time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} did not become ready.")
+
+
+def _run_http(port, path, concurrency, requests, headers):
+    # Each client keeps one keep-alive connection, like a browser.
+    latencies, errors = [], []
+
+    def client(_):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        try:
+            for _ in range(requests):
+                started = time.perf_counter()
+                # Like browsers, retry once when the server has closed the
+                # keep-alive connection (e.g. a recycled worker).
+                for retry in (False, True):
+                    try:
+                        conn.request("GET", path, headers=headers)
+                        response = conn.getresponse()
+                        response.read()
+                        break
+                    except (OSError, http.client.HTTPException) as exc:
+                        conn.close()
+                        if retry:
+                            errors.append(repr(exc))
+                else:
+                    continue
+                latencies.append(time.perf_counter() - started)
+                if response.status >= 500:
+                    errors.append(f"HTTP {response.status}")
+        finally:
+            conn.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(client, range(concurrency)))
+    seconds = time.perf_counter() - started
+    result = summarize(latencies) if latencies else {"requests": 0}
+    result["rps"] = round(len(latencies) / seconds, 1)
+    result["seconds"] = round(seconds, 3)
+    result["errors"] = len(errors)
+    return result
+
+
+def compare_runserver(
+    concurrency=16, requests=50, endpoint="note_list", workers=None
+):
+    """
+    Compares `runserver` with the production gunicorn server over HTTP.
+
+    Both servers run as separate processes with DEBUG off, on the
+    current (benchmark) database, found through `DJANGO_DB_PATH`. The
+    production settings are not used because their static storage needs
+    `collectstatic` to have run.
+    `concurrency` clients then each send `requests` requests over one
+    keep-alive connection, with the session cookie of the benchmark user.
+    Unlike `compare_servers`, this includes the network stack, the
+    server's request parsing and its process model.
+
+    Args:
+        concurrency (int): Simultaneous clients.
+        requests (int): Requests per client.
+        endpoint (str): "note_list" or "note_detail".
+        workers (int | None): gunicorn worker processes; defaults to the
+            value in gunicorn.conf.py (2 × cores + 1).
+
+    Returns:
+        dict: {"runserver": {...}, "gunicorn": {...}} with latency
+        percentiles, requests per second, wall time and failed requests.
+
+    Raises:
+        RuntimeError: If a server does not start.
+    """
+    if endpoint not in ("note_list", "note_detail"):
+        raise ValueError(f"Cannot compare servers on {endpoint}.")
+    user = benchmark_user()
+    kwargs = {}
+    if endpoint == "note_detail":
+        ids = _note_ids(user, 1)
+        if not ids:
+            raise ValueError("Seed the database before running benchmarks.")
+        kwargs["pk"] = ids[0]
+    path = reverse(endpoint, kwargs=kwargs)
+    headers = {
+        "Cookie": f"{settings.SESSION_COOKIE_NAME}={_login_cookie(user)}"
+    }
+
+    results = {}
+    for name in ("runserver", "gunicorn"):
+        port = _free_port()
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "sticky_notes_project.settings",
+            "DJANGO_DEBUG": "0",
+            "DJANGO_ALLOWED_HOSTS": "127.0.0.1",
+            "DJANGO_DB_PATH": str(connection.settings_dict["NAME"]),
+            "WSGI_HOST": "127.0.0.1",
+            "WSGI_PORT": str(port),
+            "WSGI_ACCESS_LOG": "",
+        }
+        if workers:
+            env["WSGI_WORKERS"] = str(workers)
+        process = subprocess.Popen(
+            _server_commands(port)[name],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            _wait_until_ready(port, process)
+            results[name] = _run_http(
+                port, path, concurrency, requests, headers
+            )
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    return results
+
+
+def _template_engine(cached):
+    """Builds a template engine with or without the cached loader."""
+    loaders = [
+        "django.template.loaders.filesystem.Loader",
+        "django.template.loaders.app_directories.Loader",
+    ]
+    if cached:
+        loaders = [("django.template.loaders.cached.Loader", loaders)]
+    return Engine(dirs=settings.TEMPLATES[0]["DIRS"], loaders=loaders)
+
+
+def benchmark_card_rendering(cards=1000, rounds=5):
+    """
+    Measures how long rendering the note cards takes.
+
+    Four ways of producing the same markup are timed, `rounds` times
+    each:
+    → "uncached_loader": every render loads and compiles the templates
+      again, as Django does without the cached loader.
+    → "cached_loader": templates are compiled once, every card is
+      rendered each time.
+    → "card_cache_cold": the per-card cache is empty, so every card is
+      rendered and stored.
+    → "card_cache_warm": every card comes from the per-card cache.
+
+    Args:
+        cards (int): Number of seeded notes to render.
+        rounds (int): Renders per variant.
+
+    Returns:
+        dict: {variant: {...}} with the `summarize` statistics of one
+        render and "ms_per_1000_cards".
+
+    Raises:
+        ValueError: If the database has no notes.
+    """
+    notes = list(
+        Note.objects.only(*CARD_FIELDS).prefetch_related("tags")[:cards]
+    )
+    if not notes:
+        raise ValueError("Seed the database before running benchmarks.")
+    keys = [note_card_key(note) for note in notes]
+    context = {"notes": notes}
+
+    def with_engine(engine):
+        return lambda: engine.get_template(CARDS_TEMPLATE).render(
+            Context(context)
+        )
+
+    def cold():
+        get_card_cache().delete_many(keys)
+        return render_note_cards(notes)
+
+    variants = {
+        "uncached_loader": with_engine(_template_engine(cached=False)),
+        "cached_loader": with_engine(_template_engine(cached=True)),
+        "card_cache_cold": cold,
+        "card_cache_warm": lambda: render_note_cards(notes),
+    }
+    results = {}
+    for name, render in variants.items():
+        render()  # Warm up (compile templates, fill the card cache).
+        latencies = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            render()
+            latencies.append(time.perf_counter() - started)
+        summary = summarize(latencies)
+        summary["ms_per_1000_cards"] = round(
+            summary["mean_ms"] * 1000 / len(notes), 3
+        )
+        results[name] = summary
+    get_card_cache().delete_many(keys)
+    return results
+
+
+def _edit_note(note, rng, edits):
+    """Saves `edits` one-word edits of a note; returns each save's time."""
+    latencies = []
+    for _ in range(edits):
+        words = note.content.split()
+        words[rng.randrange(len(words))] = rng.choice(REVISION_WORDS)
+        note.content = " ".join(words)
+        started = time.perf_counter()
+        note.save()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def benchmark_revisions(edits=200, rounds=5):
+    """
+    Measures the cost of the revision history.
+
+    A note of about 400 characters gets one word changed per save:
+    → "save_without_revisions": `edits` saves with the history turned
+      off, the baseline.
+    → "save_with_revisions": `edits` saves recording a revision each.
+    → "save_with_long_history": `edits` more saves after another
+      `edits * 4`, to show the cost does not grow with the history.
+    → "history_page" and "rebuild_version": reading the newest page of
+      history and rebuilding the version furthest from a keyframe,
+      `rounds` times each.
+    → "storage": bytes stored for the revisions against full copies of
+      every version.
+
+    Args:
+        edits (int): Saves per measured phase.
+        rounds (int): Reads per read benchmark.
+
+    Returns:
+        dict: `summarize` results per phase, "overhead_ms" (mean save
+        time added by a revision) and "storage".
+    """
+    rng = random.Random(edits)
+    content = " ".join(rng.choice(REVISION_WORDS) for _ in range(60))
+    note = Note.objects.create(
+        owner=benchmark_user(), title="Revision benchmark", content=content
+    )
+    results = {}
+    post_save.disconnect(record_note_revision, sender=Note)
+    try:
+        results["save_without_revisions"] = summarize(
+            _edit_note(note, rng, edits)
+        )
+    finally:
+        post_save.connect(record_note_revision, sender=Note)
+    results["save_with_revisions"] = summarize(_edit_note(note, rng, edits))
+    _edit_note(note, rng, edits * 4)
+    results["save_with_long_history"] = summarize(
+        _edit_note(note, rng, edits)
+    )
+    results["overhead_ms"] = round(
+        results["save_with_long_history"]["mean_ms"]
+        - results["save_without_revisions"]["mean_ms"],
+        3,
+    )
+
+    revisions = NoteRevision.objects.filter(note=note)
+    latest = revisions.order_by("-number").first().number
+    interval = get_keyframe_interval()
+    furthest = max(1, latest - (latest - 1) % interval - 1)
+    for name, read in (
+        ("history_page", lambda: revision_page(note)),
+        ("rebuild_version", lambda: get_version(note, furthest)),
+    ):
+        latencies = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            read()
+            latencies.append(time.perf_counter() - started)
+        results[name] = summarize(latencies)
+
+    stored = sum(
+        len(data) for data in revisions.values_list("data", flat=True)
+    )
+    full = sum(
+        len(version.title.encode()) + len(version.content.encode())
+        for version in revision_page(note, page_size=latest).versions
+    )
+    results["storage"] = {
+        "revisions": latest,
+        "keyframe_interval": interval,
+        "stored_bytes": stored,
+        "full_copy_bytes": full,
+        "ratio": round(stored / full, 3) if full else 0.0,
+    }
+    note.delete()
+    return results
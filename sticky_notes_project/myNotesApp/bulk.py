@@ -0,0 +1,139 @@
+"""
+This file implements bulk actions: pinning, unpinning, tagging and
+trashing many notes at once.
+
+The board's multi-select mode and the admin actions both go through
+`apply_bulk_action`, which turns one action on any number of notes into
+a handful of statements instead of a SELECT and a save per note.
+
+→ Each action is one `UPDATE ... WHERE id IN (...)` (tagging reads the
+  notes' current tags and adds one INSERT of the NoteTag rows), run in
+  a transaction per batch of at
+  most `NOTES_BULK_MAX_NOTES` notes. The board never sends more than
+  one batch; larger admin selections are split, so no transaction holds
+  the write lock for long.
+→ update() sends no signals, so the list cache is invalidated here, and
+  each affected board gets a single "reset" event instead of one event
+  per note.
+→ Trashing sets `deleted_at` and stamps `updated_at`, exactly like
+  deleting one note, so the notes can be restored from the trash (see
+  trash.py).
+→ Tagging follows the limit of the note form: a note that would end up
+  with more than `MAX_TAGS_PER_NOTE` tags is left unchanged (and not
+  counted), so it can still be saved from its edit form.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import bump_notes_version
+from .events import publish_reset
+from .models import Note, NoteTag
+from .tags import MAX_TAGS_PER_NOTE, get_or_create_tags
+
+DEFAULT_MAX_BULK = 500
+
+ACTION_PIN = "pin"
+ACTION_UNPIN = "unpin"
+ACTION_TAG = "tag"
+ACTION_TRASH = "delete"
+
+ACTION_CHOICES = [
+    (ACTION_PIN, "Pin"),
+    (ACTION_UNPIN, "Unpin"),
+    (ACTION_TAG, "Add tags"),
+    (ACTION_TRASH, "Move to trash"),
+]
+
+
+def get_bulk_limit():
+    """Returns the maximum number of notes per bulk action batch."""
+    return getattr(settings, "NOTES_BULK_MAX_NOTES", DEFAULT_MAX_BULK)
+
+
+def _pin(notes, tags, now):
+    return notes.update(pinned=True, updated_at=now)
+
+
+def _unpin(notes, tags, now):
+    return notes.update(pinned=False, updated_at=now)
+
+
+def _trash(notes, tags, now):
+    return notes.update(deleted_at=now, updated_at=now)
+
+
+def _tag(notes, tags, now):
+    rows = list(notes.values_list("pk", "owner_id"))
+    current = {pk: set() for pk, _ in rows}
+    existing = NoteTag.objects.filter(note_id__in=current)
+    for note_id, tag_id in existing.values_list("note_id", "tag_id"):
+        current[note_id].add(tag_id)
+    links, tagged = [], []
+    for pk, owner_id in rows:
+        new = [tag for tag in tags[owner_id] if tag.pk not in current[pk]]
+        if len(current[pk]) + len(new) > MAX_TAGS_PER_NOTE:
+            continue
+        links.extend(NoteTag(note_id=pk, tag=tag) for tag in new)
+        tagged.append(pk)
+    # A link added by a concurrent edit is skipped by the unique constraint.
+    NoteTag.objects.bulk_create(links, ignore_conflicts=True)
+    return notes.filter(pk__in=tagged).update(updated_at=now)
+
+
+_ACTIONS = {
+    ACTION_PIN: _pin,
+    ACTION_UNPIN: _unpin,
+    ACTION_TAG: _tag,
+    ACTION_TRASH: _trash,
+}
+
+
+def apply_bulk_action(queryset, action, tag_names=(), batch_size=None):
+    """
+    Applies one action to the live notes of a queryset.
+
+    Args:
+        queryset (QuerySet): The selected notes, e.g. one user's notes
+            filtered by id. Notes in the trash are left alone.
+        action (str): One of the `ACTION_CHOICES` values.
+        tag_names (list): Normalised names of the tags to add, for
+            `ACTION_TAG`; the owners' missing tags are created.
+        batch_size (int | None): Notes per statement and transaction;
+            defaults to `NOTES_BULK_MAX_NOTES`.
+
+    Returns:
+        int: The number of notes changed.
+
+    Raises:
+        ValueError: If the action is unknown.
+    """
+    if action not in _ACTIONS:
+        raise ValueError(f"Unknown bulk action: {action!r}")
+    batch_size = batch_size or get_bulk_limit()
+    rows = list(queryset.live().order_by("pk").values_list("pk", "owner_id"))
+    owner_ids = sorted({owner_id for _, owner_id in rows})
+    tags = {}
+    if action == ACTION_TAG:
+        tags = {
+            owner_id: get_or_create_tags(owner_id, tag_names)
+            for owner_id in owner_ids
+        }
+
+    changed = 0
+    for start in range(0, len(rows), batch_size):
+        ids = [pk for pk, _ in rows[start:start + batch_size]]
+        with transaction.atomic():
+            changed += _ACTIONS[action](
+                Note.objects.live().filter(pk__in=ids), tags, timezone.now()
+            )
+    if changed:
+        bump_notes_version()
+        for owner_id in owner_ids:
+            publish_reset(owner_id)
+    return changed
+
+
+aapply_bulk_action = sync_to_async(apply_bulk_action)
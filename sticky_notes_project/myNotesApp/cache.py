@@ -0,0 +1,317 @@
+"""
+This file provides versioned caching for the note list.
+
+A single "notes version" counter is stored in the cache. Every write to a
+note bumps it (see `signals.py`), and every cached page of the note list
+is keyed on the current version, so stale entries are simply never read
+again and expire on their own. No explicit key deletion is needed.
+
+→ If the counter itself is evicted (a file-based cache culls entries at
+  random once it is full), it restarts from the current time in
+  nanoseconds rather than from a constant, so a version number is never
+  reused while pages cached under it could still be read.
+
+→ `NOTES_CACHE_MODE` selects what is cached: "queryset" stores the page of
+  notes, "fragment" stores the rendered card markup, and None disables the
+  cache.
+→ `NOTES_CACHE_ALIAS` selects the cache from `CACHES`. Use a file-based or
+  shared cache when running several worker processes, so they all see the
+  same version counter. With a per-process cache, a write handled by one
+  worker leaves the others serving their old pages until they expire
+  (the production settings share a file-based cache).
+→ Hit and miss counters are kept per process for monitoring.
+→ With a read replica, list entries built from the replica are also keyed
+  on the replica refresh they were read from (see replica.py).
+
+Below the page level, each rendered note card is cached on its own, keyed
+on the note's (pk, updated_at). When one note changes, the next page
+render only re-renders that card; the others come from one `get_many`.
+`NOTES_CARD_CACHE` turns this off. A card key never points at stale
+markup, so `NOTES_CARD_CACHE_ALIAS` can name a faster per-process cache
+than the shared one holding the version and the pages.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .replica import read_generation
+
+VERSION_KEY = "notes:version"
+
+CARD_TEMPLATE = "myNotesApp/_note_card.html"
+CARDS_TEMPLATE = "myNotesApp/_note_cards.html"
+# Bump when _note_card.html changes, so cards cached by the previous
+# release are not served.
+CARD_CACHE_VERSION = 3
+DEFAULT_CARD_TIMEOUT = 24 * 60 * 60
+
+_stats = {"hits": 0, "misses": 0, "card_hits": 0, "card_misses": 0}
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Returns the cache used for notes.
+
+    Returns:
+        BaseCache: The cache named by `NOTES_CACHE_ALIAS`.
+    """
+    return caches[getattr(settings, "NOTES_CACHE_ALIAS", "default")]
+
+
+def get_card_cache():
+    """
+    Returns the cache used for rendered note cards.
+
+    Returns:
+        BaseCache: The cache named by `NOTES_CARD_CACHE_ALIAS`, or the
+        notes cache when it is not set.
+    """
+    alias = getattr(settings, "NOTES_CARD_CACHE_ALIAS", None)
+    return caches[alias] if alias else get_cache()
+
+
+def get_cache_mode():
+    """
+    Returns the configured cache mode.
+
+    Returns:
+        str | None: "queryset", "fragment", or None when caching is off.
+    """
+    return getattr(settings, "NOTES_CACHE_MODE", None)
+
+
+def get_notes_version():
+    """
+    Returns the current notes version, initialising it if needed.
+
+    Returns:
+        int: The version counter.
+    """
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = _seed_notes_version(cache)
+    return version
+
+
+def bump_notes_version():
+    """
+    Increments the notes version so every cached list entry goes stale.
+
+    Returns:
+        int: The new version.
+    """
+    cache = get_cache()
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        # The counter was evicted or never set: start a fresh one.
+        return _seed_notes_version(cache)
+
+
+def _seed_notes_version(cache):
+    """
+    Starts the version counter at a value no earlier counter has used.
+
+    Counters only grow by one per write, so the clock in nanoseconds is
+    always ahead of any version handed out before the eviction.
+    """
+    seed = time.time_ns()
+    cache.add(VERSION_KEY, seed, timeout=None)
+    return cache.get(VERSION_KEY, seed)
+
+
+def list_cache_key(*parts):
+    """
+    Builds a cache key for a note list entry at the current version.
+
+    Args:
+        *parts: Values that identify the entry (cursor, page size, ...).
+
+    Returns:
+        str: The cache key.
+    """
+    version = f"{get_notes_version()}{read_generation()}"
+    suffix = ":".join(str(part) for part in parts)
+    return f"notes:list:{get_cache_mode()}:{version}:{suffix}"
+
+
+def get_or_build(key, build):
+    """
+    Returns a cached value, building and storing it on a miss.
+
+    Args:
+        key (str): The cache key.
+        build (callable): Produces the value on a cache miss.
+
+    Returns:
+        object: The cached or freshly built value.
+    """
+    cache = get_cache()
+    value = cache.get(key)
+    if value is not None:
+        _count("hits")
+        return value
+    _count("misses")
+    value = build()
+    cache.set(key, value, getattr(settings, "NOTES_CACHE_TIMEOUT", 300))
+    return value
+
+
+async def aget_or_build(key, build):
+    """
+    Async version of `get_or_build` for async views.
+
+    Args:
+        key (str): The cache key (see `alist_cache_key`).
+        build (callable): Coroutine function producing the value on a
+            cache miss.
+
+    Returns:
+        object: The cached or freshly built value.
+    """
+    cache = get_cache()
+    value = await cache.aget(key)
+    if value is not None:
+        _count("hits")
+        return value
+    _count("misses")
+    value = await build()
+    await cache.aset(
+        key, value, getattr(settings, "NOTES_CACHE_TIMEOUT", 300)
+    )
+    return value
+
+
+async def alist_cache_key(*parts):
+    """
+    Async version of `list_cache_key` for async views.
+
+    Args:
+        *parts: Values that identify the entry (cursor, page size, ...).
+
+    Returns:
+        str: The cache key.
+    """
+    cache = get_cache()
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        version = get_notes_version()
+    version = f"{version}{read_generation()}"
+    suffix = ":".join(str(part) for part in parts)
+    return f"notes:list:{get_cache_mode()}:{version}:{suffix}"
+
+
+def note_card_key(note):
+    """
+    Builds the cache key of a rendered note card.
+
+    Every write to a note moves `updated_at` (saves, the pin toggle, tag
+    changes and the API's bulk updates all stamp it), so a changed note
+    never matches its old key.
+
+    Args:
+        note (Note): A note with at least `pk` and `updated_at` loaded.
+
+    Returns:
+        str: The cache key.
+    """
+    stamp = note.updated_at.timestamp()
+    return f"notes:card:{CARD_CACHE_VERSION}:{note.pk}:{stamp}"
+
+
+def _render_cards(notes, cached):
+    """Joins cached cards with freshly rendered ones, in order."""
+    html, missing = [], {}
+    for note in notes:
+        key = note_card_key(note)
+        card = cached.get(key)
+        if card is None:
+            card = missing[key] = render_to_string(
+                CARD_TEMPLATE, {"note": note}
+            )
+        html.append(card)
+    _count("card_hits", len(notes) - len(missing))
+    _count("card_misses", len(missing))
+    return mark_safe("".join(html)), missing
+
+
+def _card_cache_enabled(notes):
+    return notes and getattr(settings, "NOTES_CARD_CACHE", True)
+
+
+def _card_timeout():
+    return getattr(settings, "NOTES_CARD_CACHE_TIMEOUT", DEFAULT_CARD_TIMEOUT)
+
+
+def render_note_cards(notes):
+    """
+    Renders the cards of a page, reusing cached cards of unchanged notes.
+
+    Args:
+        notes (list): The notes of the page.
+
+    Returns:
+        SafeString: The card markup, like `_note_cards.html` renders it.
+    """
+    if not _card_cache_enabled(notes):
+        return render_to_string(CARDS_TEMPLATE, {"notes": notes})
+    cache = get_card_cache()
+    cached = cache.get_many([note_card_key(note) for note in notes])
+    html, missing = _render_cards(notes, cached)
+    if missing:
+        cache.set_many(missing, _card_timeout())
+    return html
+
+
+async def arender_note_cards(notes):
+    """
+    Async version of `render_note_cards` for async views.
+
+    Args:
+        notes (list): The notes of the page.
+
+    Returns:
+        SafeString: The card markup.
+    """
+    if not _card_cache_enabled(notes):
+        return render_to_string(CARDS_TEMPLATE, {"notes": notes})
+    cache = get_card_cache()
+    cached = await cache.aget_many([note_card_key(note) for note in notes])
+    html, missing = _render_cards(notes, cached)
+    if missing:
+        await cache.aset_many(missing, _card_timeout())
+    return html
+
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def cache_stats():
+    """
+    Returns the hit and miss counters of this process.
+
+    Returns:
+        dict: {"hits": int, "misses": int, "hit_ratio": float} for note
+        list pages, plus "card_hits" and "card_misses" for single cards.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    total = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = stats["hits"] / total if total else 0.0
+    return stats
+
+
+def reset_cache_stats():
+    """Resets the hit and miss counters of this process."""
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
@@ -0,0 +1,190 @@
+"""
+This file computes the HTTP validators (ETag and Last-Modified) used for
+conditional GET requests on the note list and detail pages.
+
+Polling clients send the validators of their cached copy back in
+`If-None-Match` / `If-Modified-Since`. When nothing changed, Django's
+`condition` decorator answers 304 Not Modified without running the view,
+so no template is rendered.
+
+→ The detail page is validated with the note's `updated_at`.
+→ The list page is validated with the newest `updated_at` plus the row
+  count (so deletes change it too), fetched in one aggregate query and
+  memoised on the request.
+→ The list has an ETag only. The newest `updated_at` does not move when
+  a note is deleted and moves back when the newest one is trashed, so
+  as a Last-Modified time it would answer 304 for a changed board to a
+  client sending only `If-Modified-Since`.
+→ Only the signed-in user's notes are looked at, so another user's note
+  has no validators and the view answers 404.
+→ Pages showing flash messages (e.g. the result of a bulk action that
+  redirected here) get no validators and are never answered with a 304,
+  so the message is shown now and not cached with the page.
+→ Both pages render forms carrying the CSRF token, which login rotates.
+  The ETags therefore include a hash of the user, the session key and
+  the CSRF secret: after signing in again the browser's copy no longer
+  matches and is replaced, instead of being revalidated with a 304 and
+  posting a stale token.
+"""
+
+import hashlib
+import zlib
+
+from django.contrib import messages
+from django.db.models import Count, Max
+from django.middleware.csrf import get_token
+
+from .models import Note
+
+
+def has_pending_messages(request):
+    """
+    Returns True if the page will show flash messages.
+
+    The messages are only looked at, not consumed.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        bool: True if messages are waiting to be displayed.
+    """
+    return len(messages.get_messages(request)) > 0
+
+
+def _session_tag(request, owner):
+    """Returns a short hash of the user, session and CSRF secret."""
+    # get_token() loads the CSRF secret into META, or creates it.
+    get_token(request)
+    session = getattr(request, "session", None)
+    digest = hashlib.blake2b(digest_size=8)
+    for part in (
+        owner.pk,
+        session.session_key if session is not None else None,
+        request.META.get("CSRF_COOKIE"),
+    ):
+        digest.update(f"{part}\0".encode())
+    return digest.hexdigest()
+
+
+def _detail_etag(request, owner, pk, updated_at):
+    if updated_at is None:
+        return None
+    stamp = updated_at.timestamp()
+    return f"note-{pk}-{stamp:.6f}-{_session_tag(request, owner)}"
+
+
+def _list_etag(request, owner, state):
+    last = state["last"].timestamp() if state["last"] else 0
+    query = zlib.crc32(request.META.get("QUERY_STRING", "").encode())
+    session = _session_tag(request, owner)
+    return f"notes-{state['count']}-{last:.6f}-{query:x}-{session}"
+
+
+def _detail_updated_at(request, pk):
+    if not hasattr(request, "_note_updated_at"):
+        request._note_updated_at = (
+            Note.objects.live().filter(pk=pk, owner=request.user)
+            .values_list("updated_at", flat=True)
+            .first()
+        )
+    return request._note_updated_at
+
+
+def note_detail_etag(request, pk):
+    """
+    Returns the ETag of a note detail page.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        pk (int): The primary key of the note.
+
+    Returns:
+        str | None: The ETag, or None if the note does not exist,
+        belongs to another user or messages are pending.
+    """
+    if has_pending_messages(request):
+        return None
+    updated_at = _detail_updated_at(request, pk)
+    return _detail_etag(request, request.user, pk, updated_at)
+
+
+def note_detail_last_modified(request, pk):
+    """
+    Returns the Last-Modified time of a note detail page.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        pk (int): The primary key of the note.
+
+    Returns:
+        datetime | None: The note's `updated_at`, or None if messages are
+        pending.
+    """
+    if has_pending_messages(request):
+        return None
+    return _detail_updated_at(request, pk)
+
+
+def _list_state(request):
+    if not hasattr(request, "_notes_list_state"):
+        request._notes_list_state = Note.objects.live().filter(
+            owner=request.user
+        ).aggregate(last=Max("updated_at"), count=Count("id"))
+    return request._notes_list_state
+
+
+def note_list_etag(request):
+    """
+    Returns the ETag of the note list page.
+
+    The query string is part of the tag so that every page of the list
+    has its own validator, and so is the session (see `_session_tag`).
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        str | None: The ETag, or None if messages are pending.
+    """
+    if has_pending_messages(request):
+        return None
+    return _list_etag(request, request.user, _list_state(request))
+
+
+async def adetail_validators(request, pk, owner):
+    """
+    Async counterpart of the detail validators, for async views.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        pk (int): The primary key of the note.
+        owner (User): The signed-in user.
+
+    Returns:
+        tuple: (etag, last_modified), both None if the note is missing or
+        belongs to another user.
+    """
+    updated_at = await (
+        Note.objects.live().filter(pk=pk, owner=owner)
+        .values_list("updated_at", flat=True)
+        .afirst()
+    )
+    return _detail_etag(request, owner, pk, updated_at), updated_at
+
+
+async def alist_etag(request, owner):
+    """
+    Async counterpart of `note_list_etag`, for async views.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        owner (User): The signed-in user.
+
+    Returns:
+        str: The ETag of the note list page.
+    """
+    state = await Note.objects.live().filter(owner=owner).aaggregate(
+        last=Max("updated_at"), count=Count("id")
+    )
+    return _list_etag(request, owner, state)
@@ -0,0 +1,221 @@
+"""
+This file tunes SQLite connections when Django opens them.
+
+→ `configure_sqlite` is connected to `connection_created` (see apps.py)
+  and applies the PRAGMAs from `settings.SQLITE_PRAGMAS` to every new
+  SQLite connection: WAL journaling so readers never block writers,
+  `synchronous=NORMAL` (safe with WAL), a busy timeout so writers wait for
+  the lock instead of failing with "database is locked", and larger
+  mmap/page caches.
+→ Connections to other database backends are left untouched.
+
+It also owns the SQLite triggers on the note table: the full-text index
+triggers (migration 0004) and the change sequence triggers (migration
+0006). SQLite drops a table's triggers whenever a migration rebuilds the
+table (e.g. to add a column), so `ensure_note_triggers` recreates any
+missing trigger after every `migrate` (see apps.py).
+
+→ Trigger SQL must match the schema it is created on: SQLite refuses to
+  rename a table while any trigger refers to a missing column. The
+  tombstone trigger therefore only records the note owner once
+  migration 0008 has added the owner columns, and is replaced when an
+  older version of it is found.
+"""
+
+from django.conf import settings
+
+# Applied when the setting is missing.
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -20000,
+    "mmap_size": 134217728,
+    "temp_store": "MEMORY",
+}
+
+
+def apply_pragmas(cursor, pragmas):
+    """
+    Runs `PRAGMA name = value` for each entry.
+
+    Args:
+        cursor: A DB-API cursor on an SQLite connection.
+        pragmas (dict): PRAGMA names and values. Entries whose value is
+            None are skipped.
+    """
+    for name, value in pragmas.items():
+        if value is None:
+            continue
+        cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    `connection_created` receiver that applies `SQLITE_PRAGMAS`.
+
+    Args:
+        sender: The database wrapper class.
+        connection (BaseDatabaseWrapper): The new connection.
+    """
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", DEFAULT_PRAGMAS)
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, pragmas)
+
+
+SEQ = "(SELECT change_seq FROM myNotesApp_syncstate WHERE id = 1)"
+BUMP_SEQ = (
+    "UPDATE myNotesApp_syncstate SET change_seq = change_seq + 1 "
+    "WHERE id = 1;"
+)
+
+FTS_TRIGGERS = {
+    "myNotesApp_note_fts_ai": """
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_fts_ai
+    AFTER INSERT ON myNotesApp_note BEGIN
+        INSERT INTO myNotesApp_note_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    "myNotesApp_note_fts_ad": """
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_fts_ad
+    AFTER DELETE ON myNotesApp_note BEGIN
+        INSERT INTO myNotesApp_note_fts(myNotesApp_note_fts, rowid, title,
+                                        content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    "myNotesApp_note_fts_au": """
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_fts_au
+    AFTER UPDATE OF title, content ON myNotesApp_note BEGIN
+        INSERT INTO myNotesApp_note_fts(myNotesApp_note_fts, rowid, title,
+                                        content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO myNotesApp_note_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+}
+
+# Inserts and updates take the next sequence value; deletes record it in a
+# tombstone. The update trigger skips its own change_seq write (whose new
+# value is the current sequence) but fires for every other update,
+# including model saves that write back a stale change_seq.
+SEQ_TRIGGERS = {
+    "myNotesApp_note_seq_ai": f"""
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_seq_ai
+    AFTER INSERT ON myNotesApp_note BEGIN
+        {BUMP_SEQ}
+        UPDATE myNotesApp_note SET change_seq = {SEQ} WHERE id = new.id;
+    END
+    """,
+    "myNotesApp_note_seq_au": f"""
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_seq_au
+    AFTER UPDATE ON myNotesApp_note
+    WHEN new.change_seq = old.change_seq OR new.change_seq < {SEQ}
+    BEGIN
+        {BUMP_SEQ}
+        UPDATE myNotesApp_note SET change_seq = {SEQ} WHERE id = new.id;
+    END
+    """,
+    "myNotesApp_note_seq_ad": f"""
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_seq_ad
+    AFTER DELETE ON myNotesApp_note BEGIN
+        {BUMP_SEQ}
+        INSERT INTO myNotesApp_notetombstone
+            (note_id, owner_id, change_seq, deleted_at)
+        VALUES (old.id, old.owner_id, {SEQ},
+                strftime('%Y-%m-%d %H:%M:%f', 'now'));
+    END
+    """,
+}
+
+# The tombstone trigger of migrations 0006 and 0007, before notes had an
+# owner.
+UNOWNED_TOMBSTONE_TRIGGER = f"""
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_seq_ad
+    AFTER DELETE ON myNotesApp_note BEGIN
+        {BUMP_SEQ}
+        INSERT INTO myNotesApp_notetombstone (note_id, change_seq, deleted_at)
+        VALUES (old.id, {SEQ}, strftime('%Y-%m-%d %H:%M:%f', 'now'));
+    END
+    """
+
+
+def _existing(cursor, kind):
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = %s", [kind])
+    return {name for (name,) in cursor.fetchall()}
+
+
+def _columns(cursor, table):
+    cursor.execute(f'PRAGMA table_info("{table}")')
+    return {row[1] for row in cursor.fetchall()}
+
+
+def _has_owners(cursor):
+    """Whether the note and tombstone tables have their owner columns."""
+    return all(
+        "owner_id" in _columns(cursor, table)
+        for table in ("myNotesApp_note", "myNotesApp_notetombstone")
+    )
+
+
+def ensure_note_triggers(connection):
+    """
+    Creates the note table triggers that are missing.
+
+    The full-text index is rebuilt when its triggers had to be recreated,
+    since writes in between were not indexed. Triggers whose tables do not
+    exist yet (before migrations 0004 and 0006) are skipped, and a
+    tombstone trigger written for an older schema is replaced.
+
+    Args:
+        connection (BaseDatabaseWrapper): The database connection.
+
+    Returns:
+        list: Names of the triggers created.
+    """
+    if connection.vendor != "sqlite":
+        return []
+    with connection.cursor() as cursor:
+        tables = _existing(cursor, "table")
+        triggers = _existing(cursor, "trigger")
+        wanted = {}
+        if "myNotesApp_note_fts" in tables:
+            wanted.update(FTS_TRIGGERS)
+        if "myNotesApp_syncstate" in tables:
+            wanted.update(SEQ_TRIGGERS)
+            if not _has_owners(cursor):
+                wanted["myNotesApp_note_seq_ad"] = UNOWNED_TOMBSTONE_TRIGGER
+            elif "myNotesApp_note_seq_ad" in triggers:
+                cursor.execute(
+                    "SELECT sql FROM sqlite_master WHERE name = %s",
+                    ["myNotesApp_note_seq_ad"],
+                )
+                if "owner_id" not in cursor.fetchone()[0]:
+                    cursor.execute("DROP TRIGGER myNotesApp_note_seq_ad")
+                    triggers.discard("myNotesApp_note_seq_ad")
+        created = [name for name in wanted if name not in triggers]
+        for name in created:
+            cursor.execute(wanted[name])
+        if any(name in FTS_TRIGGERS for name in created):
+            cursor.execute(
+                "INSERT INTO myNotesApp_note_fts(myNotesApp_note_fts) "
+                "VALUES ('rebuild')"
+            )
+    return created
+
+
+def restore_note_triggers(sender, using, **kwargs):
+    """
+    `post_migrate` receiver that runs `ensure_note_triggers`.
+
+    Args:
+        sender (AppConfig): The migrated app.
+        using (str): The database alias.
+    """
+    from django.db import connections
+
+    ensure_note_triggers(connections[using])
@@ -0,0 +1,485 @@
+"""
+This file publishes note changes as live-update events for the board.
+
+Every create, update, pin and delete of a note is turned into a small
+event (the note id, its pinned flag and the rendered card) and appended to
+an event log. The `note_events` views stream the log to browsers as
+Server-Sent Events, and scripts.js applies each event to the board.
+
+→ `NOTES_EVENTS_BACKEND` selects the log. `DatabaseEventBackend` (the
+  default) stores events in the `NoteEvent` table, so every worker process
+  sees every event. `MemoryEventBackend` keeps them in a ring buffer and
+  only works with a single process.
+→ Event ids are increasing cursors. A reconnecting client sends the last
+  id it saw (`Last-Event-ID`) and only receives what it missed. When the
+  events it missed were already compacted away, it gets a "reset" event
+  and reloads the list instead.
+→ Every event carries the owner of its note, and each stream only reads
+  the events of its user plus those without an owner (e.g. a "reset"
+  for everyone).
+→ Streams waiting for events are woken in-process as soon as an event is
+  published, and poll the log every `NOTES_EVENTS_POLL_INTERVAL` seconds
+  to pick up events published by other processes.
+"""
+
+import asyncio
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min, Q
+from django.http import StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import NoteEvent
+
+DEFAULT_BACKEND = "myNotesApp.events.DatabaseEventBackend"
+DEFAULT_RETENTION = 3600
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_HEARTBEAT = 15
+DEFAULT_STREAM_SECONDS = 300
+
+# Events read from the log per query.
+READ_BATCH = 100
+# The database log is compacted once every this many events.
+COMPACT_EVERY = 100
+# How long browsers wait before reconnecting, in milliseconds.
+RETRY_MS = 2000
+
+KINDS = ("created", "updated", "pinned", "deleted", "reset")
+
+
+@dataclass
+class Event:
+    """
+    One change of the board.
+
+    Attributes:
+        id (int): The cursor of the event in the log.
+        kind (str): One of `KINDS`.
+        note_id (int): The note that changed (0 for "reset").
+        data (dict): What the client needs to apply the change.
+        created (float): When the event was published (epoch seconds).
+        owner_id (int | None): The user whose board changed; None for
+            every board.
+    """
+    id: int
+    kind: str
+    note_id: int
+    data: dict = field(default_factory=dict)
+    created: float = 0.0
+    owner_id: int = None
+
+    def visible_to(self, owner_id):
+        """Whether the stream of `owner_id` (None: all) receives it."""
+        return owner_id is None or self.owner_id in (None, owner_id)
+
+    def to_sse(self):
+        """
+        Formats the event for a text/event-stream response.
+
+        Returns:
+            str: The `id:` and `data:` lines followed by a blank line.
+        """
+        payload = {"type": self.kind, "id": self.note_id, **self.data}
+        return f"id: {self.id}\ndata: {json.dumps(payload)}\n\n"
+
+
+class Broker:
+    """
+    Wakes the streams of this process when an event is published.
+
+    Sync streams block on a condition variable; async streams await an
+    `asyncio.Event` that is set from any thread.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._waiters = set()
+        self._lock = threading.Lock()
+
+    def notify(self):
+        with self._condition:
+            self._condition.notify_all()
+        with self._lock:
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def wait(self, timeout):
+        with self._condition:
+            self._condition.wait(timeout)
+
+    async def await_event(self, timeout):
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+broker = Broker()
+
+
+class MemoryEventBackend:
+    """
+    Keeps the most recent `maxlen` events in this process only.
+    """
+    maxlen = 1000
+
+    def __init__(self):
+        self._events = deque(maxlen=self.maxlen)
+        # Millisecond-based ids keep growing across restarts, so a client
+        # never resumes from an id the new process has not reached yet.
+        self._ids = itertools.count(int(time.time() * 1000))
+        self._lock = threading.Lock()
+
+    def append(self, kind, note_id, data, owner_id=None):
+        with self._lock:
+            event = Event(
+                next(self._ids), kind, note_id, data, time.time(), owner_id
+            )
+            self._events.append(event)
+        if event.id % COMPACT_EVERY == 0:
+            self.compact(get_retention())
+        return event
+
+    def read(self, after_id=None, since=None, limit=READ_BATCH, owner_id=None):
+        with self._lock:
+            events = list(self._events)
+        if after_id is not None:
+            events = [event for event in events if event.id > after_id]
+        elif since is not None:
+            events = [event for event in events if event.created >= since]
+        events = [event for event in events if event.visible_to(owner_id)]
+        return events[:limit]
+
+    async def aread(
+        self, after_id=None, since=None, limit=READ_BATCH, owner_id=None
+    ):
+        return self.read(after_id, since, limit, owner_id)
+
+    def bounds(self):
+        """Returns the (oldest, latest) retained ids, or (None, None)."""
+        with self._lock:
+            if not self._events:
+                return None, None
+            return self._events[0].id, self._events[-1].id
+
+    async def abounds(self):
+        return self.bounds()
+
+    def compact(self, retention):
+        cutoff = time.time() - retention
+        with self._lock:
+            while self._events and self._events[0].created < cutoff:
+                self._events.popleft()
+
+
+class DatabaseEventBackend:
+    """
+    Stores events in the `NoteEvent` table, shared by all processes.
+
+    The table is an append-only log whose autoincrement primary key is the
+    cursor. Events older than `NOTES_EVENTS_RETENTION` seconds are deleted
+    every `COMPACT_EVERY` events.
+    """
+
+    def append(self, kind, note_id, data, owner_id=None):
+        row = NoteEvent.objects.create(
+            kind=kind, note_id=note_id, owner_id=owner_id, data=data
+        )
+        if row.pk % COMPACT_EVERY == 0:
+            self.compact(get_retention())
+        return self._event(row)
+
+    def read(self, after_id=None, since=None, limit=READ_BATCH, owner_id=None):
+        rows = self._rows(after_id, since, limit, owner_id)
+        return [self._event(row) for row in rows]
+
+    async def aread(
+        self, after_id=None, since=None, limit=READ_BATCH, owner_id=None
+    ):
+        return [
+            self._event(row)
+            async for row in self._rows(after_id, since, limit, owner_id)
+        ]
+
+    def bounds(self):
+        """Returns the (oldest, latest) retained ids, or (None, None)."""
+        ids = NoteEvent.objects.aggregate(oldest=Min("id"), latest=Max("id"))
+        return ids["oldest"], ids["latest"]
+
+    async def abounds(self):
+        ids = await NoteEvent.objects.aaggregate(
+            oldest=Min("id"), latest=Max("id")
+        )
+        return ids["oldest"], ids["latest"]
+
+    def compact(self, retention):
+        cutoff = timezone.now() - timedelta(seconds=retention)
+        NoteEvent.objects.filter(created_at__lt=cutoff).delete()
+
+    @staticmethod
+    def _rows(after_id, since, limit, owner_id):
+        rows = NoteEvent.objects.order_by("id")
+        if owner_id is not None:
+            rows = rows.filter(
+                Q(owner_id=owner_id) | Q(owner_id__isnull=True)
+            )
+        if after_id is not None:
+            rows = rows.filter(id__gt=after_id)
+        elif since is not None:
+            rows = rows.filter(
+                created_at__gte=datetime.fromtimestamp(
+                    since, tz=dt_timezone.utc
+                )
+            )
+        return rows[:limit]
+
+    @staticmethod
+    def _event(row):
+        return Event(
+            row.pk,
+            row.kind,
+            row.note_id,
+            row.data,
+            row.created_at.timestamp(),
+            row.owner_id,
+        )
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_event_backend():
+    """
+    Returns the event log named by `NOTES_EVENTS_BACKEND`.
+
+    Returns:
+        MemoryEventBackend | DatabaseEventBackend: One shared instance per
+        configured backend class.
+    """
+    path = getattr(settings, "NOTES_EVENTS_BACKEND", DEFAULT_BACKEND)
+    with _backends_lock:
+        backend = _backends.get(path)
+        if backend is None:
+            backend = _backends[path] = import_string(path)()
+        return backend
+
+
+def get_retention():
+    """Returns how many seconds of events are kept for reconnects."""
+    return getattr(settings, "NOTES_EVENTS_RETENTION", DEFAULT_RETENTION)
+
+
+def _append(kind, note_id, data, owner_id=None):
+    event = get_event_backend().append(kind, note_id, data, owner_id)
+    broker.notify()
+    return event
+
+
+def publish(kind, note):
+    """
+    Publishes a change of `note` once the current transaction commits.
+
+    Args:
+        kind (str): "created", "updated", "pinned" or "deleted".
+        note (Note): The changed note.
+    """
+    note_id, owner_id = note.pk, note.owner_id
+
+    def append():
+        data = {}
+        if kind != "deleted":
+            data = {
+                "pinned": note.pinned,
+                "html": render_to_string(
+                    "myNotesApp/_note_card.html", {"note": note}
+                ),
+            }
+        _append(kind, note_id, data, owner_id)
+
+    transaction.on_commit(append)
+
+
+apublish = sync_to_async(publish)
+
+
+def publish_reset(owner_id=None):
+    """
+    Tells clients to reload the list, for changes too large to send note
+    by note (e.g. an import).
+
+    Args:
+        owner_id (int | None): Only reset this user's boards; None resets
+            every board.
+    """
+    transaction.on_commit(lambda: _append("reset", 0, {}, owner_id))
+
+
+def _resume(bounds, last_id, since):
+    """
+    Works out where a stream starts.
+
+    Args:
+        bounds (tuple): (oldest, latest) ids retained in the log.
+        last_id (int | None): The `Last-Event-ID` sent by the client.
+        since (float | None): Epoch seconds the client's page was rendered.
+
+    Returns:
+        tuple: (after_id, since, reset). `reset` is the "reset" event to
+        send first when the client missed events that are gone, or None.
+    """
+    oldest, latest = bounds
+    if last_id is None:
+        return None, time.time() if since is None else since, None
+    if latest is not None and (
+        last_id > latest or (oldest is not None and last_id < oldest - 1)
+    ):
+        return latest, None, Event(latest, "reset", 0)
+    return last_id, None, None
+
+
+def _stream_settings():
+    stream_seconds = getattr(
+        settings, "NOTES_EVENTS_STREAM_SECONDS", DEFAULT_STREAM_SECONDS
+    )
+    return (
+        time.monotonic() + stream_seconds,
+        getattr(settings, "NOTES_EVENTS_HEARTBEAT", DEFAULT_HEARTBEAT),
+        getattr(
+            settings, "NOTES_EVENTS_POLL_INTERVAL", DEFAULT_POLL_INTERVAL
+        ),
+    )
+
+
+def parse_cursor(request):
+    """
+    Reads where the client wants its stream to start.
+
+    Args:
+        request (HttpRequest): The stream request. `Last-Event-ID` is sent
+            by browsers when they reconnect; the `last_event_id` and
+            `since` query parameters are set by scripts.js.
+
+    Returns:
+        tuple: (last_id, since); invalid values are ignored.
+    """
+    last_id = request.headers.get("Last-Event-ID") or request.GET.get(
+        "last_event_id"
+    )
+    since = request.GET.get("since")
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        last_id = None
+    try:
+        since = float(since) if since else None
+    except ValueError:
+        since = None
+    return last_id, since
+
+
+def stream_response(chunks):
+    """
+    Wraps SSE chunks in an uncached, unbuffered streaming response.
+
+    Args:
+        chunks (iterator | async iterator): From `iter_events` or
+            `aiter_events`.
+
+    Returns:
+        StreamingHttpResponse: A text/event-stream response.
+    """
+    response = StreamingHttpResponse(
+        chunks, content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # Stops nginx from buffering the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def iter_events(last_id=None, since=None, owner_id=None):
+    """
+    Streams events as text/event-stream chunks.
+
+    The stream ends after `NOTES_EVENTS_STREAM_SECONDS`; browsers then
+    reconnect with `Last-Event-ID` and resume where they left off, so a
+    worker is never held by one client forever. While nothing happens, a
+    comment line is sent every `NOTES_EVENTS_HEARTBEAT` seconds to keep
+    proxies from closing the connection.
+
+    Args:
+        last_id (int | None): Resume after this event id.
+        since (float | None): Without `last_id`, start with the events
+            published after this time (epoch seconds) instead of now.
+        owner_id (int | None): Only stream this user's events (and those
+            for every board); None streams all events.
+
+    Yields:
+        str: SSE fields, comments and events.
+    """
+    backend = get_event_backend()
+    deadline, heartbeat, poll = _stream_settings()
+    yield f"retry: {RETRY_MS}\n\n"
+    cursor, since, reset = _resume(backend.bounds(), last_id, since)
+    if reset is not None:
+        yield reset.to_sse()
+    quiet_since = time.monotonic()
+    while time.monotonic() < deadline:
+        events = backend.read(cursor, since, owner_id=owner_id)
+        for event in events:
+            yield event.to_sse()
+        if events:
+            cursor, since = events[-1].id, None
+            quiet_since = time.monotonic()
+            continue
+        if time.monotonic() - quiet_since >= heartbeat:
+            yield ": keepalive\n\n"
+            quiet_since = time.monotonic()
+        broker.wait(poll)
+
+
+async def aiter_events(last_id=None, since=None, owner_id=None):
+    """
+    Async version of `iter_events`, for the ASGI views.
+
+    Waiting clients only cost a coroutine, not a thread.
+    """
+    backend = get_event_backend()
+    deadline, heartbeat, poll = _stream_settings()
+    yield f"retry: {RETRY_MS}\n\n"
+    cursor, since, reset = _resume(await backend.abounds(), last_id, since)
+    if reset is not None:
+        yield reset.to_sse()
+    quiet_since = time.monotonic()
+    while time.monotonic() < deadline:
+        events = await backend.aread(cursor, since, owner_id=owner_id)
+        for event in events:
+            yield event.to_sse()
+        if events:
+            cursor, since = events[-1].id, None
+            quiet_since = time.monotonic()
+            continue
+        if time.monotonic() - quiet_since >= heartbeat:
+            yield ": keepalive\n\n"
+            quiet_since = time.monotonic()
+        await broker.await_event(poll)
@@ -4,10 +4,47 @@ and defensive programming (e.g. by cleaning inputs made).
 
 The clean methods ensure that empty inputs are caught and unnecessary
 whitespace removed.
+
+Tags are edited as one comma-separated text field. They are saved with
+the form's many-to-many data, after the note itself, so views that save
+with `commit=False` must call `save_m2m()`.
+
+`BulkActionForm` validates the multi-select form of the note list (see
+bulk.py).
 """
 
 from django import forms
+from django.utils.http import url_has_allowed_host_and_scheme
+from .bulk import ACTION_CHOICES, ACTION_TAG, get_bulk_limit
 from .models import Note
+from .tags import MAX_TAG_LENGTH, MAX_TAGS_PER_NOTE, parse_tags, set_note_tags
+
+
+def clean_tag_names(value):
+    """
+    Splits comma-separated tag names, normalises them and enforces the
+    length and count limits.
+
+    Args:
+        value (str): The tags as typed by the user.
+
+    Returns:
+        list: The distinct, normalised tag names.
+
+    Raises:
+        forms.ValidationError: If a tag is too long or there are too
+        many tags.
+    """
+    names = parse_tags((value or "").split(","))
+    if any(len(name) > MAX_TAG_LENGTH for name in names):
+        raise forms.ValidationError(
+            f"Tags can be at most {MAX_TAG_LENGTH} characters long."
+        )
+    if len(names) > MAX_TAGS_PER_NOTE:
+        raise forms.ValidationError(
+            f"A note can have at most {MAX_TAGS_PER_NOTE} tags."
+        )
+    return names
 
 
 class NoteForm(forms.ModelForm):
@@ -16,6 +53,11 @@ class NoteForm(forms.ModelForm):
     for the "title" and "content" attributes of the Note model and includes
     custom validation logic for these fields.
 
+    The "tags" field takes comma-separated tag names; the owner's tags are
+    created as needed when the form is saved. An edit form shows the
+    note's current tags, read from `instance.tags` (prefetch them to avoid
+    the query, e.g. in async views).
+
     Methods:
         clean_title():
             Validates the "title" field to ensure it is not empty. Strips any
@@ -25,7 +67,16 @@ class NoteForm(forms.ModelForm):
             Validates the "content" field to ensure it is not empty. Strips any
             leading or trailing whitespace from the input. Raises a
             ValidationError if the field is empty.
+        clean_tags():
+            Splits and normalises the tag names and enforces the length
+            and count limits.
     """
+    tags = forms.CharField(
+        required=False,
+        widget=forms.TextInput(attrs={"placeholder": "e.g. work, ideas"}),
+        help_text="Separate tags with commas.",
+    )
+
     class Meta:
         """
         Meta class for the form, specifying the model and the fields to
@@ -38,6 +89,14 @@ class NoteForm(forms.ModelForm):
         model = Note
         fields = ["title", "content"]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._creating = self.instance._state.adding
+        if self.instance.pk and not self.is_bound:
+            self.initial["tags"] = ", ".join(
+                sorted(tag.name for tag in self.instance.tags.all())
+            )
+
     def clean_title(self):
         """
         Validates and cleans the 'title' field in a form.
@@ -75,3 +134,132 @@ class NoteForm(forms.ModelForm):
         if not content:
             raise forms.ValidationError("Content cannot be empty.")
         return content.strip()
+
+    def clean_tags(self):
+        """
+        Validates and normalises the 'tags' field.
+
+        Returns:
+            list: The distinct, normalised tag names.
+
+        Raises:
+            forms.ValidationError: If a tag is too long or there are too
+            many tags.
+        """
+        return clean_tag_names(self.cleaned_data.get("tags"))
+
+    def _save_m2m(self):
+        """
+        Saves the tags after the note, skipping new notes without tags.
+        """
+        super()._save_m2m()
+        names = self.cleaned_data.get("tags") or []
+        if names or not self._creating:
+            set_note_tags(self.instance, names)
+
+
+class NoteIdsField(forms.Field):
+    """
+    A list of note ids, posted as repeated values (e.g. checkboxes).
+    """
+    widget = forms.MultipleHiddenInput
+    default_error_messages = {
+        "required": "Select at least one note.",
+        "invalid": "Notes are selected by their ids.",
+    }
+
+    def to_python(self, value):
+        """Returns the distinct ids as sorted integers."""
+        try:
+            return sorted({int(pk) for pk in value or []})
+        except (TypeError, ValueError):
+            raise forms.ValidationError(
+                self.error_messages["invalid"], code="invalid"
+            )
+
+
+class BulkActionForm(forms.Form):
+    """
+    BulkActionForm validates one action on the notes selected on the
+    board.
+
+    Methods:
+        clean_ids():
+            Rejects selections larger than `NOTES_BULK_MAX_NOTES`.
+        clean_tags():
+            Splits and normalises the tag names, as `NoteForm` does.
+        clean_next():
+            Keeps the page to return to only if it is on this site.
+        clean():
+            Requires at least one tag for the "tag" action.
+    """
+    action = forms.ChoiceField(
+        choices=ACTION_CHOICES,
+        widget=forms.Select(
+            attrs={
+                "class": "form-select form-select-sm",
+                "aria-label": "Action",
+            }
+        ),
+    )
+    ids = NoteIdsField()
+    tags = forms.CharField(
+        required=False,
+        widget=forms.TextInput(
+            attrs={
+                "class": "form-control form-control-sm",
+                "placeholder": "Tags to add",
+                "aria-label": "Tags to add",
+            }
+        ),
+    )
+    next = forms.CharField(required=False, widget=forms.HiddenInput)
+
+    def clean_ids(self):
+        """
+        Validates the size of the selection.
+
+        Returns:
+            list: The selected note ids.
+
+        Raises:
+            forms.ValidationError: If more notes are selected than one
+            bulk action may change.
+        """
+        ids = self.cleaned_data["ids"]
+        limit = get_bulk_limit()
+        if len(ids) > limit:
+            raise forms.ValidationError(
+                f"Select at most {limit} notes at a time."
+            )
+        return ids
+
+    def clean_tags(self):
+        """
+        Validates and normalises the 'tags' field.
+
+        Returns:
+            list: The distinct, normalised tag names.
+        """
+        return clean_tag_names(self.cleaned_data.get("tags"))
+
+    def clean_next(self):
+        """
+        Returns the relative URL to redirect to, or "" if it is missing
+        or points to another site.
+        """
+        url = self.cleaned_data.get("next", "")
+        if url_has_allowed_host_and_scheme(url, allowed_hosts=None):
+            return url
+        return ""
+
+    def clean(self):
+        """
+        Checks that the "tag" action names at least one tag.
+        """
+        cleaned_data = super().clean()
+        if cleaned_data.get("action") == ACTION_TAG and not cleaned_data.get(
+            "tags"
+        ):
+            self.add_error("tags", "Enter the tags to add.")
+        return cleaned_data
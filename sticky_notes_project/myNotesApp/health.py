@@ -0,0 +1,96 @@
+"""
+This file implements the readiness/health endpoint.
+
+Load balancers, container health checks and deploy scripts poll
+`/healthz/` to decide whether a worker may receive traffic.
+
+→ The database must answer a trivial query. This catches a missing or
+  locked database file and a broken volume mount.
+→ Every migration must be applied, so a new container is not sent
+  traffic before `migrate` has run. Once the check has passed, the
+  result is remembered for the rest of the process, so later polls cost
+  a single query.
+→ The response is JSON with one entry per check. It is 200 when all
+  checks pass and 503 otherwise, and is never cached.
+"""
+
+import logging
+
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_safe
+
+logger = logging.getLogger("myNotesApp.health")
+
+_migrated = set()
+
+
+def check_database(alias=DEFAULT_DB_ALIAS):
+    """
+    Runs `SELECT 1` on the database.
+
+    Args:
+        alias (str): The database alias.
+
+    Raises:
+        DatabaseError: If the database cannot be queried.
+    """
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+
+
+def check_migrations(alias=DEFAULT_DB_ALIAS):
+    """
+    Checks that the database schema is fully migrated.
+
+    Args:
+        alias (str): The database alias.
+
+    Returns:
+        list: Names of unapplied migrations, e.g. ["myNotesApp.0007"].
+    """
+    if alias in _migrated:
+        return []
+    executor = MigrationExecutor(connections[alias])
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    pending = [
+        f"{migration.app_label}.{migration.name}" for migration, _ in plan
+    ]
+    if not pending:
+        _migrated.add(alias)
+    return pending
+
+
+@never_cache
+@require_safe
+def health_view(request):
+    """
+    Reports whether this process can serve requests.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        JsonResponse: {"status": "ok" | "error", "checks": {...}} with
+        status 200 when every check passes and 503 otherwise.
+    """
+    checks = {}
+    try:
+        check_database()
+        checks["database"] = "ok"
+        pending = check_migrations()
+        checks["migrations"] = (
+            f"{len(pending)} unapplied" if pending else "ok"
+        )
+    except DatabaseError as exc:
+        logger.warning("Health check failed: %s", exc)
+        checks["database"] = f"error: {exc}"
+
+    healthy = all(result == "ok" for result in checks.values())
+    return JsonResponse(
+        {"status": "ok" if healthy else "error", "checks": checks},
+        status=200 if healthy else 503,
+    )
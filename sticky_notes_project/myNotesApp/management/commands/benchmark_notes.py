@@ -0,0 +1,238 @@
+"""
+Management command that benchmarks every note endpoint.
+
+→ A throwaway database is created (and migrated) for the run, seeded with
+  the chosen dataset, and destroyed afterwards. The real database is
+  never touched.
+→ `--owners` spreads the seeded notes over several users; requests are
+  sent as the one owning the first share, so the run shows how a board
+  behaves when other users own most of the table.
+→ `--trashed-ratio` puts a share of the seeded notes in the trash, to
+  check that the board and search do not slow down as the trash grows.
+→ Results are printed (or written with `--output`) as JSON.
+→ With `--baseline`, the command fails when any endpoint is slower than
+  the baseline by more than `--threshold`, so CI can catch regressions.
+→ With `--compare-servers`, the sync (WSGI) and async (ASGI) request
+  paths are compared under `--concurrency` slow clients instead.
+→ With `--compare-runserver`, `manage.py runserver` and the production
+  gunicorn server are started on the throwaway database and compared
+  over HTTP with `--concurrency` keep-alive clients.
+→ With `--render`, the time to render `--cards` note cards is measured
+  with and without the cached template loader and the per-card cache.
+→ With `--revisions`, `--iterations` edits of one note are saved with
+  and without the revision history, to check that recording a revision
+  adds a small, constant cost to the update path.
+
+Usage:
+    python manage.py benchmark_notes [--dataset small|medium|large]
+        [--notes 5000] [--pinned-ratio 0.05] [--owners 1]
+        [--trashed-ratio 0]
+        [--iterations 200]
+        [--no-cache] [--output bench.json]
+        [--baseline bench.json] [--threshold 0.2]
+    python manage.py benchmark_notes --compare-servers
+        [--concurrency 200] [--client-delay 0.05] [--iterations 10]
+    python manage.py benchmark_notes --compare-runserver
+        [--concurrency 16] [--iterations 50] [--workers 3]
+    python manage.py benchmark_notes --render [--cards 1000]
+        [--iterations 5]
+    python manage.py benchmark_notes --revisions [--iterations 200]
+"""
+
+import json
+import platform
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from myNotesApp.benchmark import (
+    ENDPOINTS,
+    benchmark_card_rendering,
+    benchmark_revisions,
+    compare_runserver,
+    compare_servers,
+    compare_to_baseline,
+    run_benchmarks,
+    seed_notes,
+)
+
+DATASETS = {"small": 1_000, "medium": 100_000, "large": 1_000_000}
+
+
+class Command(BaseCommand):
+    """
+    Seeds a throwaway database and benchmarks the note endpoints.
+    """
+    help = "Benchmark the note endpoints and emit JSON results."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dataset", choices=DATASETS, default="small"
+        )
+        parser.add_argument(
+            "--notes", type=int, help="Number of notes (overrides dataset)."
+        )
+        parser.add_argument("--pinned-ratio", type=float, default=0.05)
+        parser.add_argument(
+            "--owners",
+            type=int,
+            default=1,
+            help="Users the seeded notes are spread over.",
+        )
+        parser.add_argument(
+            "--trashed-ratio",
+            type=float,
+            default=0.0,
+            help="Share of the seeded notes that are in the trash.",
+        )
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument(
+            "--endpoint",
+            action="append",
+            choices=ENDPOINTS,
+            help="Only benchmark this endpoint (repeatable).",
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Disable the note list cache during the run.",
+        )
+        parser.add_argument("--output", help="Write the JSON here.")
+        parser.add_argument("--baseline", help="JSON of an earlier run.")
+        parser.add_argument("--threshold", type=float, default=0.2)
+        parser.add_argument("--metric", default="p50_ms")
+        parser.add_argument(
+            "--compare-servers",
+            action="store_true",
+            help="Compare the WSGI and ASGI request paths instead.",
+        )
+        parser.add_argument(
+            "--compare-runserver",
+            action="store_true",
+            help="Compare runserver with gunicorn over HTTP instead.",
+        )
+        parser.add_argument(
+            "--workers", type=int, help="gunicorn workers for the comparison."
+        )
+        parser.add_argument("--concurrency", type=int, default=200)
+        parser.add_argument(
+            "--client-delay",
+            type=float,
+            default=0.05,
+            help="Seconds each client idles between requests.",
+        )
+        parser.add_argument(
+            "--render",
+            action="store_true",
+            help="Benchmark note card rendering instead.",
+        )
+        parser.add_argument("--cards", type=int, default=1000)
+        parser.add_argument(
+            "--revisions",
+            action="store_true",
+            help="Benchmark saving notes with revision history instead.",
+        )
+
+    def handle(self, *args, **options):
+        notes = options["notes"] or DATASETS[options["dataset"]]
+        overrides = {"ALLOWED_HOSTS": [*settings.ALLOWED_HOSTS, "testserver"]}
+        if options["no_cache"]:
+            overrides["NOTES_CACHE_MODE"] = None
+
+        with tempfile.TemporaryDirectory() as tmp, override_settings(
+            **overrides
+        ):
+            test_settings = connection.settings_dict.setdefault("TEST", {})
+            test_settings["NAME"] = str(Path(tmp) / "benchmark.sqlite3")
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+            try:
+                started = time.perf_counter()
+                seed_notes(
+                    notes,
+                    options["pinned_ratio"],
+                    owners=options["owners"],
+                    trashed_ratio=options["trashed_ratio"],
+                )
+                seed_seconds = time.perf_counter() - started
+                self.stderr.write(
+                    f"Seeded {notes} notes in {seed_seconds:.1f}s."
+                )
+                if options["render"]:
+                    results = benchmark_card_rendering(
+                        options["cards"], options["iterations"]
+                    )
+                elif options["revisions"]:
+                    results = benchmark_revisions(options["iterations"])
+                elif options["compare_runserver"]:
+                    results = compare_runserver(
+                        options["concurrency"],
+                        options["iterations"],
+                        (options["endpoint"] or ["note_list"])[0],
+                        options["workers"],
+                    )
+                elif options["compare_servers"]:
+                    results = compare_servers(
+                        options["concurrency"],
+                        options["iterations"],
+                        options["client_delay"],
+                        (options["endpoint"] or ["note_list"])[0],
+                    )
+                else:
+                    results = run_benchmarks(
+                        options["iterations"],
+                        endpoints=options["endpoint"] or ENDPOINTS,
+                    )
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {
+            "dataset": {
+                "notes": notes,
+                "pinned_ratio": options["pinned_ratio"],
+                "owners": options["owners"],
+                "trashed_ratio": options["trashed_ratio"],
+                "iterations": options["iterations"],
+                "concurrency": (
+                    options["concurrency"]
+                    if options["compare_servers"]
+                    or options["compare_runserver"]
+                    else None
+                ),
+                "cache_mode": (
+                    None
+                    if options["no_cache"]
+                    else getattr(settings, "NOTES_CACHE_MODE", None)
+                ),
+            },
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+            },
+            "results": results,
+        }
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            Path(options["output"]).write_text(output + "\n")
+        else:
+            self.stdout.write(output)
+
+        if options["baseline"]:
+            baseline = json.loads(Path(options["baseline"]).read_text())
+            regressions = compare_to_baseline(
+                results,
+                baseline.get("results", {}),
+                options["threshold"],
+                options["metric"],
+            )
+            if regressions:
+                raise CommandError(
+                    "Benchmark regressions:\n" + "\n".join(regressions)
+                )
+            self.stderr.write("No regressions against the baseline.")
@@ -0,0 +1,29 @@
+"""
+Management command that compacts the delta sync tombstones.
+
+→ Deletes tombstones older than `--days` (default
+  `NOTES_TOMBSTONE_RETENTION_DAYS`). Clients that have not synced since
+  then are told to resynchronise from scratch.
+→ Meant to run periodically, e.g. from cron.
+
+Usage:
+    python manage.py compact_tombstones [--days 30]
+"""
+
+from django.core.management.base import BaseCommand
+
+from myNotesApp.sync import compact_tombstones
+
+
+class Command(BaseCommand):
+    """
+    Deletes old tombstones of deleted notes.
+    """
+    help = "Delete delta sync tombstones older than the retention period."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int)
+
+    def handle(self, *args, **options):
+        deleted = compact_tombstones(options["days"])
+        self.stdout.write(f"Compacted {deleted} tombstones.")
@@ -0,0 +1,228 @@
+"""
+Management command that prints EXPLAIN QUERY PLAN for the app's hot
+queries.
+
+→ Run it in CI with `--check` to fail the build when a hot query falls
+  back to a full table scan or a temporary sort (B-tree) instead of
+  reading an index.
+→ The queries are those of one user's board, as the views run them,
+  plus the trash page and the trash purge. Board queries must read the
+  partial indexes over live notes, so the trash never slows them down.
+→ Later pages must seek the index to their cursor: a plan constraining
+  only the owner walks every entry before the cursor, so it passes the
+  scan check while getting slower with each page.
+→ Tag filters and facets must read the (tag, note) index of the
+  NoteTag table.
+→ Recording a revision and reading a page of history must read the
+  (note, number) index of the NoteRevision table.
+→ Note search must run its MATCH once. A plan probing the FTS table by
+  rowid, once per note in scope, makes searches slower with every note
+  on the board. Sorting its hits by rank is the one temporary B-tree
+  allowed, since only the matches are sorted.
+
+Usage:
+    python manage.py explain_queries [--check]
+"""
+
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from myNotesApp.models import Note, NoteRevision, NoteTombstone
+from myNotesApp.pagination import (
+    NOTE_ORDERING,
+    REVERSE_ORDERING,
+    rows_after,
+    rows_before,
+)
+from myNotesApp.revisions import _chain_queryset, _latest_queryset
+from myNotesApp.search import FTS_TABLE, build_match_query, match_sql
+from myNotesApp.tags import (
+    MATCH_ALL,
+    MATCH_ANY,
+    TagFilter,
+    _facets_queryset,
+    filter_by_tags,
+)
+
+# Plan fragments that indicate a regression for a hot query.
+BAD_PLAN_MARKERS = (
+    "USE TEMP B-TREE",
+    "SCAN myNotesApp_note\n",
+    "SCAN myNotesApp_notetombstone\n",
+    "SCAN myNotesApp_notetag\n",
+    "SCAN myNotesApp_noterevision\n",
+)
+
+# An FTS5 plan constraining the rowid (`=` in its index string) probes
+# the full-text index once per rowid.
+FTS_ROWID_PROBE = re.compile(
+    rf"{FTS_TABLE} VIRTUAL TABLE INDEX \d+:\S*="
+)
+
+# Markers a query needs by design, by label.
+ALLOWED_PLAN_MARKERS = {
+    "note search": ("USE TEMP B-TREE",),
+}
+
+# Index constraints a query needs, by label: the cursor pages must seek
+# on the sort key after the owner, e.g. `(pinned,created_at)<(?,?)`.
+REQUIRED_PLAN_PATTERNS = {
+    "note_list next page": re.compile(
+        r"SEARCH .*\(owner_id=\? AND [^)]*created_at\)?<"
+    ),
+    "note_list previous page": re.compile(
+        r"SEARCH .*\(owner_id=\? AND [^)]*created_at\)?>"
+    ),
+}
+
+# Any id will do: plans do not depend on the value.
+OWNER_ID = 1
+
+
+def hot_queries():
+    """
+    Returns the hot queries of the app as (label, query) pairs.
+
+    Returns:
+        list: Querysets as executed by the views, or (sql, params) pairs
+        for raw SQL, in a stable order.
+    """
+    now = timezone.now()
+    owned = Note.objects.filter(owner_id=OWNER_ID)
+    notes = owned.live()
+    window = {"change_seq__gt": 0, "change_seq__lte": 100}
+    return [
+        ("note_list first page", notes.order_by(*NOTE_ORDERING)[:21]),
+        (
+            "note_list next page",
+            notes.filter(rows_after(False, now, 1)).order_by(
+                *NOTE_ORDERING
+            )[:21],
+        ),
+        (
+            "note_list previous page",
+            notes.filter(rows_before(False, now, 1)).order_by(
+                *REVERSE_ORDERING
+            )[:21],
+        ),
+        (
+            "pinned notes",
+            notes.filter(pinned=True).order_by("-created_at", "-id"),
+        ),
+        ("note_detail", notes.filter(pk=1)),
+        (
+            "tag filter all",
+            filter_by_tags(
+                notes, OWNER_ID, TagFilter(("work", "ideas"), MATCH_ALL)
+            ).order_by(*NOTE_ORDERING)[:21],
+        ),
+        (
+            "tag filter any",
+            filter_by_tags(
+                notes, OWNER_ID, TagFilter(("work", "ideas"), MATCH_ANY)
+            ).order_by(*NOTE_ORDERING)[:21],
+        ),
+        ("tag facets", _facets_queryset(OWNER_ID)),
+        (
+            "trash page",
+            owned.trashed().order_by(*NOTE_ORDERING)[:21],
+        ),
+        (
+            "trash purge batch",
+            Note.objects.filter(deleted_at__lt=now)
+            .order_by("deleted_at")
+            .values_list("pk", flat=True)[:500],
+        ),
+        (
+            "delta sync changes",
+            owned.filter(**window).order_by("change_seq")[:501],
+        ),
+        (
+            "delta sync deletions",
+            NoteTombstone.objects.filter(owner_id=OWNER_ID, **window)
+            .order_by("change_seq")[:501],
+        ),
+        ("latest revision", _latest_queryset([1])),
+        (
+            "history page",
+            NoteRevision.objects.filter(note_id=1)
+            .order_by("-number")
+            .values_list("number", flat=True)[:11],
+        ),
+        ("history versions", _chain_queryset(1, 11, 20)),
+        ("note search", match_sql(build_match_query("milk"), notes, 50)),
+    ]
+
+
+def explain(query):
+    """
+    Returns the query plan of a hot query.
+
+    Args:
+        query (QuerySet | tuple): A queryset or a (sql, params) pair.
+
+    Returns:
+        str: One plan step per line, as `QuerySet.explain()` prints them.
+    """
+    if not isinstance(query, tuple):
+        return query.explain()
+    sql, params = query
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        rows = cursor.fetchall()
+    return "\n".join(" ".join(str(value) for value in row) for row in rows)
+
+
+def is_regression(label, plan):
+    """
+    Returns True if a plan contains a marker not allowed for it, or lacks
+    an index constraint required for it.
+    """
+    allowed = ALLOWED_PLAN_MARKERS.get(label, ())
+    required = REQUIRED_PLAN_PATTERNS.get(label)
+    if required is not None and required.search(plan) is None:
+        return True
+    return FTS_ROWID_PROBE.search(plan) is not None or any(
+        marker in plan + "\n"
+        for marker in BAD_PLAN_MARKERS
+        if marker not in allowed
+    )
+
+
+class Command(BaseCommand):
+    """
+    Prints the SQLite query plan of every hot query.
+
+    Options:
+        --check: Exit with an error if any plan contains a full table scan
+            or a temporary B-tree sort.
+    """
+    help = "Print EXPLAIN QUERY PLAN for the app's hot queries."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Fail if a hot query scans the table or sorts in memory.",
+        )
+
+    def handle(self, *args, **options):
+        regressions = []
+        for label, query in hot_queries():
+            plan = explain(query)
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(plan)
+            if is_regression(label, plan):
+                regressions.append(label)
+
+        if options["check"] and regressions:
+            raise CommandError(
+                "Query plan regression in: " + ", ".join(regressions)
+            )
+        if options["check"]:
+            self.stdout.write(
+                self.style.SUCCESS("All hot queries use indexes.")
+            )
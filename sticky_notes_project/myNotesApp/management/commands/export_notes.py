@@ -0,0 +1,94 @@
+"""
+Management command that streams every note to NDJSON or CSV.
+
+→ Memory use is constant: notes are read in chunks and written line by
+  line. Progress and throughput are reported on stderr.
+→ `--owner` restricts the export to one user's notes.
+
+Usage:
+    python manage.py export_notes [--format csv] [--output notes.ndjson]
+                                  [--after-id 1000] [--chunk-size 2000]
+                                  [--owner alice]
+"""
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from myNotesApp.transfer import DEFAULT_CHUNK_SIZE, FORMATS, iter_export
+
+PROGRESS_EVERY = 10000
+
+
+class Command(BaseCommand):
+    """
+    Writes all notes (or those after a given id) to a file or stdout.
+    """
+    help = "Stream notes to NDJSON or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Output format (default: from the file extension).",
+        )
+        parser.add_argument(
+            "--output", help="File to write to (default: stdout)."
+        )
+        parser.add_argument(
+            "--after-id",
+            type=int,
+            default=0,
+            help="Resume: only export notes with a larger id.",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE
+        )
+        parser.add_argument(
+            "--owner", help="Only export the notes of this username."
+        )
+
+    def handle(self, *args, **options):
+        owner = None
+        if options["owner"]:
+            User = get_user_model()
+            try:
+                owner = User.objects.get_by_natural_key(options["owner"])
+            except User.DoesNotExist as exc:
+                raise CommandError(f"No user {options['owner']!r}.") from exc
+        output = options["output"]
+        fmt = options["format"] or (
+            "csv" if (output or "").lower().endswith(".csv") else "ndjson"
+        )
+        if output:
+            stream = open(output, "w", encoding="utf-8", newline="")
+            write = stream.write
+        else:
+            stream = None
+            write = lambda line: self.stdout.write(line, ending="")  # noqa
+
+        started = time.perf_counter()
+        lines = 0
+        try:
+            for line in iter_export(
+                fmt, options["after_id"], options["chunk_size"], owner
+            ):
+                write(line)
+                lines += 1
+                if lines % PROGRESS_EVERY == 0:
+                    self._report(lines, started)
+        finally:
+            if stream is not None:
+                stream.close()
+        # The CSV header is not a note.
+        rows = lines - 1 if fmt == "csv" and lines else lines
+        self._report(rows, started, done=True)
+
+    def _report(self, rows, started, done=False):
+        elapsed = time.perf_counter() - started
+        rate = rows / elapsed if elapsed else 0.0
+        label = "Exported" if done else "Exporting:"
+        self.stderr.write(
+            f"{label} {rows} notes in {elapsed:.2f}s ({rate:,.0f} rows/s)"
+        )
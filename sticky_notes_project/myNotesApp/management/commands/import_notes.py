@@ -0,0 +1,117 @@
+"""
+Management command that imports notes from an NDJSON or CSV export.
+
+→ Rows are validated with NoteForm and inserted with bulk_create in
+  batches, one short transaction each, so memory stays constant.
+→ With `--checkpoint`, the id of the last imported source row is written
+  after every batch; running the command again with the same checkpoint
+  resumes where it stopped. `--after-id` resumes from an explicit id.
+→ Progress and the final rows-per-second rate are reported on stderr.
+→ The imported notes belong to the user named by `--owner`.
+
+Usage:
+    python manage.py import_notes notes.ndjson --owner alice [--format csv]
+        [--batch-size 500] [--checkpoint import.ckpt] [--after-id 1000]
+"""
+
+import sys
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from myNotesApp.transfer import (
+    DEFAULT_BATCH_SIZE,
+    FORMATS,
+    import_notes,
+    iter_import_rows,
+)
+
+
+class Command(BaseCommand):
+    """
+    Imports notes from a file (or stdin with "-").
+    """
+    help = "Import notes from NDJSON or CSV in validated batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='Input file, or "-" for stdin.')
+        parser.add_argument(
+            "--owner",
+            required=True,
+            help="Username of the user the imported notes belong to.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Input format (default: from the file extension).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=DEFAULT_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--after-id",
+            type=int,
+            help="Resume: skip source rows up to and including this id.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="File recording the last imported source id.",
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            owner = User.objects.get_by_natural_key(options["owner"])
+        except User.DoesNotExist as exc:
+            raise CommandError(f"No user {options['owner']!r}.") from exc
+        path = options["path"]
+        fmt = options["format"] or (
+            "csv" if path.lower().endswith(".csv") else "ndjson"
+        )
+        checkpoint = (
+            Path(options["checkpoint"]) if options["checkpoint"] else None
+        )
+        after_id = options["after_id"]
+        if after_id is None and checkpoint and checkpoint.exists():
+            after_id = int(checkpoint.read_text().strip() or 0)
+
+        def progress(report):
+            if checkpoint and report.last_id is not None:
+                checkpoint.write_text(str(report.last_id))
+            self.stderr.write(
+                f"Imported {report.imported} notes "
+                f"({report.rows_per_second:,.0f} rows/s), "
+                f"last id {report.last_id}"
+            )
+
+        try:
+            stream = (
+                sys.stdin
+                if path == "-"
+                else open(path, encoding="utf-8", newline="")
+            )
+        except OSError as exc:
+            raise CommandError(f"Cannot read {path}: {exc}") from exc
+        with stream:
+            report = import_notes(
+                iter_import_rows(stream, fmt),
+                owner,
+                batch_size=options["batch_size"],
+                after_id=after_id,
+                progress=progress,
+            )
+
+        for number, errors in report.errors:
+            self.stderr.write(f"Row {number} rejected: {errors}")
+        unreported = report.rejected - len(report.errors)
+        if unreported:
+            self.stderr.write(f"... and {unreported} more rejected rows.")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report.imported} notes in "
+                f"{report.elapsed:.2f}s ({report.rows_per_second:,.0f} "
+                f"rows/s); skipped {report.skipped}, "
+                f"rejected {report.rejected}."
+            )
+        )
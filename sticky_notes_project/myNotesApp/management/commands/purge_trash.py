@@ -0,0 +1,43 @@
+"""
+Management command that empties expired notes from the trash.
+
+→ Permanently deletes the notes trashed more than `--days` ago (default
+  `NOTES_TRASH_RETENTION_DAYS`), `--batch-size` notes per transaction so
+  writers are only blocked for one short batch at a time.
+→ `--pause` sleeps between batches to leave the database to other
+  writers on a busy server.
+→ Meant to run periodically, e.g. from cron.
+
+Usage:
+    python manage.py purge_trash [--days 30] [--batch-size 500]
+                                 [--pause 0.1]
+"""
+
+from django.core.management.base import BaseCommand
+
+from myNotesApp.trash import DEFAULT_PURGE_BATCH, purge_trash
+
+
+class Command(BaseCommand):
+    """
+    Deletes notes that expired in the trash.
+    """
+    help = "Permanently delete notes that have been in the trash too long."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int)
+        parser.add_argument(
+            "--batch-size", type=int, default=DEFAULT_PURGE_BATCH
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to sleep between batches.",
+        )
+
+    def handle(self, *args, **options):
+        purged = purge_trash(
+            options["days"], options["batch_size"], options["pause"]
+        )
+        self.stdout.write(f"Purged {purged} notes from the trash.")
@@ -0,0 +1,27 @@
+"""
+Management command that rebuilds the full-text search index.
+
+→ The index is normally kept in sync by database triggers. Rebuild it
+  after restoring a backup or editing the database by hand.
+
+Usage:
+    python manage.py rebuild_search_index
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myNotesApp.search import rebuild_index
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the FTS5 table from the note table.
+    """
+    help = "Rebuild the full-text search index for notes."
+
+    def handle(self, *args, **options):
+        if not rebuild_index():
+            raise CommandError(
+                "Full-text search requires the SQLite database backend."
+            )
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
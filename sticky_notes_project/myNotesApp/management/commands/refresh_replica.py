@@ -0,0 +1,59 @@
+"""
+Management command that refreshes the read replica from the primary.
+
+→ Copies the default database over the replica (`NOTES_REPLICA_DATABASE`)
+  with SQLite's online backup API, `--pages` pages per step, so writers
+  on the primary are never held up for long.
+→ With `--interval` it keeps refreshing every that many seconds. Keep the
+  interval well below `NOTES_REPLICA_MAX_LAG`, or reads fall back to the
+  primary between refreshes.
+
+Usage:
+    python manage.py refresh_replica [--interval 2] [--pages 1024]
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myNotesApp.replica import (
+    DEFAULT_REFRESH_PAGES,
+    get_replica_alias,
+    refresh_replica,
+)
+
+
+class Command(BaseCommand):
+    """
+    Copies the primary database into the read replica.
+    """
+    help = "Refresh the read replica with SQLite's online backup API."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0.0,
+            help="Refresh every this many seconds instead of once.",
+        )
+        parser.add_argument(
+            "--pages",
+            type=int,
+            default=DEFAULT_REFRESH_PAGES,
+            help="Pages copied per backup step.",
+        )
+
+    def handle(self, *args, **options):
+        if get_replica_alias() is None:
+            raise CommandError(
+                "No replica is configured; set DJANGO_REPLICA_DB_PATH."
+            )
+        while True:
+            stats = refresh_replica(pages=options["pages"])
+            self.stdout.write(
+                f"Replica refreshed: {stats.bytes / 1e6:.1f} MB in "
+                f"{stats.seconds:.3f}s ({stats.mb_per_s:.1f} MB/s)."
+            )
+            if not options["interval"]:
+                return
+            time.sleep(max(0.0, options["interval"] - stats.seconds))
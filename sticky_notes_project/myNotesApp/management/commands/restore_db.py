@@ -0,0 +1,77 @@
+"""
+Management command that restores the database from a snapshot.
+
+→ Verifies the snapshot's SHA-256 checksum and integrity before touching
+  the database, then copies it over the live database with the online
+  backup API, so the app does not need to be stopped.
+→ Without a path, restores the newest snapshot in `--dir` (default
+  `NOTES_BACKUP_DIR`).
+→ Every change made after the snapshot is lost, so it asks for
+  confirmation unless `--noinput` is given.
+
+Usage:
+    python manage.py restore_db [snapshot] [--dir backups] [--noinput]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myNotesApp.backup import (
+    DEFAULT_BACKUP_PAGES,
+    BackupError,
+    get_backup_dir,
+    list_snapshots,
+    restore_database,
+)
+
+
+class Command(BaseCommand):
+    """
+    Replaces the database with a backup snapshot.
+    """
+    help = "Restore the SQLite database from a backup_db snapshot."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "snapshot", nargs="?", help="Snapshot file (default: newest)."
+        )
+        parser.add_argument("--dir", help="Directory of the snapshots.")
+        parser.add_argument(
+            "--pages",
+            type=int,
+            default=DEFAULT_BACKUP_PAGES,
+            help="Pages copied per backup step.",
+        )
+        parser.add_argument("--database", default="default")
+        parser.add_argument(
+            "--noinput",
+            "--no-input",
+            action="store_false",
+            dest="interactive",
+            help="Do not ask for confirmation.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["snapshot"]
+        if path is None:
+            snapshots = list_snapshots(options["dir"] or get_backup_dir())
+            if not snapshots:
+                raise CommandError("No snapshots found.")
+            path = snapshots[-1]
+        if options["interactive"]:
+            answer = input(
+                f"Replace database {options['database']!r} with {path}? "
+                "Changes made since the snapshot will be lost. "
+                "Type 'yes' to continue: "
+            )
+            if answer != "yes":
+                raise CommandError("Restore cancelled.")
+        try:
+            stats = restore_database(
+                path, options["database"], options["pages"]
+            )
+        except BackupError as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(
+            f"Restored {stats.bytes / 1e6:.1f} MB from {path} in "
+            f"{stats.seconds:.2f}s ({stats.mb_per_s:.1f} MB/s)."
+        )
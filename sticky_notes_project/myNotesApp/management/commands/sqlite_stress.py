@@ -0,0 +1,203 @@
+"""
+Management command that stress-tests SQLite under concurrent readers and
+writers, comparing the default connection setup with the tuned one.
+
+→ A throwaway database with the note table is created in a temporary
+  directory and seeded with notes.
+→ Many threads then run a mix of list reads and read-modify-write
+  transactions (like editing a note) for a fixed number of operations.
+→ The "default" run uses SQLite's defaults (rollback journal, deferred
+  transactions, 5 second busy timeout). The "tuned" run uses
+  `SQLITE_PRAGMAS`, the configured busy timeout and IMMEDIATE
+  transactions, exactly like the app's connections.
+→ Throughput (operations per second) and the number of "database is
+  locked" errors are reported for both runs.
+
+Usage:
+    python manage.py sqlite_stress [--threads 16] [--ops 200]
+        [--write-ratio 0.2] [--seed-notes 2000] [--json]
+"""
+
+import json
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from myNotesApp.db import DEFAULT_PRAGMAS, apply_pragmas
+
+SCHEMA = """
+CREATE TABLE note (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title VARCHAR(255) NOT NULL,
+    content TEXT NOT NULL,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    pinned BOOL NOT NULL
+);
+CREATE INDEX note_pinned_created_idx ON note (pinned DESC, created_at DESC,
+                                              id DESC);
+"""
+
+LIST_SQL = (
+    "SELECT id, title, content, pinned, created_at FROM note "
+    "ORDER BY pinned DESC, created_at DESC, id DESC LIMIT 20"
+)
+
+
+def _connect(path, tuned):
+    # Autocommit with explicit BEGIN, the way Django drives sqlite3.
+    if not tuned:
+        # The previous setup: sqlite3 defaults, deferred transactions.
+        return sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False
+        )
+    timeout = getattr(settings, "SQLITE_BUSY_TIMEOUT_MS", 20000) / 1000
+    conn = sqlite3.connect(
+        path, timeout=timeout, isolation_level=None, check_same_thread=False
+    )
+    apply_pragmas(
+        conn.cursor(), getattr(settings, "SQLITE_PRAGMAS", DEFAULT_PRAGMAS)
+    )
+    return conn
+
+
+def _seed(path, count):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    conn.executemany(
+        "INSERT INTO note (title, content, created_at, updated_at, pinned) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (
+            (f"Note {i}", "Stress test content.", now, now, i % 10 == 0)
+            for i in range(count)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _worker(path, tuned, ops, write_ratio, seed_notes, results, lock):
+    conn = _connect(path, tuned)
+    rng = random.Random()
+    begin = "BEGIN IMMEDIATE" if tuned else "BEGIN"
+    done = errors = 0
+    for _ in range(ops):
+        try:
+            if rng.random() < write_ratio:
+                pk = rng.randint(1, seed_notes)
+                # Read-modify-write in one transaction, like a form update.
+                conn.execute(begin)
+                try:
+                    row = conn.execute(
+                        "SELECT title FROM note WHERE id = ?", (pk,)
+                    ).fetchone()
+                    conn.execute(
+                        "UPDATE note SET title = ?, updated_at = "
+                        "datetime('now') WHERE id = ?",
+                        ((row[0] if row else "Note")[:200] + ".", pk),
+                    )
+                    conn.execute("COMMIT")
+                except sqlite3.OperationalError:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+                    raise
+            else:
+                conn.execute(LIST_SQL).fetchall()
+            done += 1
+        except sqlite3.OperationalError as exc:
+            if "locked" not in str(exc) and "busy" not in str(exc):
+                raise
+            errors += 1
+    conn.close()
+    with lock:
+        results["ops"] += done
+        results["lock_errors"] += errors
+
+
+def run_stress(tuned, threads, ops, write_ratio, seed_notes):
+    """
+    Runs one stress round against a fresh temporary database.
+
+    Args:
+        tuned (bool): Use the app's connection setup instead of defaults.
+        threads (int): Number of concurrent threads.
+        ops (int): Operations per thread.
+        write_ratio (float): Fraction of operations that write.
+        seed_notes (int): Notes created before the run.
+
+    Returns:
+        dict: ops, lock_errors, seconds and ops_per_second.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "stress.sqlite3")
+        _seed(path, seed_notes)
+        results = {"ops": 0, "lock_errors": 0}
+        lock = threading.Lock()
+        workers = [
+            threading.Thread(
+                target=_worker,
+                args=(
+                    path,
+                    tuned,
+                    ops,
+                    write_ratio,
+                    seed_notes,
+                    results,
+                    lock,
+                ),
+            )
+            for _ in range(threads)
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        seconds = time.perf_counter() - started
+    results["seconds"] = round(seconds, 3)
+    results["ops_per_second"] = round(results["ops"] / seconds, 1)
+    return results
+
+
+class Command(BaseCommand):
+    """
+    Compares default and tuned SQLite settings under concurrency.
+    """
+    help = "Stress-test SQLite with concurrent note readers and writers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--ops", type=int, default=200)
+        parser.add_argument("--write-ratio", type=float, default=0.2)
+        parser.add_argument("--seed-notes", type=int, default=2000)
+        parser.add_argument(
+            "--json", action="store_true", help="Print results as JSON."
+        )
+
+    def handle(self, *args, **options):
+        params = (
+            options["threads"],
+            options["ops"],
+            options["write_ratio"],
+            options["seed_notes"],
+        )
+        report = {
+            "default": run_stress(False, *params),
+            "tuned": run_stress(True, *params),
+        }
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        for mode, result in report.items():
+            self.stdout.write(
+                f"{mode:>8}: {result['ops']} ops in {result['seconds']}s "
+                f"({result['ops_per_second']} ops/s), "
+                f"{result['lock_errors']} lock errors"
+            )
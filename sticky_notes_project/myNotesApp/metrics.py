@@ -0,0 +1,306 @@
+"""
+This file collects per-request timing metrics and serves them.
+
+→ `RequestMetricsMiddleware` records, for every request, the number of
+  SQL queries, the time spent in the database, the time spent rendering
+  templates and the total wall time. The numbers are sent back in a
+  `Server-Timing` header and added to per-URL-name histograms.
+→ Requests slower than `NOTES_SLOW_REQUEST_MS` are written to the
+  "myNotesApp.slow_requests" logger as one JSON line, including the
+  slowest SQL statements of the request.
+→ Template time is measured by wrapping Django's template `render`.
+  The wrapper is installed by `MyNotesAppConfig.ready()` only when
+  `NOTES_TEMPLATE_TIMING` is on; importing this module changes nothing.
+  Without it, the `tpl` entry is left out of the header.
+→ `metrics_view` serves the histograms as JSON.
+
+The bookkeeping is a handful of counters and a lock per request, so the
+middleware is cheap enough to leave on in production. It runs natively in
+both the WSGI and the ASGI handler; queries are attributed to the request
+through a context variable, which follows the async ORM into the threads
+it runs queries in.
+"""
+
+import contextvars
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.template.backends.django import Template
+
+from .cache import cache_stats
+
+logger = logging.getLogger("myNotesApp.slow_requests")
+
+# Upper bounds (ms) of the latency histogram buckets; the last is +Inf.
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+DEFAULT_SLOW_REQUEST_MS = 500
+SLOW_SQL_LOGGED = 5
+
+_current = contextvars.ContextVar("notes_request_metrics", default=None)
+
+
+class RequestMetrics:
+    """
+    Measurements of a single request.
+
+    Attributes:
+        queries (int): SQL queries executed.
+        db_time (float): Seconds spent executing SQL.
+        template_time (float): Seconds spent rendering templates.
+        statements (list): (seconds, sql) for every query.
+        depth (int): Nesting level of the template render in progress.
+    """
+    __slots__ = ("queries", "db_time", "template_time", "statements", "depth")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.statements = []
+        self.depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += elapsed
+            self.statements.append((elapsed, sql))
+
+
+class Histogram:
+    """
+    A fixed-bucket latency histogram.
+
+    Attributes:
+        counts (list): Requests per bucket (last bucket is +Inf).
+        count (int): Total requests.
+        total_ms (float): Sum of all latencies in milliseconds.
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.queries = 0
+
+    def observe(self, value_ms, queries):
+        self.counts[bisect_left(BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.queries += queries
+
+    def as_dict(self):
+        labels = [f"le_{bound}" for bound in BUCKETS_MS] + ["le_inf"]
+        cumulative, buckets = 0, {}
+        for label, count in zip(labels, self.counts):
+            cumulative += count
+            buckets[label] = cumulative
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3),
+            "mean_queries": round(self.queries / self.count, 2),
+            "buckets": buckets,
+        }
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def _observe(name, total_ms, queries):
+    with _histograms_lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(total_ms, queries)
+
+
+def get_metrics():
+    """
+    Returns a snapshot of the per-URL-name histograms.
+
+    Returns:
+        dict: {url_name: histogram dict}.
+    """
+    with _histograms_lock:
+        return {
+            name: histogram.as_dict()
+            for name, histogram in sorted(_histograms.items())
+        }
+
+
+def reset_metrics():
+    """Clears all histograms of this process."""
+    with _histograms_lock:
+        _histograms.clear()
+
+
+_original_render = Template.render
+
+
+def _timed_render(self, context=None, request=None):
+    metrics = _current.get()
+    if metrics is None:
+        return _original_render(self, context, request)
+    # Only the outermost render counts, so nested renders are not added
+    # twice.
+    metrics.depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context, request)
+    finally:
+        metrics.depth -= 1
+        if metrics.depth == 0:
+            metrics.template_time += time.perf_counter() - started
+
+
+def template_timer_installed():
+    """Returns True if template rendering is being timed."""
+    return Template.render is _timed_render
+
+
+def install_template_timer():
+    """
+    Wraps Django's template `render` to time it per request.
+
+    Called from `MyNotesAppConfig.ready()` when `NOTES_TEMPLATE_TIMING`
+    is on. Installing it twice has no effect.
+    """
+    Template.render = _timed_render
+
+
+def uninstall_template_timer():
+    """Restores Django's own template `render`."""
+    Template.render = _original_render
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """
+    Adds the query recorder to a new database connection.
+
+    Connected to `connection_created` in `MyNotesAppConfig.ready()`, so
+    every connection, in any thread, reports to the request being
+    measured.
+
+    Args:
+        sender (type): The database wrapper class.
+        connection (BaseDatabaseWrapper): The new connection.
+        **kwargs: Other signal arguments.
+    """
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+class RequestMetricsMiddleware:
+    """
+    Measures queries, DB time, template time and wall time per request.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._report(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._report(request, response, metrics, started)
+
+    def _report(self, request, response, metrics, started):
+        total_ms = (time.perf_counter() - started) * 1000
+
+        db_ms = metrics.db_time * 1000
+        timings = [f'db;dur={db_ms:.2f};desc="{metrics.queries} queries"']
+        if template_timer_installed():
+            timings.append(f"tpl;dur={metrics.template_time * 1000:.2f}")
+        timings.append(f"total;dur={total_ms:.2f}")
+        response["Server-Timing"] = ", ".join(timings)
+
+        match = getattr(request, "resolver_match", None)
+        name = (match.url_name or match.view_name) if match else "unresolved"
+        _observe(name, total_ms, metrics.queries)
+
+        slow_ms = getattr(
+            settings, "NOTES_SLOW_REQUEST_MS", DEFAULT_SLOW_REQUEST_MS
+        )
+        if total_ms >= slow_ms:
+            self._log_slow(request, name, response, metrics, total_ms)
+        return response
+
+    def _log_slow(self, request, name, response, metrics, total_ms):
+        slowest = sorted(metrics.statements, reverse=True)[:SLOW_SQL_LOGGED]
+        logger.warning(
+            json.dumps(
+                {
+                    "event": "slow_request",
+                    "method": request.method,
+                    "path": request.path,
+                    "url_name": name,
+                    "status": response.status_code,
+                    "total_ms": round(total_ms, 2),
+                    "db_ms": round(metrics.db_time * 1000, 2),
+                    "template_ms": round(metrics.template_time * 1000, 2),
+                    "queries": metrics.queries,
+                    "slowest_sql": [
+                        {"ms": round(seconds * 1000, 2), "sql": sql}
+                        for seconds, sql in slowest
+                    ],
+                }
+            )
+        )
+
+
+def metrics_view(request):
+    """
+    Serves the request histograms and cache counters of this process.
+
+    Only available with DEBUG on or to staff users.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        JsonResponse: {"requests": {...}, "cache": {...}}.
+
+    Raises:
+        Http404: For anonymous or non-staff users when DEBUG is off.
+    """
+    user = getattr(request, "user", None)
+    if not (settings.DEBUG or (user is not None and user.is_staff)):
+        raise Http404
+    return JsonResponse({"requests": get_metrics(), "cache": cache_stats()})
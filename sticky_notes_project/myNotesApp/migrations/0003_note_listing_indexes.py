@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-17 21:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myNotesApp", "0002_note_pinned"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(
+                fields=["-pinned", "-created_at", "-id"],
+                name="note_pinned_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(
+                condition=models.Q(("pinned", True)),
+                fields=["-created_at", "-id"],
+                name="note_pinned_only_idx",
+            ),
+        ),
+    ]
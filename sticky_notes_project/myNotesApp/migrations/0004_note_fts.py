@@ -0,0 +1,77 @@
+"""
+Creates the FTS5 full-text index over note titles and content.
+
+The virtual table uses the note table as external content, so the text is
+not stored twice. Triggers keep it in sync on every insert, delete and
+title/content update, including bulk and raw SQL writes that bypass model
+signals. Only SQLite supports FTS5, so other backends skip this step.
+"""
+
+from django.db import migrations
+
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS myNotesApp_note_fts USING fts5(
+        title,
+        content,
+        content='myNotesApp_note',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_fts_ai
+    AFTER INSERT ON myNotesApp_note BEGIN
+        INSERT INTO myNotesApp_note_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_fts_ad
+    AFTER DELETE ON myNotesApp_note BEGIN
+        INSERT INTO myNotesApp_note_fts(myNotesApp_note_fts, rowid, title,
+                                        content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_fts_au
+    AFTER UPDATE OF title, content ON myNotesApp_note BEGIN
+        INSERT INTO myNotesApp_note_fts(myNotesApp_note_fts, rowid, title,
+                                        content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO myNotesApp_note_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    "INSERT INTO myNotesApp_note_fts(myNotesApp_note_fts) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS myNotesApp_note_fts_au",
+    "DROP TRIGGER IF EXISTS myNotesApp_note_fts_ad",
+    "DROP TRIGGER IF EXISTS myNotesApp_note_fts_ai",
+    "DROP TABLE IF EXISTS myNotesApp_note_fts",
+]
+
+
+def _run(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myNotesApp", "0003_note_listing_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(CREATE_SQL), _run(DROP_SQL)),
+    ]
@@ -0,0 +1,176 @@
+# Generated by Django 5.1.6 on 2026-10-17 21:26
+"""
+Adds the change sequence behind the delta sync API.
+
+Every note insert and update takes the next value of a global sequence
+(kept in the single SyncState row) into `Note.change_seq`, and every
+delete records the next value in a NoteTombstone. Triggers do this inside
+the writing statement, so bulk, queryset and raw SQL writes are covered
+and sequence values become visible in commit order.
+
+→ Existing notes are numbered by id before the triggers exist.
+→ The triggers are defined here as of this migration, so it creates the
+  same schema whatever the current code looks like. myNotesApp/db.py
+  holds the current definitions and restores them whenever a later
+  migration rebuilds the note table.
+
+Triggers are SQLite only, like the full-text index in 0004.
+"""
+
+from django.db import migrations, models
+from django.db.models import F
+
+SEQ = "(SELECT change_seq FROM myNotesApp_syncstate WHERE id = 1)"
+BUMP_SEQ = (
+    "UPDATE myNotesApp_syncstate SET change_seq = change_seq + 1 "
+    "WHERE id = 1;"
+)
+
+# The full-text index triggers of migration 0004.
+FTS_TRIGGERS = {
+    "myNotesApp_note_fts_ai": """
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_fts_ai
+    AFTER INSERT ON myNotesApp_note BEGIN
+        INSERT INTO myNotesApp_note_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    "myNotesApp_note_fts_ad": """
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_fts_ad
+    AFTER DELETE ON myNotesApp_note BEGIN
+        INSERT INTO myNotesApp_note_fts(myNotesApp_note_fts, rowid, title,
+                                        content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    "myNotesApp_note_fts_au": """
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_fts_au
+    AFTER UPDATE OF title, content ON myNotesApp_note BEGIN
+        INSERT INTO myNotesApp_note_fts(myNotesApp_note_fts, rowid, title,
+                                        content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO myNotesApp_note_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+}
+
+# Inserts and updates take the next sequence value; deletes record it in a
+# tombstone.
+SEQ_TRIGGERS = {
+    "myNotesApp_note_seq_ai": f"""
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_seq_ai
+    AFTER INSERT ON myNotesApp_note BEGIN
+        {BUMP_SEQ}
+        UPDATE myNotesApp_note SET change_seq = {SEQ} WHERE id = new.id;
+    END
+    """,
+    "myNotesApp_note_seq_au": f"""
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_seq_au
+    AFTER UPDATE ON myNotesApp_note
+    WHEN new.change_seq = old.change_seq OR new.change_seq < {SEQ}
+    BEGIN
+        {BUMP_SEQ}
+        UPDATE myNotesApp_note SET change_seq = {SEQ} WHERE id = new.id;
+    END
+    """,
+    "myNotesApp_note_seq_ad": f"""
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_seq_ad
+    AFTER DELETE ON myNotesApp_note BEGIN
+        {BUMP_SEQ}
+        INSERT INTO myNotesApp_notetombstone (note_id, change_seq, deleted_at)
+        VALUES (old.id, {SEQ}, strftime('%Y-%m-%d %H:%M:%f', 'now'));
+    END
+    """,
+}
+
+
+def _create_missing_triggers(connection, triggers):
+    """Creates the missing triggers; rebuilds the index if FTS ones were."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        existing = {name for (name,) in cursor.fetchall()}
+        created = [name for name in triggers if name not in existing]
+        for name in created:
+            cursor.execute(triggers[name])
+        if any(name in FTS_TRIGGERS for name in created):
+            cursor.execute(
+                "INSERT INTO myNotesApp_note_fts(myNotesApp_note_fts) "
+                "VALUES ('rebuild')"
+            )
+
+
+def create_sequence(apps, schema_editor):
+    Note = apps.get_model("myNotesApp", "Note")
+    SyncState = apps.get_model("myNotesApp", "SyncState")
+    last_id = Note.objects.order_by("-id").values_list("id", flat=True)
+    SyncState.objects.create(id=1, change_seq=last_id.first() or 0)
+    Note.objects.update(change_seq=F("id"))
+    # Adding the column rebuilt the note table, which dropped the
+    # full-text index triggers; this recreates them along with the
+    # sequence triggers.
+    if schema_editor.connection.vendor == "sqlite":
+        _create_missing_triggers(
+            schema_editor.connection, {**FTS_TRIGGERS, **SEQ_TRIGGERS}
+        )
+
+
+def drop_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for name in SEQ_TRIGGERS:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myNotesApp", "0005_note_event"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NoteTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("note_id", models.BigIntegerField()),
+                ("change_seq", models.BigIntegerField(unique=True)),
+                ("deleted_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SyncState",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("change_seq", models.BigIntegerField(default=0)),
+                ("compacted_seq", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="note",
+            name="change_seq",
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(
+                fields=["change_seq"], name="note_change_seq_idx"
+            ),
+        ),
+        migrations.RunPython(create_sequence, drop_sequence),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.6 on 2026-10-17 21:29
+"""
+Adds `Note.preview` and fills it for existing notes.
+
+Notes are read in primary key order, BATCH_SIZE at a time, and only
+their id and content are loaded, so the backfill runs in constant memory
+on large boards. The preview is computed here as it was defined when
+this migration was written, not by the current `make_preview`.
+"""
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+BATCH_SIZE = 1000
+PREVIEW_WORDS = 20
+
+
+def backfill_previews(apps, schema_editor):
+    Note = apps.get_model("myNotesApp", "Note")
+    last_id = 0
+    while True:
+        batch = list(
+            Note.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .only("id", "content")[:BATCH_SIZE]
+        )
+        if not batch:
+            return
+        for note in batch:
+            note.preview = Truncator(note.content).words(
+                PREVIEW_WORDS, truncate=" …"
+            )
+        Note.objects.bulk_update(batch, ["preview"])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myNotesApp", "0006_note_change_sequence"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="note",
+            name="preview",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.RunPython(backfill_previews, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,196 @@
+# Generated by Django 5.1.6 on 2026-10-17 21:48
+"""
+Gives every note an owner and assigns existing notes to a default owner.
+
+The owner column is added as nullable first, which SQLite does with a
+plain `ALTER TABLE ... ADD COLUMN` instead of copying the table. Existing
+notes and tombstones are then handed to the user named by
+`NOTES_DEFAULT_OWNER` (created without a usable password if needed)
+BATCH_SIZE rows at a time. The migration is not atomic, so each batch
+commits on its own and writers are only blocked for one short batch at a
+time. The column stays nullable; the model requires an owner for new
+notes (see migration 0009).
+
+Existing events are left without an owner: every board still receives
+them until they expire.
+
+The tombstone trigger is then replaced by one recording the owner, and
+the triggers dropped by the table rebuild of 0007 are recreated. They
+are defined here as of this migration, not taken from myNotesApp/db.py.
+"""
+
+import django.db.models.deletion
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 1000
+DEFAULT_OWNER = "notes"
+
+SEQ = "(SELECT change_seq FROM myNotesApp_syncstate WHERE id = 1)"
+BUMP_SEQ = (
+    "UPDATE myNotesApp_syncstate SET change_seq = change_seq + 1 "
+    "WHERE id = 1;"
+)
+
+# The full-text index triggers of migration 0004.
+FTS_TRIGGERS = {
+    "myNotesApp_note_fts_ai": """
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_fts_ai
+    AFTER INSERT ON myNotesApp_note BEGIN
+        INSERT INTO myNotesApp_note_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    "myNotesApp_note_fts_ad": """
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_fts_ad
+    AFTER DELETE ON myNotesApp_note BEGIN
+        INSERT INTO myNotesApp_note_fts(myNotesApp_note_fts, rowid, title,
+                                        content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    "myNotesApp_note_fts_au": """
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_fts_au
+    AFTER UPDATE OF title, content ON myNotesApp_note BEGIN
+        INSERT INTO myNotesApp_note_fts(myNotesApp_note_fts, rowid, title,
+                                        content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO myNotesApp_note_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+}
+
+# The sequence triggers of migration 0006, with the owner recorded in the
+# tombstone.
+SEQ_TRIGGERS = {
+    "myNotesApp_note_seq_ai": f"""
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_seq_ai
+    AFTER INSERT ON myNotesApp_note BEGIN
+        {BUMP_SEQ}
+        UPDATE myNotesApp_note SET change_seq = {SEQ} WHERE id = new.id;
+    END
+    """,
+    "myNotesApp_note_seq_au": f"""
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_seq_au
+    AFTER UPDATE ON myNotesApp_note
+    WHEN new.change_seq = old.change_seq OR new.change_seq < {SEQ}
+    BEGIN
+        {BUMP_SEQ}
+        UPDATE myNotesApp_note SET change_seq = {SEQ} WHERE id = new.id;
+    END
+    """,
+    "myNotesApp_note_seq_ad": f"""
+    CREATE TRIGGER IF NOT EXISTS myNotesApp_note_seq_ad
+    AFTER DELETE ON myNotesApp_note BEGIN
+        {BUMP_SEQ}
+        INSERT INTO myNotesApp_notetombstone
+            (note_id, owner_id, change_seq, deleted_at)
+        VALUES (old.id, old.owner_id, {SEQ},
+                strftime('%Y-%m-%d %H:%M:%f', 'now'));
+    END
+    """,
+}
+
+
+def _create_missing_triggers(connection, triggers):
+    """Creates the missing triggers; rebuilds the index if FTS ones were."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        existing = {name for (name,) in cursor.fetchall()}
+        created = [name for name in triggers if name not in existing]
+        for name in created:
+            cursor.execute(triggers[name])
+        if any(name in FTS_TRIGGERS for name in created):
+            cursor.execute(
+                "INSERT INTO myNotesApp_note_fts(myNotesApp_note_fts) "
+                "VALUES ('rebuild')"
+            )
+
+
+def _assign_in_batches(model, field, owner_id, using):
+    last_id = 0
+    while True:
+        ids = list(
+            model.objects.using(using)
+            .filter(**{f"{field}__isnull": True, "id__gt": last_id})
+            .order_by("id")
+            .values_list("id", flat=True)[:BATCH_SIZE]
+        )
+        if not ids:
+            return
+        with transaction.atomic(using=using):
+            model.objects.using(using).filter(id__in=ids).update(
+                **{field: owner_id}
+            )
+        last_id = ids[-1]
+
+
+def assign_default_owner(apps, schema_editor):
+    Note = apps.get_model("myNotesApp", "Note")
+    NoteTombstone = apps.get_model("myNotesApp", "NoteTombstone")
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    using = schema_editor.connection.alias
+
+    if (
+        Note.objects.using(using).exists()
+        or NoteTombstone.objects.using(using).exists()
+    ):
+        owner, _ = User.objects.using(using).get_or_create(
+            username=getattr(settings, "NOTES_DEFAULT_OWNER", DEFAULT_OWNER),
+            defaults={"password": make_password(None)},
+        )
+        _assign_in_batches(Note, "owner_id", owner.pk, using)
+        _assign_in_batches(NoteTombstone, "owner_id", owner.pk, using)
+    # Deletions from now on record the note's owner in the tombstone.
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TRIGGER IF EXISTS myNotesApp_note_seq_ad")
+        _create_missing_triggers(
+            schema_editor.connection, {**FTS_TRIGGERS, **SEQ_TRIGGERS}
+        )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("myNotesApp", "0007_note_preview"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="note",
+            name="owner",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="notes",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="noteevent",
+            name="owner_id",
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="notetombstone",
+            name="owner_id",
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name="notetombstone",
+            index=models.Index(
+                fields=["owner_id", "change_seq"],
+                name="tombstone_owner_seq_idx",
+            ),
+        ),
+        migrations.RunPython(
+            assign_default_owner, migrations.RunPython.noop
+        ),
+    ]
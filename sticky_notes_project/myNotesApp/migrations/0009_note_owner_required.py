@@ -0,0 +1,60 @@
+# Generated by Django 5.1.6 on 2026-10-17 21:49
+"""
+Moves the listing indexes of the note table behind the owner.
+
+Every index of the note table now starts with the owner, so one user's
+board, pinned section and sync window are range reads of their own rows.
+
+The owner column stays nullable in the database. Making it NOT NULL would
+rebuild the note table on SQLite, copying every row in one transaction
+and locking out writers for as long, which is what the batches of 0008
+avoid. The model requires the owner instead (see `Note.save`).
+"""
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myNotesApp", "0008_note_owner"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="note",
+            name="note_pinned_created_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="note",
+            name="note_pinned_only_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="note",
+            name="note_change_seq_idx",
+        ),
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(
+                fields=["owner", "-pinned", "-created_at", "-id"],
+                name="note_owner_pinned_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(
+                condition=models.Q(("pinned", True)),
+                fields=["owner", "-created_at", "-id"],
+                name="note_owner_pinned_only_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(
+                fields=["owner", "change_seq"],
+                name="note_owner_change_seq_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.1.6 on 2026-10-17 22:00
+"""
+Adds the trash: `Note.deleted_at` and partial indexes on both sides of it.
+
+The nullable column is added with a plain `ALTER TABLE ... ADD COLUMN`,
+so the note table and its triggers are left in place. The list indexes
+are replaced by partial ones over live notes, and the trash page and the
+purge get partial indexes over trashed notes.
+"""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myNotesApp", "0009_note_owner_required"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="note",
+            name="note_owner_pinned_created_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="note",
+            name="note_owner_pinned_only_idx",
+        ),
+        migrations.AddField(
+            model_name="note",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["owner", "-pinned", "-created_at", "-id"],
+                name="note_owner_live_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(
+                condition=models.Q(
+                    ("deleted_at__isnull", True), ("pinned", True)
+                ),
+                fields=["owner", "-created_at", "-id"],
+                name="note_owner_live_pinned_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", False)),
+                fields=["owner", "-pinned", "-created_at", "-id"],
+                name="note_owner_trash_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", False)),
+                fields=["deleted_at"],
+                name="note_trash_expiry_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,108 @@
+# Generated by Django 5.1.6 on 2026-10-17 22:07
+"""
+Adds per-user tags and the NoteTag table attaching them to notes.
+
+The unique constraints are declared with the new tables, so they are
+created in one CREATE TABLE each. NoteTag gets covering indexes in both
+directions. The note table itself is not altered.
+"""
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myNotesApp", "0010_note_trash"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50)),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tags",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("owner", "name"), name="tag_owner_name_uniq"
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="NoteTag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "note",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tag_links",
+                        to="myNotesApp.note",
+                    ),
+                ),
+                (
+                    "tag",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="note_links",
+                        to="myNotesApp.tag",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["tag", "note"], name="notetag_tag_note_idx"
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("note", "tag"), name="notetag_note_tag_uniq"
+                    ),
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name="note",
+            name="tags",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="notes",
+                through="myNotesApp.NoteTag",
+                to="myNotesApp.tag",
+            ),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.6 on 2026-10-17 22:29
+"""
+Adds the NoteRevision table holding the revision history of notes.
+
+The unique constraint on (note, number) is declared with the table and
+doubles as the foreign key index. Existing notes start their history on
+their next edit; the note table itself is not altered.
+"""
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myNotesApp", "0011_tags"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NoteRevision",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("number", models.PositiveIntegerField()),
+                ("keyframe", models.BooleanField(default=False)),
+                ("data", models.BinaryField()),
+                ("digest", models.CharField(max_length=16)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "note",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="revisions",
+                        to="myNotesApp.note",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("note", "number"),
+                        name="revision_note_number_uniq",
+                    )
+                ],
+            },
+        ),
+    ]
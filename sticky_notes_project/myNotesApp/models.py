@@ -8,10 +8,80 @@ The Note model uses a max length for the title and applies
 a maximum length validator on content (e.g. 500 characters).
 
 Timestamps are also added for creation and modification.
+
+Every note belongs to a user (`owner`), and every view only sees the
+notes of the signed-in user.
+
+Indexes mirror the listing order used by the note list and start with
+the owner, so each user's pinned-first page is an index range read
+rather than a scan plus sort, however many notes other users have.
+
+Deleting a note moves it to the trash (`deleted_at` is set) until it is
+purged (see trash.py). The list indexes are partial and only cover live
+notes, and the trash has partial indexes of its own, so neither side
+grows with the other. `Note.objects.live()` and `.trashed()` select
+each side with exactly the condition of those indexes.
+
+Each note also stores a `preview` of its content, computed on save, so
+the note list can render cards from a few short columns (`CARD_FIELDS`)
+without loading or truncating the full content.
+
+Notes are labelled with their owner's Tags through the NoteTag table,
+whose two covering indexes answer "the tags of a note" and "the notes
+with a tag" without touching the table (see tags.py).
+
+Every edit of a note's title or content is kept as a NoteRevision,
+mostly as a compressed delta against the version before (see
+revisions.py).
+
+The NoteEvent model is the log of live-update events streamed to the
+board (see events.py). NoteTombstone and SyncState back the delta sync
+API (see sync.py).
 """
 
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
 from django.core.validators import MaxLengthValidator
+from django.utils.text import Truncator
+
+# Words of content shown on a note card.
+PREVIEW_WORDS = 20
+
+# The columns a note card needs; the list queries load only these.
+# `updated_at` is part of the per-card cache key (see cache.py).
+CARD_FIELDS = (
+    "id", "title", "preview", "pinned", "created_at", "updated_at"
+)
+
+
+def make_preview(content):
+    """
+    Returns the card preview of a note's content.
+
+    Args:
+        content (str): The note content.
+
+    Returns:
+        str: The first `PREVIEW_WORDS` words, exactly like the
+        `truncatewords` template filter.
+    """
+    return Truncator(content).words(PREVIEW_WORDS, truncate=" …")
+
+
+class NoteQuerySet(models.QuerySet):
+    """
+    QuerySet of notes, with shortcuts for live and trashed notes.
+
+    Methods:
+        live(): Notes that are not in the trash.
+        trashed(): Notes that are in the trash.
+    """
+
+    def live(self):
+        return self.filter(deleted_at__isnull=True)
+
+    def trashed(self):
+        return self.filter(deleted_at__isnull=False)
 
 
 class Note(models.Model):
@@ -19,6 +89,8 @@ class Note(models.Model):
     Represents a note in the sticky notes application.
 
     Attributes:
+        owner (User): The user the note belongs to. Required, although
+            the column is nullable (see migration 0009).
         title (str): The title of the note, limited to 255 characters.
         content (str): The content of the note, with a maximum length of 500
             characters.
@@ -27,16 +99,315 @@ class Note(models.Model):
         updated_at (datetime): The timestamp when the note was last updated.
             Automatically updated on save.
         pinned (bool): Indicates whether the note is pinned. Defaults to False.
+        preview (str): The first words of the content, shown on the note
+            card. Set by `save()`; bulk writes call `refresh_preview()`.
+        change_seq (int): Position of the note's latest write in the
+            global change sequence. Maintained by database triggers on
+            every insert and update, including bulk and raw SQL writes.
+        deleted_at (datetime | None): When the note was moved to the
+            trash; None for live notes.
+        tags (QuerySet): The owner's tags attached to the note, through
+            NoteTag.
 
     Methods:
         __str__(): Returns the string representation of the note,
         which is its title.
+        refresh_preview(): Recomputes `preview` from `content`.
+        save(): Checks that the note has an owner, refreshes the
+        preview, then saves the note and its revision (see signals.py)
+        in one transaction.
+        from_db(): Loads a note and remembers the text it was loaded
+        with, the base of the next revision's delta.
     """
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="notes",
+        null=True,
+        editable=False,
+        db_index=False,
+    )
     title = models.CharField(max_length=255)
     content = models.TextField(validators=[MaxLengthValidator(500)])
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     pinned = models.BooleanField(default=False)  # New field for pinning notes
+    preview = models.TextField(blank=True, default="", editable=False)
+    change_seq = models.BigIntegerField(default=0, editable=False)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    tags = models.ManyToManyField(
+        "Tag", through="NoteTag", related_name="notes", blank=True
+    )
+
+    objects = NoteQuerySet.as_manager()
+
+    # (title, content) as loaded from the database, or None.
+    _revision_base = None
+
+    class Meta:
+        """
+        Meta options for the Note model.
+        - `indexes`: A partial index over live notes matching a user's
+          note list ordering (owner, then pinned first, newest first, id
+          as tie-breaker) and a partial index over live pinned notes only
+          for the "pinned at top" section. The trash page has the same
+          ordering over trashed notes, and the purge reads trashed notes
+          by `deleted_at`. An index on (owner, change sequence) serves the
+          delta sync API. The owner indexes also serve the foreign key,
+          so Django's default one is not created.
+        """
+        indexes = [
+            models.Index(
+                fields=["owner", "-pinned", "-created_at", "-id"],
+                name="note_owner_live_idx",
+                condition=models.Q(deleted_at__isnull=True),
+            ),
+            models.Index(
+                fields=["owner", "-created_at", "-id"],
+                name="note_owner_live_pinned_idx",
+                condition=models.Q(pinned=True, deleted_at__isnull=True),
+            ),
+            models.Index(
+                fields=["owner", "-pinned", "-created_at", "-id"],
+                name="note_owner_trash_idx",
+                condition=models.Q(deleted_at__isnull=False),
+            ),
+            models.Index(
+                fields=["deleted_at"],
+                name="note_trash_expiry_idx",
+                condition=models.Q(deleted_at__isnull=False),
+            ),
+            models.Index(
+                fields=["owner", "change_seq"],
+                name="note_owner_change_seq_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        note = super().from_db(db, field_names, values)
+        if not {"title", "content"} & note.get_deferred_fields():
+            note._revision_base = (note.title, note.content)
+        return note
+
+    def refresh_preview(self):
+        self.preview = make_preview(self.content)
+
+    def save(self, *args, **kwargs):
+        if self.owner_id is None:
+            raise ValueError("A note must have an owner.")
+        self.refresh_preview()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "content" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "preview"}
+        # One commit for the note and the rows its signals write.
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+
+class Tag(models.Model):
+    """
+    A label a user attaches to their notes.
+
+    Attributes:
+        owner (User): The user the tag belongs to; every user has their
+            own set of tags.
+        name (str): The normalised tag name (see `tags.normalize_tag`),
+            unique per owner.
+    """
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="tags",
+        db_index=False,
+    )
+    name = models.CharField(max_length=50)
+
+    class Meta:
+        """
+        Meta options for the Tag model.
+        - `constraints`: Tag names are unique per owner. The unique index
+          on (owner, name) also serves the foreign key and resolves tag
+          names in the filters and facets.
+        """
+        constraints = [
+            models.UniqueConstraint(
+                fields=["owner", "name"], name="tag_owner_name_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class NoteTag(models.Model):
+    """
+    Attaches a tag to a note (the through table of `Note.tags`).
+
+    Attributes:
+        note (Note): The tagged note.
+        tag (Tag): The tag.
+    """
+    note = models.ForeignKey(
+        Note,
+        on_delete=models.CASCADE,
+        related_name="tag_links",
+        db_index=False,
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name="note_links",
+        db_index=False,
+    )
+
+    class Meta:
+        """
+        Meta options for the NoteTag model.
+        - `constraints`: A note carries a tag at most once. The unique
+          index on (note, tag) covers loading a note's tags.
+        - `indexes`: (tag, note) covers the tag filters and facet counts,
+          which only need the note ids of a tag.
+        """
+        constraints = [
+            models.UniqueConstraint(
+                fields=["note", "tag"], name="notetag_note_tag_uniq"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["tag", "note"], name="notetag_tag_note_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"note {self.note_id} tagged {self.tag_id}"
+
+
+class NoteRevision(models.Model):
+    """
+    One saved version of a note's title and content (see revisions.py).
+
+    Attributes:
+        note (Note): The note.
+        number (int): Position in the note's history, starting at 1.
+        keyframe (bool): Whether `data` holds the full text rather than a
+            delta against the previous revision.
+        data (bytes): The packed text or delta.
+        digest (str): Digest of the full text of this version, checked
+            before a delta is stored against it.
+        created_at (datetime): When the version was saved.
+    """
+    note = models.ForeignKey(
+        Note,
+        on_delete=models.CASCADE,
+        related_name="revisions",
+        db_index=False,
+    )
+    number = models.PositiveIntegerField()
+    keyframe = models.BooleanField(default=False)
+    data = models.BinaryField()
+    digest = models.CharField(max_length=16)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        """
+        Meta options for the NoteRevision model.
+        - `constraints`: Numbers are unique per note. The unique index on
+          (note, number) serves the foreign key, the latest revision
+          lookup and the history pages.
+        """
+        constraints = [
+            models.UniqueConstraint(
+                fields=["note", "number"], name="revision_note_number_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"note {self.note_id} revision {self.number}"
+
+
+class NoteEvent(models.Model):
+    """
+    One entry of the live-update event log.
+
+    Rows are only ever appended and, after `NOTES_EVENTS_RETENTION`
+    seconds, deleted; the autoincrement id is the cursor clients resume
+    from.
+
+    Attributes:
+        kind (str): "created", "updated", "pinned", "deleted" or "reset".
+        note_id (int): The note that changed. Not a foreign key, so events
+            outlive deleted notes.
+        owner_id (int | None): The owner of the note; streams only carry
+            their user's events. None for events every board receives
+            (e.g. "reset").
+        data (dict): The event payload (pinned flag and card markup).
+        created_at (datetime): When the event was published.
+    """
+    kind = models.CharField(max_length=16)
+    note_id = models.BigIntegerField()
+    owner_id = models.BigIntegerField(null=True)
+    data = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.kind} note {self.note_id}"
+
+
+class NoteTombstone(models.Model):
+    """
+    Records the deletion of a note for the delta sync API.
+
+    Rows are written by a database trigger when a note is deleted and
+    removed by `compact_tombstones` once every client had time to see
+    them.
+
+    Attributes:
+        note_id (int): The deleted note's id.
+        owner_id (int | None): The deleted note's owner, so a user's sync
+            only returns their own deletions.
+        change_seq (int): Position of the deletion in the change sequence.
+        deleted_at (datetime): When the note was deleted.
+    """
+    note_id = models.BigIntegerField()
+    owner_id = models.BigIntegerField(null=True)
+    change_seq = models.BigIntegerField(unique=True)
+    deleted_at = models.DateTimeField()
+
+    class Meta:
+        """
+        Meta options for the NoteTombstone model.
+        - `indexes`: A user's deletions in sequence order, for sync.
+        """
+        indexes = [
+            models.Index(
+                fields=["owner_id", "change_seq"],
+                name="tombstone_owner_seq_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"note {self.note_id} deleted at #{self.change_seq}"
+
+
+class SyncState(models.Model):
+    """
+    The single-row state of the change sequence.
+
+    Attributes:
+        change_seq (int): The latest value handed out. The triggers bump it
+            on every note write, so comparing it with a client's cursor
+            tells in one primary key lookup whether anything changed.
+        compacted_seq (int): The highest sequence of a compacted
+            tombstone. Clients with an older cursor may have missed
+            deletions and must resynchronise from scratch.
+    """
+    change_seq = models.BigIntegerField(default=0)
+    compacted_seq = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"change #{self.change_seq}"
@@ -0,0 +1,275 @@
+"""
+This file provides keyset (cursor) pagination for the note list.
+
+Instead of counting rows with OFFSET, each page remembers the sort key of
+its first and last note and the next query continues from there. Fetching
+page N therefore costs the same as fetching page 1.
+
+→ Notes are ordered by (pinned, created_at, id), all descending, so that
+  pinned notes stay on top and the id breaks ties between notes created
+  in the same instant.
+→ The boundary is one row-value comparison,
+  `(pinned, created_at, id) < (p, c, i)`, which SQLite turns into a seek
+  on the (owner, pinned, created_at, id) index. The equivalent OR of
+  three conditions only lets it seek on the owner and walk every index
+  entry before the cursor, so deep pages got slower with their depth.
+→ Cursors are opaque, URL-safe tokens. A tampered or malformed cursor is
+  treated defensively: the first page is shown instead of an error.
+"""
+
+import base64
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import (
+    BigIntegerField,
+    BooleanField,
+    DateTimeField,
+    Expression,
+    F,
+    Value,
+)
+
+# Ordering used by every keyset query (newest pinned notes first).
+NOTE_ORDERING = ("-pinned", "-created_at", "-id")
+REVERSE_ORDERING = ("pinned", "created_at", "id")
+
+DEFAULT_PAGE_SIZE = 20
+DEFAULT_MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+@dataclass
+class KeysetPage:
+    """
+    A single page of notes produced by `paginate_notes`.
+
+    Attributes:
+        notes (list): The notes on this page, in display order.
+        next_cursor (str | None): Token for the following (older) page.
+        prev_cursor (str | None): Token for the preceding (newer) page.
+        page_size (int): The page size that was applied.
+    """
+    notes: list = field(default_factory=list)
+    next_cursor: str = None
+    prev_cursor: str = None
+    page_size: int = DEFAULT_PAGE_SIZE
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+
+def get_page_size(requested=None):
+    """
+    Returns the page size to use, honouring the configured default and cap.
+
+    Args:
+        requested (str | int | None): A page size asked for by the client,
+            e.g. from the `page_size` query parameter.
+
+    Returns:
+        int: A page size between 1 and `NOTES_MAX_PAGE_SIZE`.
+    """
+    default = getattr(settings, "NOTES_PAGE_SIZE", DEFAULT_PAGE_SIZE)
+    maximum = getattr(settings, "NOTES_MAX_PAGE_SIZE", DEFAULT_MAX_PAGE_SIZE)
+    try:
+        size = int(requested) if requested else default
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, maximum))
+
+
+def encode_cursor(note, direction):
+    """
+    Encodes the sort key of a note into an opaque cursor token.
+
+    Args:
+        note (Note): The boundary note of the current page.
+        direction (str): "next" to continue after the note, "prev" to
+            continue before it.
+
+    Returns:
+        str: A URL-safe token.
+    """
+    payload = {
+        "d": direction,
+        "p": int(note.pinned),
+        "c": note.created_at.isoformat(),
+        "i": note.pk,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """
+    Decodes a cursor token produced by `encode_cursor`.
+
+    Args:
+        token (str): The token received from the client.
+
+    Returns:
+        tuple: (direction, pinned, created_at, id).
+
+    Raises:
+        InvalidCursor: If the token is malformed.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = payload["d"]
+        if direction not in ("next", "prev"):
+            raise ValueError(direction)
+        return (
+            direction,
+            bool(payload["p"]),
+            datetime.fromisoformat(payload["c"]),
+            int(payload["i"]),
+        )
+    except (ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursor("Invalid pagination cursor.") from exc
+
+
+class RowCompare(Expression):
+    """
+    A row-value comparison, `(a, b, c) < (x, y, z)`, usable in filter().
+
+    Args:
+        fields (tuple): Names of the compared fields, in index order.
+        values (tuple): Expressions compared with them.
+        operator (str): "<" or ">".
+    """
+    conditional = True
+    output_field = BooleanField()
+
+    def __init__(self, fields, values, operator):
+        super().__init__()
+        self.lhs = [F(name) for name in fields]
+        self.rhs = list(values)
+        self.operator = operator
+
+    def get_source_expressions(self):
+        return [*self.lhs, *self.rhs]
+
+    def set_source_expressions(self, exprs):
+        self.lhs, self.rhs = exprs[: len(self.lhs)], exprs[len(self.lhs):]
+
+    def as_sql(self, compiler, connection):
+        sides, params = [], []
+        for side in (self.lhs, self.rhs):
+            parts = []
+            for expression in side:
+                sql, expression_params = compiler.compile(expression)
+                parts.append(sql)
+                params.extend(expression_params)
+            sides.append(", ".join(parts))
+        return f"({sides[0]}) {self.operator} ({sides[1]})", params
+
+
+def _sort_key(pinned, created_at, pk):
+    return (
+        Value(pinned, output_field=BooleanField()),
+        Value(created_at, output_field=DateTimeField()),
+        Value(pk, output_field=BigIntegerField()),
+    )
+
+
+def rows_after(pinned, created_at, pk):
+    """Rows that sort after the given key in `NOTE_ORDERING`."""
+    return RowCompare(
+        REVERSE_ORDERING, _sort_key(pinned, created_at, pk), "<"
+    )
+
+
+def rows_before(pinned, created_at, pk):
+    """Rows that sort before the given key in `NOTE_ORDERING`."""
+    return RowCompare(
+        REVERSE_ORDERING, _sort_key(pinned, created_at, pk), ">"
+    )
+
+
+def paginate_notes(queryset, cursor=None, page_size=None):
+    """
+    Returns one page of notes starting from the given cursor.
+
+    Only `page_size + 1` rows are fetched: the extra row tells us whether
+    another page exists without running a COUNT query.
+
+    Args:
+        queryset (QuerySet): The notes to paginate (any ordering is
+            replaced by the keyset ordering).
+        cursor (str | None): A token from a previous page, or None for the
+            first page.
+        page_size (int | None): Number of notes per page.
+
+    Returns:
+        KeysetPage: The notes on the page plus next/previous cursors.
+    """
+    size = get_page_size(page_size)
+    page_queryset, direction = _page_queryset(queryset, cursor, size)
+    return _build_page(list(page_queryset), direction, size)
+
+
+async def apaginate_notes(queryset, cursor=None, page_size=None):
+    """
+    Async version of `paginate_notes`, using async queryset iteration.
+
+    Args:
+        queryset (QuerySet): The notes to paginate.
+        cursor (str | None): A token from a previous page, or None.
+        page_size (int | None): Number of notes per page.
+
+    Returns:
+        KeysetPage: The notes on the page plus next/previous cursors.
+    """
+    size = get_page_size(page_size)
+    page_queryset, direction = _page_queryset(queryset, cursor, size)
+    rows = [note async for note in page_queryset]
+    return _build_page(rows, direction, size)
+
+
+def _page_queryset(queryset, cursor, size):
+    """Returns the (unevaluated) query for a page and its direction."""
+    direction = None
+    if cursor:
+        try:
+            direction, pinned, created_at, pk = decode_cursor(cursor)
+        except InvalidCursor:
+            direction = None
+
+    if direction == "prev":
+        queryset = queryset.filter(
+            rows_before(pinned, created_at, pk)
+        ).order_by(*REVERSE_ORDERING)
+    else:
+        if direction == "next":
+            queryset = queryset.filter(rows_after(pinned, created_at, pk))
+        queryset = queryset.order_by(*NOTE_ORDERING)
+    return queryset[: size + 1], direction
+
+
+def _build_page(rows, direction, size):
+    """Turns the fetched rows (one more than a page) into a KeysetPage."""
+    if direction == "prev":
+        notes = rows[:size][::-1]
+        has_previous, has_next = len(rows) > size, True
+    else:
+        notes = rows[:size]
+        has_previous, has_next = direction == "next", len(rows) > size
+
+    page = KeysetPage(notes=notes, page_size=size)
+    if notes and has_next:
+        page.next_cursor = encode_cursor(notes[-1], "next")
+    if notes and has_previous:
+        page.prev_cursor = encode_cursor(notes[0], "prev")
+    return page
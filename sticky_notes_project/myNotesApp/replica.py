@@ -0,0 +1,290 @@
+"""
+This file routes the board's read traffic to an optional read replica.
+
+The replica is the database alias named by `NOTES_REPLICA_DATABASE`
+("replica"), when `DATABASES` defines it. Locally it is an SQLite copy
+of the primary, refreshed in place with SQLite's online backup API by
+`manage.py refresh_replica` (settings.py adds the alias when
+`DJANGO_REPLICA_DB_PATH` is set). Without the alias every query goes to
+the primary, exactly as before.
+
+→ Only GET and HEAD requests to the views in `NOTES_REPLICA_VIEWS` (the
+  note list, detail, search and trash pages) read from the replica, and
+  only the note, tag and note-tag tables. Writes, sessions and users,
+  delta sync and the event log always use the primary.
+→ Read-after-write: every write request sets a cookie with its time.
+  Until the replica has been refreshed after that time, the browser's
+  reads stick to the primary, so users always see their own changes.
+→ Lag guard: when the last refresh started more than
+  `NOTES_REPLICA_MAX_LAG` seconds ago (the refresher stopped or fell
+  behind), every read falls back to the primary.
+→ Cached list pages are keyed on the copy they were read from (see
+  `read_generation`), so a page built from an older replica never
+  answers for the primary or for a newer copy.
+"""
+
+import contextvars
+import math
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+DEFAULT_REPLICA_ALIAS = "replica"
+DEFAULT_MAX_LAG = 10.0
+DEFAULT_REPLICA_VIEWS = (
+    "note_list",
+    "note_detail",
+    "note_search",
+    "note_trash",
+)
+# Pages copied per backup step; the primary is only locked during a step.
+DEFAULT_REFRESH_PAGES = 1024
+
+WRITE_COOKIE = "notes_wrote_at"
+REPLICATED_MODELS = frozenset({"note", "tag", "notetag"})
+SAFE_METHODS = ("GET", "HEAD")
+
+# The request being served, read by the router when a query is routed.
+_request = contextvars.ContextVar("notes_replica_request", default=None)
+
+
+def get_replica_alias():
+    """
+    Returns the replica's database alias.
+
+    Returns:
+        str | None: The alias, or None when no replica is configured.
+    """
+    alias = getattr(
+        settings, "NOTES_REPLICA_DATABASE", DEFAULT_REPLICA_ALIAS
+    )
+    return alias if alias in settings.DATABASES else None
+
+
+def get_max_lag():
+    """Returns how many seconds the replica may lag behind the primary."""
+    return getattr(settings, "NOTES_REPLICA_MAX_LAG", DEFAULT_MAX_LAG)
+
+
+def marker_path(alias):
+    """
+    Returns the path of the file recording when a replica was refreshed.
+
+    Args:
+        alias (str): The replica's database alias.
+
+    Returns:
+        str: The database file name with ".refreshed" appended.
+    """
+    return f"{settings.DATABASES[alias]['NAME']}.refreshed"
+
+
+def replica_refreshed_at(alias):
+    """
+    Returns when the last completed refresh of a replica started.
+
+    Args:
+        alias (str): The replica's database alias.
+
+    Returns:
+        float | None: Epoch seconds, or None if it was never refreshed.
+    """
+    try:
+        with open(marker_path(alias)) as marker:
+            return float(marker.read())
+    except (OSError, ValueError):
+        return None
+
+
+def choose_replica(wrote_at=None):
+    """
+    Decides whether a read may be served by the replica.
+
+    Args:
+        wrote_at (float | None): When the client last wrote, in epoch
+            seconds, or None.
+
+    Returns:
+        float | None: When the replica to read from was refreshed, or
+        None if the read must go to the primary: no replica is
+        configured, it lags more than `NOTES_REPLICA_MAX_LAG`, or it
+        does not contain the client's last write yet.
+    """
+    alias = get_replica_alias()
+    if alias is None:
+        return None
+    refreshed_at = replica_refreshed_at(alias)
+    if refreshed_at is None or time.time() - refreshed_at > get_max_lag():
+        return None
+    if wrote_at is not None and refreshed_at <= wrote_at:
+        return None
+    return refreshed_at
+
+
+def _wrote_at(request):
+    try:
+        return float(request.COOKIES[WRITE_COOKIE])
+    except (KeyError, ValueError):
+        return None
+
+
+def _replica_for(request):
+    """
+    Returns when the replica serving a request was refreshed, or None.
+
+    The decision is made at the first routed query, once the URL has been
+    resolved, and kept for the rest of the request so that all its reads
+    see the same copy.
+    """
+    if not hasattr(request, "_notes_replica"):
+        match = getattr(request, "resolver_match", None)
+        views = getattr(settings, "NOTES_REPLICA_VIEWS", DEFAULT_REPLICA_VIEWS)
+        eligible = (
+            request.method in SAFE_METHODS
+            and match is not None
+            and match.url_name in views
+        )
+        request._notes_replica = (
+            choose_replica(_wrote_at(request)) if eligible else None
+        )
+    return request._notes_replica
+
+
+def read_generation():
+    """
+    Identifies the copy of the data the current request reads.
+
+    Returns:
+        str: "" on the primary, or a suffix naming the replica refresh.
+    """
+    request = _request.get()
+    refreshed_at = _replica_for(request) if request is not None else None
+    return "" if refreshed_at is None else f"@r{refreshed_at:.6f}"
+
+
+class ReplicaRouter:
+    """
+    Sends eligible reads of notes and tags to the replica.
+
+    Every other query is left to the default database.
+    """
+
+    def db_for_read(self, model, **hints):
+        """Returns the replica alias for eligible reads, else None."""
+        request = _request.get()
+        if (
+            request is None
+            or model._meta.app_label != "myNotesApp"
+            or model._meta.model_name not in REPLICATED_MODELS
+            or _replica_for(request) is None
+        ):
+            return None
+        return get_replica_alias()
+
+    def db_for_write(self, model, **hints):
+        """Leaves every write on the default database."""
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Allows relations between rows read from either copy."""
+        aliases = {"default", get_replica_alias()}
+        if {obj1._state.db, obj2._state.db} <= aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Never migrates the replica, which is a copy of the primary."""
+        if db == get_replica_alias():
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Makes the current request visible to the router and sets the
+    read-after-write cookie on write requests.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _request.set(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request.reset(token)
+        return self._mark_write(request, response)
+
+    async def __acall__(self, request):
+        token = _request.set(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request.reset(token)
+        return self._mark_write(request, response)
+
+    def _mark_write(self, request, response):
+        if request.method in SAFE_METHODS or get_replica_alias() is None:
+            return response
+        # After the lag guard's limit the replica is either refreshed or
+        # bypassed, so the cookie is not needed any longer.
+        response.set_cookie(
+            WRITE_COOKIE,
+            f"{time.time():.6f}",
+            max_age=math.ceil(get_max_lag()) + 1,
+            httponly=True,
+            samesite="Lax",
+        )
+        return response
+
+
+def refresh_replica(
+    alias=None, source="default", pages=DEFAULT_REFRESH_PAGES, pause=0.0
+):
+    """
+    Copies the primary into the replica with SQLite's online backup API.
+
+    The copy is made `pages` pages at a time (see `backup.copy_database`),
+    so writers on the primary are only held up for one step, and written
+    over the replica in place, so open replica connections see the new
+    data. The start time is then recorded for the lag guard: the copy
+    holds every write committed before it.
+
+    Args:
+        alias (str | None): The replica's alias; defaults to
+            `NOTES_REPLICA_DATABASE`.
+        source (str): The alias of the primary.
+        pages (int): Pages copied per step.
+        pause (float): Seconds to sleep between steps.
+
+    Returns:
+        CopyStats: The size, duration and step times of the copy.
+
+    Raises:
+        ValueError: If no replica is configured.
+    """
+    # Imported here: backup.py uses the list cache, which imports this
+    # module.
+    from .backup import copy_database, database_path
+
+    alias = alias or get_replica_alias()
+    if alias is None:
+        raise ValueError("No replica database is configured.")
+    started = time.time()
+    stats = copy_database(
+        database_path(source), database_path(alias), pages, pause
+    )
+    marker = marker_path(alias)
+    with open(f"{marker}.tmp", "w") as tmp:
+        tmp.write(f"{started:.6f}")
+    os.replace(f"{marker}.tmp", marker)
+    return stats
@@ -0,0 +1,414 @@
+"""
+This file implements the revision history of notes.
+
+Every saved version of a note's title and content is kept as a
+NoteRevision, numbered 1, 2, 3... per note. Storing each version in full
+would multiply the size of the notes table, so most revisions only hold
+a delta against the version before them.
+
+→ A delta lists the runs of the previous text that are kept (as
+  [start, end] offsets) and the new text in between: the common prefix
+  and suffix of the two versions, and the changed span. Deltas and
+  keyframes are JSON, zlib-compressed when that makes them smaller.
+→ Revision 1 and every `NOTES_REVISION_KEYFRAME_INTERVAL`-th revision
+  after it are keyframes holding the full text, so rebuilding any
+  version applies at most one interval of deltas.
+→ Writing a revision is one indexed lookup of the note's latest revision
+  and one INSERT. The previous text is the one the note was loaded with
+  (see `Note.from_db`), so it never has to be rebuilt. When it is not
+  known, or does not match the latest revision (e.g. a concurrent edit
+  wrote one in between), a keyframe is written instead, so a delta is
+  only ever stored against the exact text it applies to.
+→ Notes created before the history existed, or by bulk inserts, get the
+  version they were loaded with as a keyframe on their first edit.
+→ `revision_page` reads the history newest first, `page_size` versions
+  at a time, rebuilding them from the nearest keyframe.
+"""
+
+import hashlib
+import json
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import OuterRef, Subquery
+
+from .models import NoteRevision
+
+DEFAULT_KEYFRAME_INTERVAL = 20
+DEFAULT_HISTORY_PAGE_SIZE = 10
+
+# Attempts at numbering a revision when concurrent edits take the number.
+WRITE_ATTEMPTS = 3
+
+# First byte of the stored data: compressed or plain JSON.
+COMPRESSED = b"z"
+PLAIN = b"j"
+
+
+def get_keyframe_interval():
+    """Returns how many revisions apart full keyframes are stored."""
+    return max(
+        1,
+        getattr(
+            settings,
+            "NOTES_REVISION_KEYFRAME_INTERVAL",
+            DEFAULT_KEYFRAME_INTERVAL,
+        ),
+    )
+
+
+def get_history_page_size():
+    """Returns how many revisions one page of history shows."""
+    return getattr(
+        settings, "NOTES_HISTORY_PAGE_SIZE", DEFAULT_HISTORY_PAGE_SIZE
+    )
+
+
+def text_digest(title, content):
+    """
+    Returns a short digest identifying one version of a note.
+
+    Args:
+        title (str): The note title.
+        content (str): The note content.
+
+    Returns:
+        str: 16 hex characters.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(title.encode())
+    digest.update(b"\0")
+    digest.update(content.encode())
+    return digest.hexdigest()
+
+
+def make_delta(old, new):
+    """
+    Returns the edit turning `old` into `new`.
+
+    The common prefix and suffix are kept and only what lies between
+    them is stored, which takes a single linear pass over notes of at
+    most a few hundred characters. A general diff would store scattered
+    edits more tightly, but costs milliseconds on every save; the
+    changed span is compressed anyway.
+
+    Args:
+        old (str): The previous text.
+        new (str): The new text.
+
+    Returns:
+        list: [start, end] runs copied from `old` and the string inserted
+        between them.
+    """
+    size = min(len(old), len(new))
+    start = 0
+    while start < size and old[start] == new[start]:
+        start += 1
+    end = 0
+    while end < size - start and old[-1 - end] == new[-1 - end]:
+        end += 1
+    delta = []
+    if start:
+        delta.append([0, start])
+    if len(new) - end > start:
+        delta.append(new[start:len(new) - end])
+    if end:
+        delta.append([len(old) - end, len(old)])
+    return delta
+
+
+def apply_delta(old, delta):
+    """
+    Rebuilds a text from the previous one and a `make_delta` result.
+
+    Args:
+        old (str): The previous text.
+        delta (list): The edit.
+
+    Returns:
+        str: The new text.
+    """
+    return "".join(
+        part if isinstance(part, str) else old[part[0]:part[1]]
+        for part in delta
+    )
+
+
+def pack(data):
+    """Serialises revision data, compressing it when that is smaller."""
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    packed = zlib.compress(raw)
+    if len(packed) < len(raw):
+        return COMPRESSED + packed
+    return PLAIN + raw
+
+
+def unpack(blob):
+    """Reverses `pack`."""
+    blob = bytes(blob)
+    raw = blob[1:]
+    if blob[:1] == COMPRESSED:
+        raw = zlib.decompress(raw)
+    return json.loads(raw)
+
+
+def _keyframe(note, number, title, content):
+    return NoteRevision(
+        note=note,
+        number=number,
+        keyframe=True,
+        data=pack({"t": title, "c": content}),
+        digest=text_digest(title, content),
+    )
+
+
+def _latest_queryset(note_ids):
+    """Returns (note id, number, digest) of each note's last revision."""
+    latest = NoteRevision.objects.filter(
+        note=OuterRef("note_id")
+    ).order_by("-number")
+    return NoteRevision.objects.filter(
+        note_id__in=note_ids,
+        number=Subquery(latest.values("number")[:1]),
+    ).values_list("note_id", "number", "digest")
+
+
+def _latest_revisions(notes):
+    """Returns {note id: (number, digest)} of each note's last revision."""
+    rows = _latest_queryset([note.pk for note in notes])
+    return {note_id: (number, digest) for note_id, number, digest in rows}
+
+
+def _new_revisions(note, latest, interval):
+    """Returns the revisions recording the note's current text."""
+    title, content = note.title, note.content
+    base = note._revision_base
+    number, previous = latest or (0, None)
+    revisions = []
+    if latest is None and base is not None:
+        # First edit of a note without history: keep what it replaced.
+        number += 1
+        previous = text_digest(*base)
+        revisions.append(_keyframe(note, number, *base))
+    number += 1
+    if (
+        base is None
+        or previous != text_digest(*base)
+        or (number - 1) % interval == 0
+    ):
+        revisions.append(_keyframe(note, number, title, content))
+    else:
+        revisions.append(
+            NoteRevision(
+                note=note,
+                number=number,
+                keyframe=False,
+                data=pack(
+                    {
+                        "t": make_delta(base[0], title),
+                        "c": make_delta(base[1], content),
+                    }
+                ),
+                digest=text_digest(title, content),
+            )
+        )
+    return revisions
+
+
+def record_revisions(notes, created=False):
+    """
+    Records the current title and content of saved notes as revisions.
+
+    Notes whose title and content did not change since they were loaded
+    (e.g. only pinned) are skipped.
+
+    Args:
+        notes (list): Notes that were just saved.
+        created (bool): Whether the notes were just created, so have no
+            revisions yet.
+
+    Returns:
+        list: The NoteRevision rows written.
+    """
+    notes = [
+        note
+        for note in notes
+        if note._revision_base != (note.title, note.content)
+    ]
+    if not notes:
+        return []
+    interval = get_keyframe_interval()
+    for attempt in range(WRITE_ATTEMPTS):
+        latest = {} if created else _latest_revisions(notes)
+        revisions = [
+            revision
+            for note in notes
+            for revision in _new_revisions(
+                note, latest.get(note.pk), interval
+            )
+        ]
+        try:
+            with transaction.atomic():
+                NoteRevision.objects.bulk_create(revisions)
+            break
+        except IntegrityError:
+            # A concurrent edit took the number; number after it.
+            if attempt == WRITE_ATTEMPTS - 1:
+                raise
+            created = False
+    for note in notes:
+        note._revision_base = (note.title, note.content)
+    return revisions
+
+
+@dataclass
+class Version:
+    """
+    One rebuilt version of a note.
+
+    Attributes:
+        number (int): The revision number, starting at 1.
+        title (str): The title at this revision.
+        content (str): The content at this revision.
+        created_at (datetime): When the revision was saved.
+        keyframe (bool): Whether it is stored in full.
+        stored_bytes (int): Size of the stored revision data.
+    """
+    number: int
+    title: str
+    content: str
+    created_at: datetime
+    keyframe: bool
+    stored_bytes: int
+
+
+@dataclass
+class HistoryPage:
+    """
+    A page of a note's history produced by `revision_page`.
+
+    Attributes:
+        versions (list): Versions on this page, newest first.
+        next_before (int | None): Pass as `before` for the older page.
+    """
+    versions: list = field(default_factory=list)
+    next_before: int = None
+
+    @property
+    def has_next(self):
+        return self.next_before is not None
+
+
+def _rebuild(revisions):
+    """Yields a Version for each revision, oldest first."""
+    title = content = ""
+    for revision in revisions:
+        data = unpack(revision.data)
+        if revision.keyframe:
+            title, content = data["t"], data["c"]
+        else:
+            title = apply_delta(title, data["t"])
+            content = apply_delta(content, data["c"])
+        yield Version(
+            number=revision.number,
+            title=title,
+            content=content,
+            created_at=revision.created_at,
+            keyframe=revision.keyframe,
+            stored_bytes=len(revision.data),
+        )
+
+
+def revision_page(note, before=None, page_size=None):
+    """
+    Returns one page of a note's history, newest first.
+
+    The page's revision numbers are read from the (note, number) index
+    alone, then only the revisions from the nearest keyframe before the
+    page up to its newest one are loaded and rebuilt, so every page
+    costs two queries and at most `page_size` plus one keyframe interval
+    of revisions, however long the history is.
+
+    Args:
+        note (Note): The note.
+        before (int | None): Only show revisions numbered below this,
+            from a previous page's `next_before`.
+        page_size (int | None): Versions per page; defaults to
+            `NOTES_HISTORY_PAGE_SIZE`.
+
+    Returns:
+        HistoryPage: The versions and the cursor of the older page.
+    """
+    size = page_size or get_history_page_size()
+    revisions = NoteRevision.objects.filter(note=note)
+    numbers = revisions.order_by("-number")
+    if before is not None:
+        numbers = numbers.filter(number__lt=before)
+    numbers = list(numbers.values_list("number", flat=True)[: size + 1])
+    page = HistoryPage()
+    if not numbers:
+        return page
+    if len(numbers) > size:
+        numbers = numbers[:size]
+        page.next_before = numbers[-1]
+    newest, oldest = numbers[0], numbers[-1]
+    page.versions = [
+        version
+        for version in _rebuild(_chain_queryset(note, oldest, newest))
+        if version.number >= oldest
+    ][::-1]
+    return page
+
+
+def _chain_queryset(note, oldest, newest):
+    """Returns the revisions needed to rebuild `oldest` to `newest`."""
+    revisions = NoteRevision.objects.filter(note=note)
+    keyframe = revisions.filter(number__lte=oldest, keyframe=True).order_by(
+        "-number"
+    )
+    return revisions.filter(
+        number__gte=Subquery(keyframe.values("number")[:1]),
+        number__lte=newest,
+    ).order_by("number")
+
+
+arevision_page = sync_to_async(revision_page)
+
+
+def get_version(note, number):
+    """
+    Rebuilds one version of a note.
+
+    Args:
+        note (Note): The note.
+        number (int): The revision number.
+
+    Returns:
+        Version | None: The version, or None if there is no such revision.
+    """
+    versions = revision_page(note, before=number + 1, page_size=1).versions
+    if versions and versions[0].number == number:
+        return versions[0]
+    return None
+
+
+def parse_before(value):
+    """
+    Reads the `before` cursor of a history page request.
+
+    Args:
+        value (str | None): The query parameter.
+
+    Returns:
+        int | None: The revision number, or None (the newest page) when
+        it is missing or malformed.
+    """
+    try:
+        before = int(value)
+    except (TypeError, ValueError):
+        return None
+    return before if before > 0 else None
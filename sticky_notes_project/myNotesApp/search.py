@@ -0,0 +1,258 @@
+"""
+This file provides full-text search over note titles and content.
+
+On SQLite, searches are answered by an FTS5 virtual table
+(`myNotesApp_note_fts`) that is kept in sync with the note table by
+database triggers (see migration 0004), so latency stays flat as the
+board grows instead of growing linearly like a LIKE scan.
+
+→ The MATCH runs on its own first (a materialized CTE over the FTS
+  table), and only its hits are checked against the notes in scope.
+  Asking FTS5 for `rowid IN (<scope>)` instead makes SQLite probe the
+  index once per note in scope, so a search got slower with every note
+  on the board.
+→ Results are ranked with BM25 (title matches weigh more than content).
+→ Snippets are cut from the loaded content around the first match and
+  highlighted with <mark> tags, so their cost does not depend on how
+  many notes match. The note text is escaped first, so user content can
+  never inject HTML.
+→ The search runs on the database the queryset reads from, so with a
+  read replica (see replica.py) both the MATCH and the loading of the
+  hits are served by the same copy.
+→ Other database backends fall back to an `icontains` filter so the app
+  keeps working outside SQLite.
+"""
+
+import re
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Note
+
+FTS_TABLE = "myNotesApp_note_fts"
+
+# BM25 column weights for (title, content).
+TITLE_WEIGHT = 10.0
+CONTENT_WEIGHT = 1.0
+
+DEFAULT_SEARCH_LIMIT = 50
+
+# Words of content shown in a snippet, and before its first match.
+SNIPPET_WORDS = 16
+SNIPPET_LEAD = 3
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_available(using=DEFAULT_DB_ALIAS):
+    """
+    Returns True if searches can be served by the FTS5 table.
+
+    Args:
+        using (str): The database alias.
+
+    Returns:
+        bool: True on SQLite, where migration 0004 creates the table.
+    """
+    return connections[using].vendor == "sqlite"
+
+
+def build_match_query(query):
+    """
+    Turns free text typed by a user into a safe FTS5 MATCH expression.
+
+    Each word is quoted (so FTS5 operators in the input have no effect)
+    and used as a prefix, and all words must match.
+
+    Args:
+        query (str): The raw search text.
+
+    Returns:
+        str: A MATCH expression, or an empty string if the text contains
+        no searchable words.
+    """
+    terms = _TERM_RE.findall(query or "")
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def make_snippet(content, query):
+    """
+    Returns an excerpt of a note's content with the search terms marked.
+
+    Like FTS5's `snippet()`, the excerpt is `SNIPPET_WORDS` words long
+    and every word starting with a search term is wrapped in <mark>. It
+    starts a few words before the first match (or at the start when only
+    the title matched).
+
+    Args:
+        content (str): The note content.
+        query (str): The raw search text.
+
+    Returns:
+        SafeString: The escaped, highlighted excerpt.
+    """
+    prefixes = tuple(term.lower() for term in _TERM_RE.findall(query or ""))
+    words = list(_TERM_RE.finditer(content))
+    hits = [
+        bool(prefixes) and word.group().lower().startswith(prefixes)
+        for word in words
+    ]
+    first = hits.index(True) if True in hits else 0
+    start = max(0, min(first - SNIPPET_LEAD, len(words) - SNIPPET_WORDS))
+    end = min(len(words), start + SNIPPET_WORDS)
+
+    parts = ["…"] if start else []
+    position = words[start].start() if start else 0
+    for word, hit in zip(words[start:end], hits[start:end]):
+        parts.append(escape(content[position:word.start()]))
+        text = escape(word.group())
+        parts.append(f"<mark>{text}</mark>" if hit else text)
+        position = word.end()
+    if end < len(words):
+        parts.append("…")
+    else:
+        parts.append(escape(content[position:]))
+    return mark_safe("".join(parts))
+
+
+def match_sql(match, queryset, limit):
+    """
+    Returns the SQL ranking the notes of a queryset that match a search.
+
+    The MATCH is materialized first, ordered by FTS5's own `rank` (BM25
+    with the title and content weights), and only then are its hits
+    looked up in the scope. Sorting the hits is the only step that grows
+    with the number of matches; nothing grows with the notes in scope
+    that do not match.
+
+    Args:
+        match (str): A `build_match_query` expression.
+        queryset (QuerySet): The notes in scope.
+        limit (int): Maximum number of rows; -1 for all.
+
+    Returns:
+        tuple: (sql, params) selecting (id, rank), best match first, for
+        the queryset's database.
+    """
+    scope = queryset.values("id")
+    scope_sql, scope_params = scope.query.get_compiler(scope.db).as_sql()
+    sql = (
+        f"WITH hits AS MATERIALIZED ("
+        f"SELECT rowid AS id, rank FROM {FTS_TABLE} "
+        f"WHERE {FTS_TABLE} MATCH %s AND rank MATCH %s) "
+        f"SELECT id, rank FROM hits WHERE id IN ({scope_sql}) "
+        "ORDER BY rank LIMIT %s"
+    )
+    rank = f"bm25({TITLE_WEIGHT}, {CONTENT_WEIGHT})"
+    return sql, [match, rank, *scope_params, limit]
+
+
+def filter_matching(queryset, query):
+    """
+    Filters a queryset down to the notes matching a search, unranked.
+
+    The MATCH runs once as an uncorrelated subquery, so the filter costs
+    the same however many notes the queryset holds.
+
+    Args:
+        queryset (QuerySet): The notes to filter.
+        query (str): The raw search text.
+
+    Returns:
+        QuerySet: The matching notes; none if the text has no words.
+    """
+    match = build_match_query(query)
+    if not match:
+        return queryset.none()
+    if not fts_available(queryset.db):
+        return queryset.filter(_fallback_condition(query))
+    return queryset.filter(
+        pk__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+            [match],
+        )
+    )
+
+
+def search_notes(query, queryset=None, limit=None):
+    """
+    Returns the notes matching a search, best match first.
+
+    Each returned note has a `snippet` attribute holding a highlighted
+    excerpt of its content and a `rank` attribute holding its BM25 score
+    (lower is better).
+
+    Args:
+        query (str): The raw search text.
+        queryset (QuerySet | None): Restricts the search to these notes,
+            e.g. one user's. Defaults to all live notes.
+        limit (int | None): Maximum number of results.
+
+    Returns:
+        list: Matching Note instances.
+    """
+    if queryset is None:
+        queryset = Note.objects.live()
+    if limit is None:
+        limit = getattr(settings, "NOTES_SEARCH_LIMIT", DEFAULT_SEARCH_LIMIT)
+
+    match = build_match_query(query)
+    if not match:
+        return []
+    # The queryset's alias, as routed (e.g. to the replica).
+    using = queryset.db
+    if not fts_available(using):
+        return _search_fallback(query, queryset, limit)
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(*match_sql(match, queryset, limit))
+        hits = cursor.fetchall()
+
+    notes = Note.objects.using(using).in_bulk([pk for pk, _ in hits])
+    results = []
+    for pk, rank in hits:
+        note = notes.get(pk)
+        if note is not None:
+            note.rank = rank
+            note.snippet = make_snippet(note.content, query)
+            results.append(note)
+    return results
+
+
+def _search_fallback(query, queryset, limit):
+    """Plain `icontains` search used when FTS5 is not available."""
+    notes = queryset.filter(_fallback_condition(query)).order_by("-pinned")
+    notes = list(notes if limit < 0 else notes[:limit])
+    for note in notes:
+        note.rank = 0
+        note.snippet = make_snippet(note.content, query)
+    return notes
+
+
+def _fallback_condition(query):
+    """Returns the `icontains` filter matching every word of a search."""
+    condition = Q()
+    for term in _TERM_RE.findall(query):
+        condition &= Q(title__icontains=term) | Q(content__icontains=term)
+    return condition
+
+
+def rebuild_index():
+    """
+    Rebuilds the FTS5 table from the note table.
+
+    Returns:
+        bool: False if full-text search is not available on this database.
+    """
+    if not fts_available():
+        return False
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
+    return True
@@ -0,0 +1,90 @@
+"""
+Signal handlers for the Note model.
+
+→ Any save or delete of a note, whether it comes from the views, the
+  admin or the shell, bumps the notes version used by the list cache.
+→ The same changes are published as live-update events (see events.py).
+→ Changing the tags of a note does the same, since cards show the tags
+  and the sidebar counts them. It also moves the note's `updated_at`, so
+  its cached card and HTTP validators change with it.
+→ Every save that changes a note's title or content records a revision
+  (see revisions.py), whichever path the save comes from.
+→ Notes in the trash are no longer on any board, so saving or purging
+  them changes neither the cached list nor the boards. Trashing and
+  restoring are announced by trash.py.
+"""
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import bump_notes_version
+from .events import publish
+from .models import Note
+from .revisions import record_revisions
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def invalidate_note_list(sender, instance, **kwargs):
+    """
+    Marks every cached page of the note list as stale.
+
+    The version is bumped right away and again once the transaction
+    commits, so a page rendered from the old rows in between is never
+    served under the new version.
+    """
+    if instance.deleted_at is not None:
+        return
+    bump_notes_version()
+    transaction.on_commit(bump_notes_version)
+
+
+@receiver(post_save, sender=Note)
+def publish_note_saved(sender, instance, created, **kwargs):
+    """
+    Publishes a "created" or "updated" event for the saved note.
+    """
+    if instance.deleted_at is not None:
+        return
+    publish("created" if created else "updated", instance)
+
+
+@receiver(post_save, sender=Note)
+def record_note_revision(sender, instance, created, raw, **kwargs):
+    """
+    Records the saved title and content in the note's history.
+    """
+    if raw:
+        return
+    record_revisions([instance], created=created)
+
+
+@receiver(post_delete, sender=Note)
+def publish_note_deleted(sender, instance, **kwargs):
+    """
+    Publishes a "deleted" event for the deleted note.
+    """
+    if instance.deleted_at is not None:
+        return
+    publish("deleted", instance)
+
+
+@receiver(m2m_changed, sender=Note.tags.through)
+def note_tags_changed(sender, instance, action, reverse, **kwargs):
+    """
+    Invalidates the list and republishes the card when tags change.
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    bump_notes_version()
+    transaction.on_commit(bump_notes_version)
+    if reverse:
+        return
+    instance.updated_at = timezone.now()
+    Note.objects.filter(pk=instance.pk).update(
+        updated_at=instance.updated_at
+    )
+    if instance.deleted_at is None:
+        publish("updated", instance)
@@ -1,4 +1,174 @@
 // myNotesApp/static/myNotesApp/js/scripts.js
 document.addEventListener('DOMContentLoaded', function () {
     console.log("Sticky Notes Application loaded successfully.");
-});
\ No newline at end of file
+    renderTimes(document);
+    // Keep "... ago" current while the page stays open.
+    setInterval(function () { renderTimes(document); }, 60000);
+});
+
+// Client-side version of Django's timesince filter: note cards carry an
+// ISO timestamp instead of server-rendered "... ago" text, so the same
+// cached card markup stays correct as time passes.
+var TIME_UNITS = [
+    ['year', 365 * 24 * 60],
+    ['month', 30 * 24 * 60],
+    ['week', 7 * 24 * 60],
+    ['day', 24 * 60],
+    ['hour', 60],
+    ['minute', 1]
+];
+
+function timesince(date) {
+    var minutes = Math.max(0, Math.floor((Date.now() - date) / 60000));
+    var parts = [];
+    for (var i = 0; i < TIME_UNITS.length && parts.length < 2; i++) {
+        var count = Math.floor(minutes / TIME_UNITS[i][1]);
+        if (count > 0) {
+            parts.push(count + ' ' + TIME_UNITS[i][0] + (count === 1 ? '' : 's'));
+            minutes -= count * TIME_UNITS[i][1];
+        } else if (parts.length) {
+            // Like Django, only adjacent units are shown together.
+            break;
+        }
+    }
+    return (parts.length ? parts.join(', ') : '0 minutes') + ' ago';
+}
+
+function renderTimes(root) {
+    root.querySelectorAll('.note-time time[datetime]').forEach(function (el) {
+        var date = new Date(el.getAttribute('datetime'));
+        if (!isNaN(date)) {
+            el.textContent = timesince(date);
+        }
+    });
+}
+
+// Pin toggle without a page reload: POST to the toggle URL and swap the
+// returned card fragment in place. Without JavaScript the button still
+// submits the shared form and the server redirects back to the list.
+document.addEventListener('click', function (event) {
+    var button = event.target.closest('.pin-toggle');
+    if (!button) {
+        return;
+    }
+    var form = document.getElementById(button.getAttribute('form'));
+    var token = form && form.querySelector('[name=csrfmiddlewaretoken]');
+    if (!token) {
+        return;
+    }
+    event.preventDefault();
+    button.disabled = true;
+
+    fetch(button.getAttribute('formaction'), {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': token.value,
+            'X-Requested-With': 'XMLHttpRequest',
+            'Accept': 'text/html'
+        },
+        credentials: 'same-origin'
+    }).then(function (response) {
+        if (!response.ok) {
+            throw new Error('Pin toggle failed: ' + response.status);
+        }
+        return response.text();
+    }).then(function (html) {
+        var card = button.closest('[id^="note-"]');
+        var holder = document.createElement('div');
+        holder.innerHTML = html;
+        var fresh = holder.querySelector('[id^="note-"]');
+        renderTimes(fresh);
+        card.replaceWith(fresh);
+    }).catch(function (error) {
+        console.error(error);
+        button.disabled = false;
+    });
+});
+
+// Live board: apply the note events streamed by the server instead of
+// reloading the page. EventSource reconnects on its own and sends the
+// Last-Event-ID it saw, so only missed events are replayed. Applying an
+// event twice is harmless, cards are always replaced by id.
+(function () {
+    var board = document.getElementById('note-board');
+    if (!board || !window.EventSource) {
+        return;
+    }
+    var source = new EventSource(
+        board.dataset.eventsUrl + '?since=' +
+        encodeURIComponent(board.dataset.eventsSince)
+    );
+
+    function place(card, pinned) {
+        // Pinned notes go first, new notes at the top of their section.
+        var anchor = pinned ? board.firstElementChild :
+            board.querySelector('[data-pinned="false"]');
+        board.insertBefore(card, anchor);
+    }
+
+    source.onmessage = function (message) {
+        var event = JSON.parse(message.data);
+        if (event.type === 'reset') {
+            source.close();
+            window.location.reload();
+            return;
+        }
+        var card = document.getElementById('note-' + event.id);
+        if (event.type === 'deleted') {
+            if (card) {
+                card.remove();
+            }
+            return;
+        }
+        var holder = document.createElement('div');
+        holder.innerHTML = event.html;
+        var fresh = holder.firstElementChild;
+        renderTimes(fresh);
+        if (card && event.type !== 'pinned') {
+            card.replaceWith(fresh);
+            return;
+        }
+        if (card) {
+            card.remove();
+        }
+        if (!('firstPage' in board.dataset)) {
+            // New and newly pinned notes belong on the first page.
+            return;
+        }
+        var empty = board.querySelector('.notes-empty');
+        if (empty) {
+            empty.remove();
+        }
+        place(fresh, event.pinned);
+    };
+})();
+
+// Note history: the detail page only links to the history. Clicking the
+// link (or "Older versions" at the end of a page) fetches the next page
+// as a fragment and puts it in place of the link, so revisions are only
+// read and rebuilt when the user asks for them.
+document.addEventListener('click', function (event) {
+    var link = event.target.closest('.history-more');
+    if (!link) {
+        return;
+    }
+    event.preventDefault();
+    link.classList.add('disabled');
+
+    fetch(link.href, {
+        headers: {'X-Requested-With': 'XMLHttpRequest'},
+        credentials: 'same-origin'
+    }).then(function (response) {
+        if (!response.ok) {
+            throw new Error('History failed: ' + response.status);
+        }
+        return response.text();
+    }).then(function (html) {
+        var range = document.createRange();
+        range.selectNode(link);
+        link.replaceWith(range.createContextualFragment(html));
+    }).catch(function (error) {
+        console.error(error);
+        link.classList.remove('disabled');
+    });
+});
@@ -0,0 +1,167 @@
+"""
+This file implements delta sync: "give me everything changed since N".
+
+Every note write takes the next value of a global change sequence (see
+migration 0006), and every delete leaves a NoteTombstone with its own
+sequence value. A client keeps the cursor returned by its last sync and
+asks for the notes and tombstones with a larger sequence.
+
+→ The sequence is shared by all users, but a sync only returns the notes
+  and tombstones of one owner, read from the (owner, change_seq) indexes.
+→ Moving a note to the trash is an update, so it takes a new sequence
+  value; it is reported as a deletion, and as a change again if the note
+  is restored. Purging it later leaves a tombstone as usual.
+→ A client that is up to date is answered from the single SyncState row,
+  with one primary key lookup and no scan of the note table.
+→ Changes are read up to the sequence value seen at the start of the
+  request, so writes racing with the sync are never skipped: they carry
+  a larger value and are returned by the next sync.
+→ `compact_tombstones` deletes old tombstones. Clients whose cursor is
+  older than the compacted range may have missed deletions and get
+  `CursorExpired`, after which they resynchronise from cursor 0.
+"""
+
+import heapq
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Note, NoteTombstone, SyncState
+
+DEFAULT_SYNC_LIMIT = 500
+DEFAULT_TOMBSTONE_RETENTION_DAYS = 30
+
+
+class CursorExpired(ValueError):
+    """Raised when tombstones a client still needed were compacted."""
+
+
+@dataclass
+class ChangeSet:
+    """
+    The changes after a client's cursor.
+
+    Attributes:
+        notes (list): Created or updated notes, in sequence order.
+        deleted (list): Ids of deleted or trashed notes, in sequence
+            order.
+        cursor (int): What the client sends as `since` next time.
+        has_more (bool): Whether more changes follow the cursor.
+    """
+    notes: list = field(default_factory=list)
+    deleted: list = field(default_factory=list)
+    cursor: int = 0
+    has_more: bool = False
+
+
+def get_sync_limit(value=None):
+    """
+    Returns a valid number of changes per sync response.
+
+    Args:
+        value (str | int | None): The requested limit.
+
+    Returns:
+        int: The limit, capped at `NOTES_SYNC_LIMIT`.
+    """
+    maximum = getattr(settings, "NOTES_SYNC_LIMIT", DEFAULT_SYNC_LIMIT)
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return maximum
+    return max(1, min(limit, maximum))
+
+
+def changes_since(since=0, limit=None, owner=None):
+    """
+    Returns the notes and deletions after the cursor `since`.
+
+    Args:
+        since (int): The cursor of the client's previous sync; 0 for a
+            full sync, which skips tombstones and trashed notes since
+            the client has no notes to delete.
+        limit (int | None): Maximum number of changes to return.
+        owner (User | None): Only return this user's changes; None
+            returns everyone's.
+
+    Returns:
+        ChangeSet: The changes, oldest first.
+
+    Raises:
+        CursorExpired: If tombstones after `since` were compacted.
+    """
+    limit = limit or get_sync_limit()
+    latest, compacted = SyncState.objects.values_list(
+        "change_seq", "compacted_seq"
+    ).get(pk=1)
+    if since and since < compacted:
+        raise CursorExpired(
+            f"Cursor {since} is older than compacted changes ({compacted})."
+        )
+    if since >= latest:
+        return ChangeSet(cursor=since)
+
+    window = {"change_seq__gt": since, "change_seq__lte": latest}
+    notes = Note.objects.filter(**window)
+    tombstones = NoteTombstone.objects.filter(**window)
+    if owner is not None:
+        notes = notes.filter(owner=owner)
+        tombstones = tombstones.filter(owner_id=owner.pk)
+    if not since:
+        notes = notes.live()
+    notes = notes.order_by("change_seq")
+    changes = [(note.change_seq, note) for note in notes[: limit + 1]]
+    if since:
+        tombstones = tombstones.order_by("change_seq")
+        changes = heapq.merge(
+            changes,
+            tombstones.values_list("change_seq", "note_id")[: limit + 1],
+            key=lambda change: change[0],
+        )
+    changes = list(changes)
+
+    result = ChangeSet(cursor=latest, has_more=len(changes) > limit)
+    for seq, change in changes[:limit]:
+        if isinstance(change, Note) and change.deleted_at is None:
+            result.notes.append(change)
+        elif isinstance(change, Note):
+            result.deleted.append(change.pk)
+        else:
+            result.deleted.append(change)
+    if result.has_more:
+        result.cursor = changes[limit - 1][0]
+    return result
+
+
+def compact_tombstones(days=None):
+    """
+    Deletes tombstones older than the retention period.
+
+    Args:
+        days (int | None): Age in days; defaults to
+            `NOTES_TOMBSTONE_RETENTION_DAYS`.
+
+    Returns:
+        int: The number of tombstones deleted.
+    """
+    if days is None:
+        days = getattr(
+            settings,
+            "NOTES_TOMBSTONE_RETENTION_DAYS",
+            DEFAULT_TOMBSTONE_RETENTION_DAYS,
+        )
+    cutoff = timezone.now() - timedelta(days=days)
+    with transaction.atomic():
+        expired = NoteTombstone.objects.filter(deleted_at__lt=cutoff)
+        highest = expired.aggregate(seq=Max("change_seq"))["seq"]
+        if highest is None:
+            return 0
+        deleted, _ = expired.delete()
+        SyncState.objects.filter(pk=1, compacted_seq__lt=highest).update(
+            compacted_seq=highest
+        )
+    return deleted
@@ -0,0 +1,266 @@
+"""
+This file implements note tags: parsing, assigning, filtering and facets.
+
+Tags belong to a user and are attached to notes through the NoteTag
+table, which is indexed in both directions: (note, tag) for the tags of
+a note and (tag, note) for the notes of a tag.
+
+→ `filter_by_tags` narrows a queryset to the notes carrying all (AND) or
+  any (OR) of the given tags. Each condition is an
+  `id IN (SELECT note_id ...)` subquery answered from the (tag, note)
+  index alone, so the note list keeps walking its own index in list
+  order and never sorts.
+→ `tag_facets` counts a user's live notes per tag in one aggregate query
+  over the same index. The note list caches the result under the notes
+  version, which every note and tag change bumps.
+→ Tag names are normalised (trimmed, lowercased, inner whitespace
+  collapsed), so "Work" and " work " are the same tag.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from urllib.parse import urlencode
+
+from django.db.models import Count, F
+
+from .models import NoteTag, Tag
+
+MAX_TAG_LENGTH = 50
+MAX_TAGS_PER_NOTE = 10
+
+MATCH_ALL = "all"
+MATCH_ANY = "any"
+
+
+def normalize_tag(name):
+    """
+    Returns the canonical form of a tag name.
+
+    Args:
+        name (str): A tag name as typed by a user.
+
+    Returns:
+        str: The name trimmed, lowercased and with single spaces.
+    """
+    return " ".join(name.split()).lower()
+
+
+def parse_tags(names):
+    """
+    Normalises tag names and drops empty ones and duplicates.
+
+    Args:
+        names (iterable): Tag names, e.g. a comma-separated input split
+            on commas.
+
+    Returns:
+        list: The distinct normalised names, in their original order.
+    """
+    result = []
+    for name in names:
+        name = normalize_tag(name)
+        if name and name not in result:
+            result.append(name)
+    return result
+
+
+@dataclass(frozen=True)
+class TagFilter:
+    """
+    The tag filter of a note list request.
+
+    Attributes:
+        names (tuple): The normalised tag names to filter by.
+        match (str): `MATCH_ALL` (notes with every tag) or `MATCH_ANY`
+            (notes with at least one of them).
+    """
+    names: tuple = ()
+    match: str = MATCH_ALL
+
+    def __bool__(self):
+        return bool(self.names)
+
+    @classmethod
+    def from_params(cls, params):
+        """
+        Reads the filter from query parameters (`tag`, repeated, and
+        `match=any`).
+
+        Args:
+            params (QueryDict): E.g. `request.GET`.
+
+        Returns:
+            TagFilter: The filter; empty when no tag is given.
+        """
+        names = parse_tags(params.getlist("tag"))
+        match = MATCH_ANY if params.get("match") == MATCH_ANY else MATCH_ALL
+        return cls(tuple(names), match)
+
+    def toggled(self, name):
+        """Returns the filter with `name` added, or removed if present."""
+        if name in self.names:
+            names = tuple(n for n in self.names if n != name)
+        else:
+            names = (*self.names, name)
+        return TagFilter(names, self.match)
+
+    def with_match(self, match):
+        """Returns the filter with another match mode."""
+        return TagFilter(self.names, match)
+
+    @property
+    def query_string(self):
+        """The filter as URL query parameters, without a leading "?"."""
+        params = [("tag", name) for name in self.names]
+        if self.names and self.match == MATCH_ANY:
+            params.append(("match", MATCH_ANY))
+        return urlencode(params)
+
+    @property
+    def cache_key(self):
+        """
+        A short string identifying the filter in cache keys.
+
+        Tag names may contain commas, so they are hashed as a JSON list:
+        the tag "a,b" and the tags "a" and "b" get different keys.
+        """
+        if not self.names:
+            return ""
+        names = json.dumps(sorted(self.names)).encode()
+        digest = hashlib.blake2b(names, digest_size=8).hexdigest()
+        return f"{self.match}:{digest}"
+
+
+def filter_by_tags(queryset, owner, tag_filter):
+    """
+    Restricts a queryset of notes to those matching a tag filter.
+
+    Args:
+        queryset (QuerySet): The notes to filter.
+        owner (User): The owner of the tags.
+        tag_filter (TagFilter): The filter; an empty one changes nothing.
+
+    Returns:
+        QuerySet: The filtered notes, still unevaluated.
+    """
+    if not tag_filter:
+        return queryset
+    links = NoteTag.objects.filter(tag__owner=owner)
+    if tag_filter.match == MATCH_ANY:
+        return queryset.filter(
+            pk__in=links.filter(tag__name__in=tag_filter.names).values(
+                "note_id"
+            )
+        )
+    for name in tag_filter.names:
+        queryset = queryset.filter(
+            pk__in=links.filter(tag__name=name).values("note_id")
+        )
+    return queryset
+
+
+def _facets_queryset(owner):
+    # Grouping the links rather than the tags keeps every join inner, so
+    # tags left only on trashed notes drop out instead of counting 0.
+    return (
+        NoteTag.objects.filter(tag__owner=owner, note__deleted_at=None)
+        .values(name=F("tag__name"))
+        .annotate(count=Count("note_id"))
+        .order_by("name")
+    )
+
+
+def tag_facets(owner):
+    """
+    Counts the user's live notes per tag, in one query.
+
+    Args:
+        owner (User): The user whose tags are counted.
+
+    Returns:
+        list: `{"name": str, "count": int}` dicts for the tags on at least
+        one live note, by name.
+    """
+    return list(_facets_queryset(owner))
+
+
+async def atag_facets(owner):
+    """Async version of `tag_facets`."""
+    return [facet async for facet in _facets_queryset(owner)]
+
+
+def get_or_create_tags(owner_id, names):
+    """
+    Returns a user's tags with the given names, creating the missing ones.
+
+    Args:
+        owner_id (int): The id of the tags' owner.
+        names (list): Normalised tag names (see `parse_tags`).
+
+    Returns:
+        list: The Tag objects.
+    """
+    tags = list(Tag.objects.filter(owner_id=owner_id, name__in=names))
+    missing = set(names) - {tag.name for tag in tags}
+    if missing:
+        Tag.objects.bulk_create(
+            [Tag(owner_id=owner_id, name=name) for name in missing],
+            ignore_conflicts=True,
+        )
+        tags = list(Tag.objects.filter(owner_id=owner_id, name__in=names))
+    return tags
+
+
+def set_note_tags(note, names):
+    """
+    Makes `names` the tags of a note, creating the owner's missing tags.
+
+    Nothing is written when the note already has exactly these tags.
+
+    Args:
+        note (Note): A saved note.
+        names (list): Normalised tag names (see `parse_tags`).
+    """
+    current = set(note.tags.values_list("name", flat=True))
+    if current == set(names):
+        return
+    note.tags.set(get_or_create_tags(note.owner_id, names))
+
+
+def tag_filter_context(tag_filter, facets):
+    """
+    Builds the template context of the tag filter and the sidebar facets.
+
+    Args:
+        tag_filter (TagFilter): The filter of the current request.
+        facets (list): The result of `tag_facets`.
+
+    Returns:
+        dict: `tag_filter`, `tag_facets` (each facet with its toggle
+        `query_string` and whether it is `active`), `active_tags` (each
+        with the query string that removes it) and `match_toggle_query`.
+    """
+    return {
+        "tag_filter": tag_filter,
+        "tag_facets": [
+            {
+                **facet,
+                "active": facet["name"] in tag_filter.names,
+                "query_string": tag_filter.toggled(
+                    facet["name"]
+                ).query_string,
+            }
+            for facet in facets
+        ],
+        "active_tags": [
+            {
+                "name": name,
+                "query_string": tag_filter.toggled(name).query_string,
+            }
+            for name in tag_filter.names
+        ],
+        "match_toggle_query": tag_filter.with_match(
+            MATCH_ALL if tag_filter.match == MATCH_ANY else MATCH_ANY
+        ).query_string,
+    }
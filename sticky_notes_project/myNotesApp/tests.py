@@ -9,10 +9,112 @@ Unit tests for models and views.
   views, and form validation.
 """
 
-from django.test import TestCase
-from django.urls import reverse
+import gzip
+import json
+import os
+import re
+import runpy
+import sqlite3
+import tempfile
+import time
+import warnings
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+from unittest import mock
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management import CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connection
+from django.db.models import Q
+from django.db.utils import ConnectionHandler
+from django.test import (
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.http import HttpResponse
+from django.urls import resolve, reverse
+from django.utils import timezone
+from django.utils.http import http_date
 from .models import Note
 from .forms import NoteForm
+from .pagination import (
+    NOTE_ORDERING,
+    REVERSE_ORDERING,
+    paginate_notes,
+    rows_after,
+    rows_before,
+)
+from .search import make_snippet, search_notes
+from . import async_views
+from .benchmark import (
+    ENDPOINTS,
+    benchmark_card_rendering,
+    compare_servers,
+    compare_to_baseline,
+    notes_urlconf,
+    run_benchmarks,
+    seed_notes,
+)
+from .management.commands.sqlite_stress import run_stress
+from .transfer import (
+    MAX_REPORTED_ERRORS,
+    import_notes,
+    iter_export,
+    iter_import_rows,
+)
+from .metrics import (
+    install_template_timer,
+    reset_metrics,
+    uninstall_template_timer,
+)
+from .events import MemoryEventBackend, get_event_backend
+from .models import NoteEvent, NoteRevision, NoteTombstone, SyncState
+from .sync import compact_tombstones
+from .tags import MAX_TAGS_PER_NOTE, set_note_tags, tag_facets
+from .trash import trash_notes
+from .backup import list_snapshots, verify_snapshot
+from .revisions import get_version, revision_page, unpack
+from .replica import (
+    WRITE_COOKIE,
+    ReplicaRouter,
+    ReplicaRoutingMiddleware,
+    marker_path,
+    read_generation,
+    replica_refreshed_at,
+)
+from .cache import (
+    VERSION_KEY,
+    bump_notes_version,
+    cache_stats,
+    get_cache,
+    get_notes_version,
+    reset_cache_stats,
+)
+
+
+def production_settings():
+    """Imports settings_production with the environment it requires."""
+    environ = {
+        "DJANGO_SECRET_KEY": "test-secret",
+        "DJANGO_ALLOWED_HOSTS": "notes.example.com, www.example.com",
+    }
+    with mock.patch.dict(os.environ, environ):
+        return import_module("sticky_notes_project.settings_production")
+
+
+def create_user(username="owner"):
+    """Creates a user to own the notes of a test."""
+    return get_user_model().objects.create_user(
+        username, password="correct horse battery staple"
+    )
 
 
 class NoteModelTest(TestCase):
@@ -28,6 +130,9 @@ class NoteModelTest(TestCase):
         test_note_str():
             Tests the __str__ method of the Note model to ensure it
             returns the title.
+        test_note_requires_owner():
+            Checks that a note without an owner is not saved, although
+            the column is nullable.
     """
     def setUp(self):
         """
@@ -38,8 +143,9 @@ class NoteModelTest(TestCase):
         with a consistent and predictable state.
         """
         # Arrange: Create a sample note for testing
+        self.user = create_user()
         self.note = Note.objects.create(
-            title="Test Note", content="This is a test note."
+            owner=self.user, title="Test Note", content="This is a test note."
         )
 
     def test_note_str(self):
@@ -52,6 +158,18 @@ class NoteModelTest(TestCase):
         # Assert: Check that __str__ returns the title
         self.assertEqual(str(self.note), "Test Note")
 
+    def test_note_requires_owner(self):
+        """
+        The owner is required by the model rather than the database.
+        """
+        # Arrange
+        note = Note(title="Orphan", content="No owner")
+
+        # Act / Assert
+        with self.assertRaisesMessage(ValueError, "must have an owner"):
+            note.save()
+        self.assertFalse(Note.objects.filter(title="Orphan").exists())
+
 
 class NoteViewTest(TestCase):
     """
@@ -80,7 +198,10 @@ class NoteViewTest(TestCase):
         and content, which can be used in view-related test cases.
         """
         # Arrange: Create a note to use in view tests
+        self.user = create_user()
+        self.client.force_login(self.user)
         self.note = Note.objects.create(
+            owner=self.user,
             title="View Test Note", content="Content for view testing."
         )
 
@@ -180,3 +301,3271 @@ class NoteFormTest(TestCase):
         # Act & Assert: Form should be invalid
         self.assertFalse(form.is_valid())
         self.assertIn("title", form.errors)
+
+
+class NotePaginationTest(TestCase):
+    """
+    Test suite for the keyset (cursor) pagination of the note list.
+
+    Methods:
+        setUp():
+            Creates a mix of pinned and unpinned notes.
+        test_pages_cover_all_notes_in_order():
+            Walks every page via next cursors and checks that each note is
+            seen exactly once in pinned-first, newest-first order.
+        test_prev_cursor_returns_previous_page():
+            Checks that the previous cursor leads back to the same page.
+        test_invalid_cursor_falls_back_to_first_page():
+            Checks that a malformed cursor is handled defensively.
+        test_deep_page_seeks_to_the_cursor():
+            Checks that the query plan of a later page seeks the index on
+            the cursor columns instead of walking it from the start.
+    """
+    def setUp(self):
+        """
+        Creates seven notes, two of them pinned, so that a page size of
+        three spans several pages.
+        """
+        # Arrange: Create notes with a few pinned ones in between
+        self.user = create_user()
+        self.client.force_login(self.user)
+        for i in range(7):
+            Note.objects.create(
+                owner=self.user,
+                title=f"Note {i}", content="Content", pinned=i in (1, 4)
+            )
+
+    def test_pages_cover_all_notes_in_order(self):
+        """
+        Follows the next cursors until the last page and verifies that the
+        concatenated pages match the full ordered list.
+        """
+        # Arrange: Expected order for the whole board
+        expected = list(
+            Note.objects.order_by("-pinned", "-created_at", "-id")
+        )
+        seen, cursor = [], None
+
+        # Act: Walk the pages
+        while True:
+            page = paginate_notes(Note.objects.all(), cursor, page_size=3)
+            seen.extend(page.notes)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        # Assert: Every note appears once, in display order
+        self.assertEqual(seen, expected)
+        self.assertTrue(all(n.pinned for n in seen[:2]))
+
+    def test_prev_cursor_returns_previous_page(self):
+        """
+        Moves forward one page and back again, expecting the first page.
+        """
+        # Arrange
+        first = paginate_notes(Note.objects.all(), page_size=3)
+        second = paginate_notes(
+            Note.objects.all(), first.next_cursor, page_size=3
+        )
+
+        # Act
+        back = paginate_notes(
+            Note.objects.all(), second.prev_cursor, page_size=3
+        )
+
+        # Assert
+        self.assertEqual(back.notes, first.notes)
+        self.assertFalse(back.has_previous)
+        self.assertTrue(back.has_next)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        """
+        A tampered cursor must not cause a server error.
+        """
+        # Act
+        response = self.client.get(
+            reverse("note_list"), {"cursor": "not-a-cursor", "page_size": 3}
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["notes"]), 3)
+        self.assertContains(response, "Load more")
+
+    def test_deep_page_seeks_to_the_cursor(self):
+        """
+        The index constraint must include the sort key, so that page N
+        costs the same as page 1 however deep the cursor is.
+        """
+        # Arrange
+        last = Note.objects.order_by(*NOTE_ORDERING).last()
+        notes = Note.objects.live().filter(owner=self.user)
+
+        # Act
+        after = notes.filter(
+            rows_after(last.pinned, last.created_at, last.pk)
+        ).order_by(*NOTE_ORDERING)[:21]
+        before = notes.filter(
+            rows_before(last.pinned, last.created_at, last.pk)
+        ).order_by(*REVERSE_ORDERING)[:21]
+
+        # Assert
+        self.assertIn("(pinned,created_at)<", after.explain())
+        self.assertIn("(pinned,created_at)>", before.explain())
+
+
+class ExplainQueriesCommandTest(TestCase):
+    """
+    Test suite for the `explain_queries` management command.
+
+    Methods:
+        test_hot_queries_use_indexes():
+            Runs the command with `--check` and expects every hot query to
+            be served from an index.
+        test_check_rejects_search_probing_every_note():
+            Checks that a search probing the FTS table by rowid fails.
+        test_check_rejects_page_walking_to_the_cursor():
+            Checks that a next page constraining only the owner fails.
+    """
+    def test_hot_queries_use_indexes(self):
+        """
+        The command must succeed in check mode and print each plan.
+        """
+        # Arrange
+        out = StringIO()
+
+        # Act
+        call_command("explain_queries", "--check", stdout=out)
+
+        # Assert
+        self.assertIn("note_owner_live_idx", out.getvalue())
+        self.assertIn("note_owner_live_pinned_idx", out.getvalue())
+        self.assertIn("note_owner_trash_idx", out.getvalue())
+        self.assertIn("notetag_tag_note_idx", out.getvalue())
+
+    def test_check_rejects_search_probing_every_note(self):
+        """
+        Filtering the FTS table by `rowid IN (<scope>)` probes it once per
+        note in scope and must be reported as a regression.
+        """
+        # Arrange
+        def probing_sql(match, queryset, limit):
+            scope, params = queryset.values("id").query.sql_with_params()
+            sql = (
+                "SELECT rowid, rank FROM myNotesApp_note_fts "
+                "WHERE myNotesApp_note_fts MATCH %s "
+                f"AND rowid IN ({scope}) ORDER BY rank LIMIT %s"
+            )
+            return sql, [match, *params, limit]
+
+        # Act / Assert
+        with mock.patch(
+            "myNotesApp.management.commands.explain_queries.match_sql",
+            probing_sql,
+        ):
+            with self.assertRaisesMessage(CommandError, "note search"):
+                call_command("explain_queries", "--check", stdout=StringIO())
+
+    def test_check_rejects_page_walking_to_the_cursor(self):
+        """
+        An OR of conditions on the sort key lets SQLite seek on the owner
+        only; the plan has no scan but must still be reported.
+        """
+        # Arrange
+        def or_rows_after(pinned, created_at, pk):
+            return (
+                Q(pinned__lt=pinned)
+                | Q(pinned=pinned, created_at__lt=created_at)
+                | Q(pinned=pinned, created_at=created_at, id__lt=pk)
+            )
+
+        # Act / Assert
+        with mock.patch(
+            "myNotesApp.management.commands.explain_queries.rows_after",
+            or_rows_after,
+        ):
+            with self.assertRaisesMessage(
+                CommandError, "note_list next page"
+            ):
+                call_command("explain_queries", "--check", stdout=StringIO())
+
+
+class NoteSearchTest(TestCase):
+    """
+    Test suite for the full-text search over note titles and content.
+
+    Methods:
+        setUp():
+            Creates notes with distinct words in their title and content.
+        test_search_ranks_title_matches_first():
+            Checks BM25 ranking and snippet highlighting.
+        test_index_follows_updates_and_deletes():
+            Checks that the triggers keep the index in sync.
+        test_search_view_escapes_content():
+            Checks that user content in snippets is escaped.
+        test_rebuild_command():
+            Checks that the rebuild command succeeds.
+        test_snippet_starts_near_first_match():
+            Checks that long content is cut around the match.
+        test_search_cost_does_not_grow_with_board():
+            Checks that a search stays fast as non-matching notes pile up.
+        test_admin_search_filters_with_subquery():
+            Checks that the admin filters by the MATCH in one query.
+        test_search_runs_on_the_queryset_database():
+            Checks that a routed search never touches the primary.
+    """
+    def setUp(self):
+        """
+        Creates one note matching "banana" in its title and one matching
+        it only in its content.
+        """
+        # Arrange
+        self.user = create_user()
+        self.client.force_login(self.user)
+        self.content_hit = Note.objects.create(
+            owner=self.user, title="Shopping", content="Buy milk and a banana."
+        )
+        self.title_hit = Note.objects.create(
+            owner=self.user, title="Banana bread", content="Bake it on Sunday."
+        )
+
+    def test_search_ranks_title_matches_first(self):
+        """
+        Title matches are weighted higher than content matches, and the
+        matching word is highlighted in the snippet.
+        """
+        # Act
+        results = search_notes("banana")
+
+        # Assert
+        self.assertEqual(results, [self.title_hit, self.content_hit])
+        self.assertIn("<mark>banana</mark>", results[1].snippet)
+
+    def test_index_follows_updates_and_deletes(self):
+        """
+        Updating or deleting a note must be reflected by the next search.
+        """
+        # Act
+        self.content_hit.content = "Buy apples."
+        self.content_hit.save()
+        self.title_hit.delete()
+
+        # Assert
+        self.assertEqual(search_notes("banana"), [])
+        self.assertEqual(search_notes("appl"), [self.content_hit])
+
+    def test_search_view_escapes_content(self):
+        """
+        The search page must render highlighted but escaped snippets.
+        """
+        # Arrange
+        Note.objects.create(
+            owner=self.user, title="XSS", content="<script>banana</script>"
+        )
+
+        # Act
+        response = self.client.get(reverse("note_search"), {"q": "banana"})
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "&lt;script&gt;")
+        self.assertNotContains(response, "<script>banana")
+
+    def test_rebuild_command(self):
+        """
+        Rebuilding the index keeps existing notes searchable.
+        """
+        # Act
+        call_command("rebuild_search_index", stdout=StringIO())
+
+        # Assert
+        self.assertEqual(len(search_notes("banana")), 2)
+
+    def test_snippet_starts_near_first_match(self):
+        """
+        The snippet is a window of words around the first match, with
+        every word starting with a search term highlighted.
+        """
+        # Arrange
+        words = [f"word{i}" for i in range(40)]
+        words[20] = "Bananas"
+        content = " ".join(words) + "."
+
+        # Act
+        snippet = make_snippet(content, "banan")
+
+        # Assert
+        self.assertTrue(snippet.startswith("…word17 word18 word19 "))
+        self.assertIn("<mark>Bananas</mark>", snippet)
+        self.assertTrue(snippet.endswith("word32…"))
+
+    def test_search_cost_does_not_grow_with_board(self):
+        """
+        A search matching a few notes must not slow down as the board
+        gains notes that do not match. Probing the FTS table once per
+        note in scope made a 16x larger board about 16x slower.
+        """
+        # Arrange
+        def best_time():
+            timings = []
+            for _ in range(5):
+                start = time.perf_counter()
+                search_notes("banana")
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        def add_notes(count):
+            Note.objects.bulk_create(
+                Note(owner=self.user, title=f"Filler {i}", content="Filler")
+                for i in range(count)
+            )
+
+        add_notes(250)
+        small = best_time()
+
+        # Act
+        add_notes(3750)
+        large = best_time()
+
+        # Assert
+        self.assertLess(large, small * 8)
+
+    def test_admin_search_filters_with_subquery(self):
+        """
+        The admin changelist search runs the MATCH as a subquery of the
+        changelist query instead of loading every hit.
+        """
+        # Arrange
+        model_admin = admin.site._registry[Note]
+        request = RequestFactory().get("/admin/myNotesApp/note/")
+        request.user = self.user
+
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            queryset, may_have_duplicates = model_admin.get_search_results(
+                request, Note.objects.all(), "banana"
+            )
+            found = set(queryset)
+
+        # Assert
+        self.assertEqual(found, {self.content_hit, self.title_hit})
+        self.assertFalse(may_have_duplicates)
+        self.assertEqual(len(queries), 1)
+        self.assertIn("MATCH", queries[0]["sql"])
+
+    def test_search_runs_on_the_queryset_database(self):
+        """
+        A search over a queryset read from another alias (e.g. routed to
+        the replica) runs the MATCH and loads the hits on that alias.
+        """
+        # Arrange: "replica" is served by the test database
+        used = []
+        real_getitem = ConnectionHandler.__getitem__
+
+        def getitem(handler, alias):
+            used.append(alias)
+            target = DEFAULT_DB_ALIAS if alias == "replica" else alias
+            return real_getitem(handler, target)
+
+        # Act
+        with mock.patch.object(ConnectionHandler, "__getitem__", getitem):
+            results = search_notes(
+                "banana", Note.objects.using("replica").live()
+            )
+
+        # Assert
+        self.assertEqual(results, [self.title_hit, self.content_hit])
+        self.assertEqual(set(used), {"replica"})
+
+
+class NoteListCacheTest(TestCase):
+    """
+    Test suite for the versioned cache of the note list.
+
+    Methods:
+        setUp():
+            Clears the cache and counters and creates a note.
+        test_repeat_read_is_a_cache_hit():
+            Checks that a second GET is served from the cache.
+        test_write_bumps_version_and_invalidates():
+            Checks that saving a note makes the next GET a miss.
+        test_evicted_version_is_never_reused():
+            Checks that a counter restarted after eviction does not hand
+            out a version that pages were already cached under.
+        test_queryset_mode():
+            Checks that the queryset mode serves the cached page.
+        test_unchanged_cards_come_from_card_cache():
+            Checks that only the changed card is rendered again.
+        test_production_settings_use_cached_loader():
+            Checks the template settings of the production profile.
+        test_production_settings_share_the_notes_cache():
+            Checks that workers share the version and the list pages.
+        test_card_rendering_reports_every_variant():
+            Runs a tiny card rendering benchmark.
+    """
+    def setUp(self):
+        """
+        Starts every test from an empty cache and zeroed counters.
+        """
+        # Arrange
+        self.user = create_user()
+        self.client.force_login(self.user)
+        get_cache().clear()
+        reset_cache_stats()
+        self.note = Note.objects.create(
+            owner=self.user, title="Cached", content="Body"
+        )
+
+    def test_repeat_read_is_a_cache_hit(self):
+        """
+        The first GET fills the cache and the second one reads from it;
+        apart from loading the signed-in user, only the aggregate behind
+        the ETag still queries the database.
+        """
+        # Act: the session and user lookups come before the aggregate
+        self.client.get(reverse("note_list"))
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("note_list"))
+
+        # Assert: each render looks up the page and the tag facets
+        self.assertContains(response, "Cached")
+        self.assertEqual(cache_stats()["hits"], 2)
+        self.assertEqual(cache_stats()["misses"], 2)
+
+    def test_write_bumps_version_and_invalidates(self):
+        """
+        Updating a note through the update view must show the new title
+        on the next list render.
+        """
+        # Arrange
+        self.client.get(reverse("note_list"))
+        version = get_notes_version()
+
+        # Act
+        self.client.post(
+            reverse("note_update", kwargs={"pk": self.note.pk}),
+            {"title": "Renamed", "content": "Body"},
+        )
+        response = self.client.get(reverse("note_list"))
+
+        # Assert
+        self.assertGreater(get_notes_version(), version)
+        self.assertContains(response, "Renamed")
+        # The page and the tag facets, before and after the update.
+        self.assertEqual(cache_stats()["misses"], 4)
+
+    def test_evicted_version_is_never_reused(self):
+        """
+        Evicting the counter, on a read or on a write, must restart it
+        above every version used before.
+        """
+        # Arrange
+        cache = get_cache()
+        used = [get_notes_version(), bump_notes_version()]
+
+        # Act
+        cache.delete(VERSION_KEY)
+        used.append(get_notes_version())
+        cache.delete(VERSION_KEY)
+        used.append(bump_notes_version())
+
+        # Assert
+        self.assertEqual(used, sorted(set(used)))
+
+    @override_settings(NOTES_CACHE_MODE="queryset")
+    def test_queryset_mode(self):
+        """
+        In queryset mode the cached page of notes is reused.
+        """
+        # Act
+        self.client.get(reverse("note_list"))
+        response = self.client.get(reverse("note_list"))
+
+        # Assert
+        self.assertEqual(list(response.context["notes"]), [self.note])
+        # The page and the tag facets.
+        self.assertEqual(cache_stats()["hits"], 2)
+
+    def test_unchanged_cards_come_from_card_cache(self):
+        """
+        After one note changes, the list page is rebuilt but only that
+        note's card is rendered; the others are read from the cache.
+        """
+        # Arrange
+        Note.objects.create(owner=self.user, title="Second", content="Body")
+        Note.objects.create(owner=self.user, title="Third", content="Body")
+        self.client.get(reverse("note_list"))
+        reset_cache_stats()
+
+        # Act
+        self.client.post(
+            reverse("note_update", kwargs={"pk": self.note.pk}),
+            {"title": "Renamed", "content": "Body"},
+        )
+        response = self.client.get(reverse("note_list"))
+
+        # Assert
+        self.assertContains(response, "Renamed")
+        self.assertContains(response, "Second")
+        self.assertEqual(cache_stats()["card_hits"], 2)
+        self.assertEqual(cache_stats()["card_misses"], 1)
+
+    def test_production_settings_use_cached_loader(self):
+        """
+        The production profile turns DEBUG off and wraps the template
+        loaders in the cached loader.
+        """
+        # Act
+        production = production_settings()
+        options = production.TEMPLATES[0]["OPTIONS"]
+
+        # Assert
+        self.assertFalse(production.DEBUG)
+        self.assertEqual(
+            production.ALLOWED_HOSTS,
+            ["notes.example.com", "www.example.com"],
+        )
+        self.assertFalse(options["debug"])
+        self.assertEqual(
+            options["loaders"][0][0], "django.template.loaders.cached.Loader"
+        )
+
+    def test_production_settings_share_the_notes_cache(self):
+        """
+        With the production caches, a write seen by one worker process
+        moves the notes version every other worker reads, while cards
+        stay in a per-process cache.
+        """
+        # Arrange
+        production = production_settings()
+        with tempfile.TemporaryDirectory() as tmp:
+            shared = {**production.CACHES["default"], "LOCATION": tmp}
+            with self.settings(
+                CACHES={**production.CACHES, "default": shared},
+                NOTES_CARD_CACHE_ALIAS=production.NOTES_CARD_CACHE_ALIAS,
+            ):
+                version = get_notes_version()
+                other_worker = FileBasedCache(tmp, shared)
+
+                # Act
+                bump_notes_version()
+                seen = other_worker.get(VERSION_KEY)
+
+        # Assert
+        self.assertEqual(seen, version + 1)
+        self.assertEqual(
+            production.CACHES["cards"]["BACKEND"],
+            "django.core.cache.backends.locmem.LocMemCache",
+        )
+
+    def test_card_rendering_reports_every_variant(self):
+        """
+        Every rendering variant reports its time per 1,000 cards.
+        """
+        # Arrange
+        seed_notes(5)
+
+        # Act
+        results = benchmark_card_rendering(cards=5, rounds=2)
+
+        # Assert
+        self.assertEqual(
+            set(results),
+            {
+                "uncached_loader",
+                "cached_loader",
+                "card_cache_cold",
+                "card_cache_warm",
+            },
+        )
+        for result in results.values():
+            self.assertEqual(result["requests"], 2)
+            self.assertGreater(result["ms_per_1000_cards"], 0)
+
+
+class ConditionalGetTest(TestCase):
+    """
+    Test suite for ETag / Last-Modified handling on list and detail pages.
+
+    Methods:
+        setUp():
+            Creates a note.
+        test_detail_not_modified():
+            Checks that a matching ETag yields 304 with a single note
+            query.
+        test_detail_modified_after_update():
+            Checks that an update invalidates the detail ETag.
+        test_list_etag_changes_on_delete():
+            Checks that deleting a note changes the list ETag.
+        test_list_ignores_if_modified_since():
+            Checks that the list has no Last-Modified time to revalidate
+            against.
+        test_list_etag_changes_on_trash_and_restore():
+            Checks that swapping one note for another through the trash
+            changes the list ETag.
+        test_signing_in_again_changes_etags():
+            Checks that pages cached by a previous session are replaced.
+    """
+    def setUp(self):
+        """
+        Creates the note used by the conditional requests.
+        """
+        # Arrange
+        self.user = create_user()
+        self.client.force_login(self.user)
+        self.note = Note.objects.create(
+            owner=self.user, title="Etag", content="Body"
+        )
+        self.url = reverse("note_detail", kwargs={"pk": self.note.pk})
+
+    def test_detail_not_modified(self):
+        """
+        Repeating a request with the returned ETag gives 304 Not Modified.
+        """
+        # Arrange
+        etag = self.client.get(self.url)["ETag"]
+
+        # Act: session, user, then the single validator query
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_detail_modified_after_update(self):
+        """
+        After an update the old ETag no longer matches.
+        """
+        # Arrange
+        etag = self.client.get(self.url)["ETag"]
+        self.note.title = "Changed"
+        self.note.save()
+
+        # Act
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Changed")
+
+    def test_list_etag_changes_on_delete(self):
+        """
+        Deleting a note changes the list ETag even though no remaining
+        note was modified.
+        """
+        # Arrange
+        Note.objects.create(owner=self.user, title="Other", content="Body")
+        etag = self.client.get(reverse("note_list"))["ETag"]
+        response = self.client.get(
+            reverse("note_list"), HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 304)
+
+        # Act
+        self.note.delete()
+        response = self.client.get(
+            reverse("note_list"), HTTP_IF_NONE_MATCH=etag
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_ignores_if_modified_since(self):
+        """
+        Trashing the newest note moves the newest `updated_at` back, so a
+        client revalidating by date alone must still get the new board.
+        """
+        # Arrange
+        newest = Note.objects.create(
+            owner=self.user, title="Newest", content="Body"
+        )
+        first = self.client.get(reverse("note_list"))
+        since = http_date(time.time() + 60)
+
+        # Act
+        self.client.post(reverse("note_delete", kwargs={"pk": newest.pk}))
+        response = self.client.get(
+            reverse("note_list"), HTTP_IF_MODIFIED_SINCE=since
+        )
+
+        # Assert
+        self.assertNotIn("Last-Modified", first)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "Newest")
+
+    def test_list_etag_changes_on_trash_and_restore(self):
+        """
+        Trashing one note and restoring an older one keeps the note count
+        and the newest note, but the board shows other notes.
+        """
+        # Arrange
+        restored = Note.objects.create(
+            owner=self.user, title="Restored", content="Body"
+        )
+        Note.objects.create(owner=self.user, title="Newest", content="Body")
+        self.client.post(reverse("note_delete", kwargs={"pk": restored.pk}))
+        etag = self.client.get(reverse("note_list"))["ETag"]
+
+        # Act
+        self.client.post(reverse("note_delete", kwargs={"pk": self.note.pk}))
+        self.client.post(reverse("note_restore", kwargs={"pk": restored.pk}))
+        response = self.client.get(
+            reverse("note_list"), HTTP_IF_NONE_MATCH=etag
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Restored")
+
+    def test_signing_in_again_changes_etags(self):
+        """
+        Pages hold forms with the CSRF token that login rotates, so the
+        copies cached before logging out and in again must not be
+        revalidated.
+        """
+        # Arrange
+        urls = [reverse("note_list"), self.url]
+        etags = [self.client.get(url)["ETag"] for url in urls]
+        self.client.logout()
+        self.client.force_login(self.user)
+
+        # Act
+        responses = [
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            for url, etag in zip(urls, etags)
+        ]
+
+        # Assert
+        for response in responses:
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, "csrfmiddlewaretoken")
+
+
+class NoteApiTest(TestCase):
+    """
+    Test suite for the JSON API, including the batch endpoints.
+
+    Methods:
+        setUp():
+            Creates a note.
+        test_crud_round_trip():
+            Checks create, retrieve, patch and delete of a single note.
+        test_batch_create_is_atomic():
+            Checks that one invalid item rejects the whole batch.
+        test_batch_create_update_delete():
+            Checks the three batch operations on valid input.
+        test_batch_size_is_capped():
+            Checks the batch size limit.
+        test_batch_update_rejects_repeated_ids():
+            Checks that an id given twice is a per-item error.
+        test_batch_rejects_boolean_ids():
+            Checks that JSON `true` and `false` are not taken as ids.
+    """
+    def setUp(self):
+        """
+        Creates the note used by the API tests.
+        """
+        # Arrange
+        self.user = create_user()
+        self.client.force_login(self.user)
+        self.note = Note.objects.create(
+            owner=self.user, title="Api", content="Body"
+        )
+
+    def _send(self, method, url, payload):
+        return getattr(self.client, method)(
+            url, json.dumps(payload), content_type="application/json"
+        )
+
+    def test_crud_round_trip(self):
+        """
+        A note can be created, read, patched and deleted through the API.
+        """
+        # Act: Create
+        created = self._send(
+            "post",
+            reverse("api_note_list"),
+            {"title": " New ", "content": "x"},
+        ).json()
+        url = reverse("api_note_detail", kwargs={"pk": created["id"]})
+        patched = self._send("patch", url, {"pinned": True}).json()
+        deleted = self.client.delete(url)
+
+        # Assert
+        self.assertEqual(created["title"], "New")
+        self.assertTrue(patched["pinned"])
+        self.assertEqual(patched["content"], "x")
+        self.assertEqual(deleted.status_code, 204)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_batch_create_is_atomic(self):
+        """
+        A batch with one invalid item writes nothing and reports the item.
+        """
+        # Act
+        response = self._send(
+            "post",
+            reverse("api_note_batch"),
+            [{"title": "A", "content": "a"}, {"title": "", "content": "b"}],
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"][0]["index"], 1)
+        self.assertIn("title", response.json()["errors"][0]["errors"])
+        self.assertEqual(Note.objects.count(), 1)
+
+    def test_batch_create_update_delete(self):
+        """
+        Valid batches are applied with one request each.
+        """
+        # Act: Create two notes in one request
+        created = self._send(
+            "post",
+            reverse("api_note_batch"),
+            [{"title": "A", "content": "a"}, {"title": "B", "content": "b"}],
+        ).json()["results"]
+        ids = [item["id"] for item in created]
+
+        # Act: Rename both in one request (session, user, savepoint,
+        # SELECT, one bulk UPDATE, then the latest revisions and one
+        # INSERT of the new ones in a savepoint, release)
+        with self.assertNumQueries(10):
+            self._send(
+                "patch",
+                reverse("api_note_batch"),
+                [{"id": pk, "title": "Renamed"} for pk in ids],
+            )
+        renamed = Note.objects.filter(title="Renamed").count()
+
+        # Act: Delete both in one request (they go to the trash)
+        deleted = self._send("delete", reverse("api_note_batch"), ids)
+
+        # Assert
+        self.assertEqual(renamed, 2)
+        self.assertEqual(deleted.json()["deleted"], 2)
+        self.assertEqual(list(Note.objects.live()), [self.note])
+        self.assertEqual(
+            sorted(Note.objects.trashed().values_list("pk", flat=True)), ids
+        )
+
+    @override_settings(NOTES_API_MAX_BATCH=1)
+    def test_batch_size_is_capped(self):
+        """
+        Batches larger than NOTES_API_MAX_BATCH are rejected.
+        """
+        # Act
+        response = self._send(
+            "post",
+            reverse("api_note_batch"),
+            [{"title": "A", "content": "a"}, {"title": "B", "content": "b"}],
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Note.objects.count(), 1)
+
+    def test_batch_update_rejects_repeated_ids(self):
+        """
+        A PATCH batch naming one note twice is rejected with an error for
+        the repeated item, and changes nothing.
+        """
+        # Act
+        response = self._send(
+            "patch",
+            reverse("api_note_batch"),
+            [
+                {"id": self.note.pk, "title": "a"},
+                {"id": self.note.pk, "title": "b"},
+            ],
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["errors"],
+            [{"index": 1, "errors": {"id": ["Duplicate id in this batch."]}}],
+        )
+        self.note.refresh_from_db()
+        self.assertEqual(self.note.title, "Api")
+        self.assertEqual(
+            list(self.note.revisions.values_list("number", flat=True)), [1]
+        )
+
+    def test_batch_rejects_boolean_ids(self):
+        """
+        Python treats `true` as 1, so it must not pass as a note id.
+        """
+        # Arrange
+        url = reverse("api_note_batch")
+
+        # Act
+        updated = self._send("patch", url, [{"id": True, "title": "a"}])
+        deleted = self._send("delete", url, [True, False])
+
+        # Assert
+        self.assertEqual(updated.status_code, 400)
+        self.assertEqual(
+            updated.json()["errors"],
+            [{"index": 0, "errors": {"id": ["Note not found."]}}],
+        )
+        self.assertEqual(deleted.status_code, 400)
+        self.note.refresh_from_db()
+        self.assertEqual(self.note.title, "Api")
+        self.assertIsNone(self.note.deleted_at)
+
+
+class NoteTransferTest(TestCase):
+    """
+    Test suite for the streaming export and the batched import.
+
+    Methods:
+        setUp():
+            Creates a few notes to export.
+        test_export_endpoint_streams_ndjson():
+            Checks the streaming export view.
+        test_round_trip_through_commands():
+            Exports to CSV and imports the file back in batches.
+        test_import_resumes_and_rejects_invalid_rows():
+            Checks --after-id and per-row validation.
+        test_import_keeps_exported_creation_time():
+            Checks that imported notes keep their `created_at`.
+        test_import_caps_reported_errors():
+            Checks that only the first rejected rows are kept.
+    """
+    def setUp(self):
+        """
+        Creates three notes, one of them pinned.
+        """
+        # Arrange
+        self.user = create_user()
+        self.client.force_login(self.user)
+        for i in range(3):
+            Note.objects.create(
+                owner=self.user,
+                title=f"Export {i}", content="Body", pinned=i == 0
+            )
+
+    def test_export_endpoint_streams_ndjson(self):
+        """
+        The export view streams one JSON object per line.
+        """
+        # Act
+        response = self.client.get(reverse("note_export"))
+        lines = b"".join(response.streaming_content).splitlines()
+
+        # Assert
+        self.assertTrue(response.streaming)
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0])["title"], "Export 0")
+
+    def test_round_trip_through_commands(self):
+        """
+        A CSV export imported again doubles the notes.
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            # Arrange
+            path = os.path.join(tmp, "notes.csv")
+            call_command("export_notes", output=path, stderr=StringIO())
+
+            # Act
+            call_command(
+                "import_notes",
+                path,
+                owner="owner",
+                batch_size=2,
+                stdout=StringIO(),
+                stderr=StringIO(),
+            )
+
+        # Assert
+        self.assertEqual(Note.objects.count(), 6)
+        self.assertEqual(Note.objects.filter(pinned=True).count(), 2)
+
+    def test_import_resumes_and_rejects_invalid_rows(self):
+        """
+        Rows up to the resume id are skipped and invalid rows reported.
+        """
+        # Arrange
+        rows = [
+            {"id": 1, "title": "Old", "content": "x"},
+            {"id": 2, "title": "", "content": "x"},
+            {"id": 3, "title": "New", "content": "x"},
+        ]
+
+        # Act
+        report = import_notes(rows, self.user, after_id=1)
+
+        # Assert
+        self.assertEqual(report.imported, 1)
+        self.assertEqual(report.skipped, 1)
+        self.assertEqual(report.errors[0][0], 2)
+        self.assertEqual(report.last_id, 3)
+        self.assertTrue(Note.objects.filter(title="New").exists())
+
+    def test_import_keeps_exported_creation_time(self):
+        """
+        An exported note imported again keeps its creation time, so the
+        board order survives a round trip.
+        """
+        # Arrange
+        created_at = timezone.now() - timedelta(days=30)
+        Note.objects.filter(title="Export 1").update(created_at=created_at)
+        rows = list(iter_import_rows(iter_export(owner=self.user)))
+
+        # Act
+        import_notes(rows, self.user, batch_size=2)
+
+        # Assert
+        copies = Note.objects.filter(title="Export 1")
+        self.assertEqual(
+            list(copies.values_list("created_at", flat=True)),
+            [created_at, created_at],
+        )
+
+    def test_import_caps_reported_errors(self):
+        """
+        Every rejected row is counted but only the first
+        `MAX_REPORTED_ERRORS` are kept with their errors.
+        """
+        # Arrange
+        rows = [{"id": i, "title": ""} for i in range(MAX_REPORTED_ERRORS + 5)]
+
+        # Act
+        report = import_notes(rows, self.user)
+
+        # Assert
+        self.assertEqual(report.rejected, MAX_REPORTED_ERRORS + 5)
+        self.assertEqual(len(report.errors), MAX_REPORTED_ERRORS)
+        self.assertEqual(report.errors[-1][0], MAX_REPORTED_ERRORS)
+
+
+class NoteTogglePinTest(TestCase):
+    """
+    Test suite for the atomic pin toggle.
+
+    Methods:
+        setUp():
+            Creates an unpinned note.
+        test_get_is_not_allowed():
+            Checks that toggling requires POST.
+        test_json_response_and_single_update():
+            Checks the JSON response and that two toggles cancel out.
+        test_fragment_response():
+            Checks that AJAX callers receive the re-rendered card.
+        test_form_post_redirects():
+            Checks the no-JavaScript fallback.
+    """
+    def setUp(self):
+        """
+        Creates the note to toggle.
+        """
+        # Arrange
+        self.user = create_user()
+        self.client.force_login(self.user)
+        self.note = Note.objects.create(
+            owner=self.user, title="Pin me", content="Body"
+        )
+        self.url = reverse("note_toggle_pin", kwargs={"pk": self.note.pk})
+
+    def test_get_is_not_allowed(self):
+        """
+        A GET must not change the note.
+        """
+        # Act
+        response = self.client.get(self.url)
+
+        # Assert
+        self.assertEqual(response.status_code, 405)
+        self.note.refresh_from_db()
+        self.assertFalse(self.note.pinned)
+
+    def test_json_response_and_single_update(self):
+        """
+        Each toggle flips the stored state with one UPDATE.
+        """
+        # Act
+        first = self.client.post(self.url, HTTP_ACCEPT="application/json")
+        second = self.client.post(self.url, HTTP_ACCEPT="application/json")
+
+        # Assert
+        self.assertEqual(first.json(), {"id": self.note.pk, "pinned": True})
+        self.assertFalse(second.json()["pinned"])
+        self.note.refresh_from_db()
+        self.assertFalse(self.note.pinned)
+
+    def test_fragment_response(self):
+        """
+        AJAX callers receive only the card markup.
+        """
+        # Act
+        response = self.client.post(
+            self.url, HTTP_X_REQUESTED_WITH="XMLHttpRequest"
+        )
+
+        # Assert
+        self.assertContains(response, f'id="note-{self.note.pk}"')
+        self.assertContains(response, "bi-pin-fill")
+        self.assertNotContains(response, "<html")
+
+    def test_form_post_redirects(self):
+        """
+        Without JavaScript the toggle redirects back to the note list.
+        """
+        # Act
+        response = self.client.post(self.url)
+
+        # Assert
+        self.assertRedirects(response, reverse("note_list"))
+        self.note.refresh_from_db()
+        self.assertTrue(self.note.pinned)
+
+
+class SqliteTuningTest(TestCase):
+    """
+    Test suite for the SQLite connection setup.
+
+    Methods:
+        test_pragmas_are_applied():
+            Checks that new connections get the configured PRAGMAs.
+        test_concurrent_stress_has_no_lock_errors():
+            Runs a small threaded stress round with the tuned setup.
+    """
+    def test_pragmas_are_applied(self):
+        """
+        The connection hook applies the busy timeout and cache size.
+        """
+        # Act
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            busy_timeout = cursor.fetchone()[0]
+            cursor.execute("PRAGMA cache_size")
+            cache_size = cursor.fetchone()[0]
+
+        # Assert
+        self.assertEqual(busy_timeout, settings.SQLITE_BUSY_TIMEOUT_MS)
+        self.assertEqual(cache_size, settings.SQLITE_PRAGMAS["cache_size"])
+
+    def test_concurrent_stress_has_no_lock_errors(self):
+        """
+        Eight threads reading and writing concurrently never hit
+        "database is locked" with the tuned setup.
+        """
+        # Act
+        result = run_stress(
+            tuned=True, threads=8, ops=50, write_ratio=0.5, seed_notes=100
+        )
+
+        # Assert
+        self.assertEqual(result["lock_errors"], 0)
+        self.assertEqual(result["ops"], 400)
+
+
+class BenchmarkHarnessTest(TestCase):
+    """
+    Test suite for the endpoint benchmark harness.
+
+    Methods:
+        test_run_benchmarks_reports_every_endpoint():
+            Runs a tiny benchmark and checks the reported metrics.
+        test_compare_to_baseline_flags_regressions():
+            Checks the regression threshold.
+    """
+    def test_run_benchmarks_reports_every_endpoint(self):
+        """
+        Every endpoint gets latency percentiles and query counts.
+        """
+        # Arrange
+        seed_notes(20, pinned_ratio=0.5)
+
+        # Act
+        results = run_benchmarks(iterations=3)
+
+        # Assert
+        self.assertEqual(set(results), set(ENDPOINTS))
+        for result in results.values():
+            self.assertEqual(result["requests"], 3)
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+            self.assertGreater(result["queries_per_request"], 0)
+
+    def test_compare_to_baseline_flags_regressions(self):
+        """
+        Only slowdowns beyond the threshold are reported.
+        """
+        # Arrange
+        baseline = {"note_list": {"p50_ms": 10.0}}
+        results = {
+            "note_list": {"p50_ms": 13.0},
+            "note_detail": {"p50_ms": 99.0},
+        }
+
+        # Act
+        loose = compare_to_baseline(results, baseline, threshold=0.5)
+        strict = compare_to_baseline(results, baseline, threshold=0.2)
+
+        # Assert
+        self.assertEqual(loose, [])
+        self.assertEqual(len(strict), 1)
+        self.assertIn("note_list", strict[0])
+
+
+class ServerComparisonTest(TransactionTestCase):
+    """
+    Test suite for the WSGI vs ASGI comparison.
+
+    The comparison sends requests from several threads, each with its own
+    database connection. Those connections only see committed rows (the
+    benchmark user and its session), so this suite commits instead of
+    running inside a transaction.
+
+    Methods:
+        test_compare_servers_reports_both_paths():
+            Runs a tiny WSGI vs ASGI comparison.
+    """
+    serialized_rollback = True
+
+    def test_compare_servers_reports_both_paths(self):
+        """
+        Both request paths report throughput and thread usage.
+        """
+        # Act
+        results = compare_servers(concurrency=3, requests=2, client_delay=0)
+
+        # Assert
+        self.assertEqual(set(results), {"wsgi", "asgi"})
+        for result in results.values():
+            self.assertEqual(result["requests"], 6)
+            self.assertGreater(result["rps"], 0)
+            self.assertGreaterEqual(result["peak_threads"], 1)
+
+
+class RequestMetricsTest(TestCase):
+    """
+    Test suite for the request metrics middleware and endpoint.
+
+    Methods:
+        setUp():
+            Resets the histograms and creates a note.
+        test_server_timing_header():
+            Checks the Server-Timing header of a rendered page.
+        test_metrics_endpoint_reports_url_names():
+            Checks the per-URL-name histograms.
+        test_slow_requests_are_logged_with_sql():
+            Checks the structured slow-request log.
+        test_template_timer_is_installed_by_setting():
+            Checks that only the app config installs the render timer.
+    """
+    def setUp(self):
+        """
+        Starts every test with empty histograms.
+        """
+        # Arrange
+        self.user = create_user()
+        self.client.force_login(self.user)
+        reset_metrics()
+        self.note = Note.objects.create(
+            owner=self.user, title="Metrics", content="Body"
+        )
+
+    def test_server_timing_header(self):
+        """
+        Each response reports DB, template and total time.
+        """
+        # Act
+        response = self.client.get(
+            reverse("note_detail", kwargs={"pk": self.note.pk})
+        )
+
+        # Assert
+        timing = response["Server-Timing"]
+        # Session and user, one query for the ETag validator, one to load
+        # the note and one for its tags.
+        self.assertIn('desc="5 queries"', timing)
+        self.assertIn("tpl;dur=", timing)
+        self.assertIn("total;dur=", timing)
+
+    def test_metrics_endpoint_reports_url_names(self):
+        """
+        Requests are grouped by URL name in the metrics endpoint.
+        """
+        # Arrange
+        for _ in range(3):
+            self.client.get(reverse("note_list"))
+
+        # Act
+        with self.settings(DEBUG=True):
+            data = self.client.get(reverse("metrics")).json()
+
+        # Assert
+        self.assertEqual(data["requests"]["note_list"]["count"], 3)
+        self.assertEqual(
+            data["requests"]["note_list"]["buckets"]["le_inf"], 3
+        )
+
+    @override_settings(NOTES_SLOW_REQUEST_MS=0)
+    def test_slow_requests_are_logged_with_sql(self):
+        """
+        With a zero threshold every request is logged with its SQL.
+        """
+        # Act
+        with self.assertLogs("myNotesApp.slow_requests", "WARNING") as logs:
+            self.client.get(
+                reverse("note_detail", kwargs={"pk": self.note.pk})
+            )
+
+        # Assert
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry["url_name"], "note_detail")
+        self.assertIn("SELECT", entry["slowest_sql"][0]["sql"])
+
+    def test_template_timer_is_installed_by_setting(self):
+        """
+        Without the timer, templates render untimed; `ready()` installs it
+        when NOTES_TEMPLATE_TIMING is on.
+        """
+        # Arrange
+        uninstall_template_timer()
+        self.addCleanup(install_template_timer)
+        url = reverse("note_detail", kwargs={"pk": self.note.pk})
+
+        # Act
+        untimed = self.client.get(url)["Server-Timing"]
+        with self.settings(NOTES_TEMPLATE_TIMING=True):
+            apps.get_app_config("myNotesApp").ready()
+        timed = self.client.get(url)["Server-Timing"]
+
+        # Assert
+        self.assertNotIn("tpl;dur=", untimed)
+        self.assertIn("tpl;dur=", timed)
+
+
+class NoteSyncTest(TestCase):
+    """
+    Test suite for the delta sync API.
+
+    Methods:
+        setUp():
+            Creates two notes.
+        sync(since, **params):
+            Calls the sync endpoint.
+        test_full_sync_then_up_to_date_in_one_query():
+            Checks a full sync and the cheap empty response.
+        test_changes_and_tombstones_after_cursor():
+            Checks updates, queryset updates and deletes.
+        test_stale_save_still_advances_sequence():
+            Checks that saving an old instance is not lost.
+        test_limit_pages_through_changes():
+            Checks `has_more` and the returned cursor.
+        test_compacted_cursor_must_reset():
+            Checks the 410 response after compaction.
+    """
+    def setUp(self):
+        """
+        Creates the notes the client already knows about.
+        """
+        # Arrange
+        self.user = create_user()
+        self.client.force_login(self.user)
+        self.first = Note.objects.create(
+            owner=self.user, title="First", content="Body"
+        )
+        self.second = Note.objects.create(
+            owner=self.user, title="Second", content="Body"
+        )
+
+    def sync(self, since=0, **params):
+        """
+        Returns the decoded sync response.
+        """
+        response = self.client.get(
+            reverse("api_note_sync"), {"since": since, **params}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_full_sync_then_up_to_date_in_one_query(self):
+        """
+        A full sync returns every note; syncing again is one lookup.
+        """
+        # Act
+        full = self.sync()
+        # Session and user, then the SyncState lookup.
+        with self.assertNumQueries(3):
+            again = self.sync(full["cursor"])
+
+        # Assert
+        self.assertEqual(
+            [note["id"] for note in full["changes"]],
+            [self.first.pk, self.second.pk],
+        )
+        self.assertFalse(full["has_more"])
+        self.assertEqual(
+            again,
+            {
+                "changes": [],
+                "deleted": [],
+                "cursor": full["cursor"],
+                "has_more": False,
+            },
+        )
+
+    def test_changes_and_tombstones_after_cursor(self):
+        """
+        Saves, queryset updates and deletes after the cursor are returned
+        in order, with tombstones for deleted notes.
+        """
+        # Arrange
+        cursor = self.sync()["cursor"]
+        gone = Note.objects.create(
+            owner=self.user, title="Gone", content="Body"
+        )
+        Note.objects.filter(pk=self.first.pk).update(pinned=True)
+        gone_pk = gone.pk
+        gone.delete()
+
+        # Act
+        data = self.sync(cursor)
+
+        # Assert
+        self.assertEqual(
+            [note["id"] for note in data["changes"]], [self.first.pk]
+        )
+        self.assertTrue(data["changes"][0]["pinned"])
+        self.assertEqual(data["deleted"], [gone_pk])
+        self.assertGreater(data["cursor"], cursor)
+
+    def test_stale_save_still_advances_sequence(self):
+        """
+        Saving an instance loaded before another write still counts as a
+        new change.
+        """
+        # Arrange
+        stale = Note.objects.get(pk=self.first.pk)
+        Note.objects.filter(pk=self.first.pk).update(title="Other")
+        cursor = self.sync()["cursor"]
+
+        # Act
+        stale.content = "Edited"
+        stale.save()
+
+        # Assert
+        changes = self.sync(cursor)["changes"]
+        self.assertEqual([note["id"] for note in changes], [self.first.pk])
+        self.assertEqual(
+            changes[0]["change_seq"],
+            SyncState.objects.get(pk=1).change_seq,
+        )
+
+    def test_limit_pages_through_changes(self):
+        """
+        With a limit, clients follow the cursor while `has_more` is set.
+        """
+        # Act
+        page = self.sync(limit=1)
+        rest = self.sync(page["cursor"], limit=1)
+
+        # Assert
+        self.assertTrue(page["has_more"])
+        self.assertEqual(
+            [note["id"] for note in page["changes"]], [self.first.pk]
+        )
+        self.assertEqual(
+            [note["id"] for note in rest["changes"]], [self.second.pk]
+        )
+        self.assertFalse(rest["has_more"])
+
+    def test_compacted_cursor_must_reset(self):
+        """
+        A cursor older than compacted tombstones gets 410 and "reset".
+        """
+        # Arrange
+        cursor = self.sync()["cursor"]
+        self.second.delete()
+        Note.objects.create(owner=self.user, title="Later", content="Body")
+
+        # Act
+        compacted = compact_tombstones(days=-1)
+        response = self.client.get(reverse("api_note_sync"), {"since": cursor})
+
+        # Assert
+        self.assertEqual(compacted, 1)
+        self.assertEqual(response.status_code, 410)
+        self.assertTrue(response.json()["reset"])
+
+
+@override_settings(
+    NOTES_EVENTS_STREAM_SECONDS=0.2, NOTES_EVENTS_POLL_INTERVAL=0.05
+)
+class NoteEventsTest(TestCase):
+    """
+    Test suite for live board updates over Server-Sent Events.
+
+    Methods:
+        setUp():
+            Signs in the note owner.
+        test_changes_publish_events():
+            Checks the events published for create, pin and delete.
+        test_stream_resumes_after_last_event_id():
+            Checks that a reconnect only replays missed events.
+        test_stream_resets_when_events_were_compacted():
+            Checks the "reset" event for a cursor that is gone.
+        test_memory_backend_reads_after_cursor():
+            Checks the single-process backend.
+    """
+    def setUp(self):
+        """
+        Signs in the user who owns the notes of each test.
+        """
+        # Arrange
+        self.user = create_user()
+        self.client.force_login(self.user)
+
+    def publish_changes(self):
+        """
+        Creates, pins and deletes a note, running the commit hooks.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            note = Note.objects.create(
+                owner=self.user, title="Live", content="Body"
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("note_toggle_pin", kwargs={"pk": note.pk})
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("note_delete", kwargs={"pk": note.pk}))
+        return note
+
+    def read_stream(self, **headers):
+        """
+        Reads the event stream until the server closes it.
+        """
+        response = self.client.get(reverse("note_events"), headers=headers)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        body = b"".join(response.streaming_content).decode()
+        return [
+            json.loads(line[len("data: "):])
+            for line in body.splitlines()
+            if line.startswith("data: ")
+        ]
+
+    def test_changes_publish_events(self):
+        """
+        Create, pin and delete each append one small event to the log.
+        """
+        # Act
+        note = self.publish_changes()
+
+        # Assert
+        events = list(NoteEvent.objects.order_by("id"))
+        self.assertEqual(
+            [event.kind for event in events], ["created", "pinned", "deleted"]
+        )
+        self.assertTrue(all(event.note_id == note.pk for event in events))
+        self.assertIn(f'id="note-{note.pk}"', events[1].data["html"])
+        self.assertTrue(events[1].data["pinned"])
+        self.assertEqual(events[2].data, {})
+
+    def test_stream_resumes_after_last_event_id(self):
+        """
+        A reconnecting client only receives the events after its cursor.
+        """
+        # Arrange
+        self.publish_changes()
+        first = NoteEvent.objects.order_by("id").first()
+
+        # Act
+        events = self.read_stream(last_event_id=str(first.pk))
+
+        # Assert
+        self.assertEqual(
+            [event["type"] for event in events], ["pinned", "deleted"]
+        )
+
+    def test_stream_resets_when_events_were_compacted(self):
+        """
+        A cursor older than the retained log gets a "reset" event.
+        """
+        # Arrange
+        self.publish_changes()
+        first = NoteEvent.objects.order_by("id").first()
+        get_event_backend().compact(retention=-1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Note.objects.create(owner=self.user, title="After", content="Body")
+
+        # Act
+        events = self.read_stream(last_event_id=str(first.pk))
+
+        # Assert: the reload covers everything up to the latest event.
+        self.assertEqual([event["type"] for event in events], ["reset"])
+
+    def test_memory_backend_reads_after_cursor(self):
+        """
+        The in-process backend serves the same cursor semantics.
+        """
+        # Arrange
+        backend = MemoryEventBackend()
+        first = backend.append("created", 1, {})
+        backend.append("updated", 1, {})
+
+        # Act
+        events = backend.read(after_id=first.id)
+
+        # Assert
+        self.assertEqual([event.kind for event in events], ["updated"])
+        self.assertEqual(backend.bounds(), (first.id, first.id + 1))
+
+
+class NotePreviewTest(TestCase):
+    """
+    Test suite for the precomputed card preview.
+
+    Methods:
+        setUp():
+            Signs in the note owner.
+        test_save_fills_preview():
+            Checks the preview on create and on partial saves.
+        test_bulk_import_fills_preview():
+            Checks the preview of imported notes.
+        test_list_loads_only_card_columns():
+            Checks the list query and the card markup.
+        test_migration_backfills_previews():
+            Runs the backfill of migration 0007.
+        test_migration_ignores_current_preview_rules():
+            Checks that the backfill does not follow later changes to
+            `make_preview`.
+    """
+    def setUp(self):
+        """
+        Signs in the user who owns the notes of each test.
+        """
+        # Arrange
+        self.user = create_user()
+        self.client.force_login(self.user)
+
+    def test_save_fills_preview(self):
+        """
+        The preview matches `truncatewords:20` and follows the content.
+        """
+        # Arrange
+        words = " ".join(f"word{i}" for i in range(30))
+
+        # Act
+        note = Note.objects.create(
+            owner=self.user, title="Long", content=words
+        )
+        created_preview = note.preview
+        note.content = "Short now"
+        note.save(update_fields=["content"])
+
+        # Assert
+        self.assertEqual(
+            created_preview, " ".join(f"word{i}" for i in range(20)) + " …"
+        )
+        note.refresh_from_db()
+        self.assertEqual(note.preview, "Short now")
+
+    def test_bulk_import_fills_preview(self):
+        """
+        Notes inserted with bulk_create get a preview too.
+        """
+        # Act
+        import_notes(
+            [{"title": "Imported", "content": "Imported body"}], self.user
+        )
+
+        # Assert
+        self.assertEqual(
+            Note.objects.get(title="Imported").preview, "Imported body"
+        )
+
+    @override_settings(NOTES_CACHE_MODE=None)
+    def test_list_loads_only_card_columns(self):
+        """
+        The list query skips the content column and cards carry an ISO
+        timestamp instead of server-rendered "ago" text.
+        """
+        # Arrange
+        Note.objects.create(owner=self.user, title="Card", content="Card body")
+
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("note_list"))
+
+        # Assert
+        page_sql = [q["sql"] for q in queries if "LIMIT" in q["sql"]]
+        self.assertTrue(page_sql)
+        self.assertNotIn('"content"', page_sql[0])
+        self.assertContains(response, "Card body")
+        self.assertContains(response, '<time datetime="')
+        self.assertNotContains(response, "minutes ago")
+
+    def test_migration_backfills_previews(self):
+        """
+        The data migration fills missing previews from the content.
+        """
+        # Arrange
+        note = Note.objects.create(
+            owner=self.user, title="Old", content="Old body"
+        )
+        Note.objects.filter(pk=note.pk).update(preview="")
+        migration = import_module("myNotesApp.migrations.0007_note_preview")
+
+        # Act
+        migration.backfill_previews(apps, None)
+
+        # Assert
+        note.refresh_from_db()
+        self.assertEqual(note.preview, "Old body")
+
+    def test_migration_ignores_current_preview_rules(self):
+        """
+        A migration must create the same data whenever it runs, so a
+        shorter preview in the current models does not change it.
+        """
+        # Arrange
+        words = " ".join(f"word{i}" for i in range(30))
+        note = Note.objects.create(
+            owner=self.user, title="Old", content=words
+        )
+        Note.objects.filter(pk=note.pk).update(preview="")
+        migration = import_module("myNotesApp.migrations.0007_note_preview")
+
+        # Act
+        with mock.patch("myNotesApp.models.PREVIEW_WORDS", 2):
+            migration.backfill_previews(apps, None)
+
+        # Assert
+        note.refresh_from_db()
+        self.assertEqual(len(note.preview.split()), 21)
+        self.assertTrue(note.preview.endswith(" …"))
+
+
+@override_settings(ROOT_URLCONF=notes_urlconf(async_views))
+class AsyncViewsTest(TestCase):
+    """
+    Test suite for the async note views served under ASGI.
+
+    Methods:
+        setUp():
+            Creates a note.
+        test_list_and_conditional_get():
+            Checks the list page and its 304 response.
+        test_detail_reports_queries_through_async_middleware():
+            Checks the detail page and its Server-Timing header.
+        test_create_toggle_and_delete():
+            Walks a note through the write views.
+        test_event_stream():
+            Checks the async Server-Sent Events stream.
+    """
+    def setUp(self):
+        """
+        Creates a note for the views to show.
+        """
+        # Arrange
+        self.user = create_user()
+        self.async_client.force_login(self.user)
+        self.note = Note.objects.create(
+            owner=self.user, title="Async", content="Body"
+        )
+
+    async def test_list_and_conditional_get(self):
+        """
+        The list renders the note and answers a revalidation with 304.
+        """
+        # Act
+        response = await self.async_client.get(reverse("note_list"))
+        revalidated = await self.async_client.get(
+            reverse("note_list"), headers={"if-none-match": response["ETag"]}
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Async")
+        self.assertNotIn("Last-Modified", response)
+        self.assertEqual(revalidated.status_code, 304)
+
+    async def test_detail_reports_queries_through_async_middleware(self):
+        """
+        The metrics middleware attributes async ORM queries to the request.
+        """
+        # Act
+        response = await self.async_client.get(
+            reverse("note_detail", kwargs={"pk": self.note.pk})
+        )
+        missing = await self.async_client.get(
+            reverse("note_detail", kwargs={"pk": self.note.pk + 1})
+        )
+
+        # Assert
+        self.assertContains(response, "Body")
+        self.assertIn('desc="5 queries"', response["Server-Timing"])
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_create_toggle_and_delete(self):
+        """
+        Notes can be created, pinned and deleted through the async views.
+        """
+        # Act
+        created = await self.async_client.post(
+            reverse("note_create"), {"title": "New", "content": "Text"}
+        )
+        note = await Note.objects.aget(title="New")
+        toggled = await self.async_client.post(
+            reverse("note_toggle_pin", kwargs={"pk": note.pk}),
+            headers={"accept": "application/json"},
+        )
+        deleted = await self.async_client.post(
+            reverse("note_delete", kwargs={"pk": note.pk})
+        )
+
+        # Assert
+        self.assertRedirects(
+            created,
+            reverse("note_detail", kwargs={"pk": note.pk}),
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(toggled.json(), {"id": note.pk, "pinned": True})
+        self.assertEqual(deleted.status_code, 302)
+        self.assertTrue(
+            await Note.objects.trashed().filter(pk=note.pk).aexists()
+        )
+
+    @override_settings(
+        NOTES_EVENTS_STREAM_SECONDS=0.2, NOTES_EVENTS_POLL_INTERVAL=0.05
+    )
+    async def test_event_stream(self):
+        """
+        The async stream replays the events after the client's cursor.
+        """
+        # Arrange
+        first = await NoteEvent.objects.acreate(kind="created", note_id=1)
+        await NoteEvent.objects.acreate(kind="deleted", note_id=1)
+
+        # Act
+        response = await self.async_client.get(
+            reverse("note_events"), headers={"last-event-id": str(first.pk)}
+        )
+        body = "".join(
+            [chunk.decode() async for chunk in response.streaming_content]
+        )
+
+        # Assert
+        self.assertIn('"type": "deleted"', body)
+        self.assertNotIn('"type": "created"', body)
+
+
+class StaticAssetsTest(TestCase):
+    """
+    Test suite for the static asset pipeline of the production profile.
+
+    Methods:
+        setUpClass():
+            Runs collectstatic once with the production storage.
+        setUp():
+            Signs in a user.
+        test_pages_use_vendored_assets():
+            Checks that no asset is loaded from a CDN.
+        test_collectstatic_fingerprints_and_compresses():
+            Checks the hashed names and the .gz/.br copies.
+        test_hashed_assets_are_immutable():
+            Checks the headers of a fingerprinted asset.
+    """
+    @classmethod
+    def setUpClass(cls):
+        """
+        Collects the app's static files into a temporary STATIC_ROOT,
+        with the storage and middleware of settings_production.py. The
+        admin's assets are left out to keep the compression step fast.
+        """
+        super().setUpClass()
+        production = production_settings()
+        cls.static_root = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(cls.static_root.cleanup)
+        cls.production = override_settings(
+            STATIC_ROOT=cls.static_root.name,
+            STORAGES=production.STORAGES,
+            MIDDLEWARE=production.MIDDLEWARE,
+            WHITENOISE_KEEP_ONLY_HASHED_FILES=(
+                production.WHITENOISE_KEEP_ONLY_HASHED_FILES
+            ),
+            STATICFILES_FINDERS=[
+                "django.contrib.staticfiles.finders.FileSystemFinder"
+            ],
+            STATICFILES_DIRS=[settings.BASE_DIR / "myNotesApp" / "static"],
+        )
+        cls.production.enable()
+        cls.addClassCleanup(cls.production.disable)
+        call_command("collectstatic", interactive=False, verbosity=0)
+
+    def setUp(self):
+        """
+        Signs in a user, since the note pages require one.
+        """
+        # Arrange
+        self.user = create_user()
+        self.client.force_login(self.user)
+
+    def test_pages_use_vendored_assets(self):
+        """
+        Bootstrap and its icons come from our own fingerprinted files.
+        """
+        # Act
+        response = self.client.get(reverse("note_list"))
+
+        # Assert
+        self.assertNotContains(response, "cdn.jsdelivr.net")
+        html = response.content.decode()
+        self.assertRegex(
+            html, r"/static/myNotesApp/vendor/bootstrap/css/"
+            r"bootstrap\.min\.[0-9a-f]{12}\.css"
+        )
+        self.assertRegex(
+            html, r"/static/myNotesApp/js/scripts\.[0-9a-f]{12}\.js"
+        )
+
+    def test_collectstatic_fingerprints_and_compresses(self):
+        """
+        Every asset gets a content hash and compressed copies; URLs in
+        CSS point at the hashed font files.
+        """
+        # Arrange
+        root = self.static_root.name
+        with open(os.path.join(root, "staticfiles.json")) as manifest:
+            paths = json.load(manifest)["paths"]
+
+        # Act
+        icons = "myNotesApp/vendor/bootstrap-icons/"
+        css = paths[icons + "bootstrap-icons.min.css"]
+        font = paths[icons + "fonts/bootstrap-icons.woff2"]
+        with open(os.path.join(root, css)) as stylesheet:
+            rewritten = stylesheet.read()
+
+        # Assert
+        self.assertRegex(css, r"\.[0-9a-f]{12}\.css$")
+        self.assertIn(os.path.basename(font), rewritten)
+        for suffix in (".gz", ".br"):
+            self.assertTrue(os.path.exists(os.path.join(root, css + suffix)))
+
+    def test_hashed_assets_are_immutable(self):
+        """
+        A fingerprinted asset is served precompressed with a one-year
+        immutable Cache-Control, so browsers never revalidate it.
+        """
+        # Arrange
+        url = self.client.get(reverse("note_list")).content.decode()
+        url = re.search(r'/static/myNotesApp/js/scripts\.\w+\.js', url)[0]
+
+        # Act
+        response = self.client.get(url, headers={"accept-encoding": "br"})
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("max-age=315360000", response["Cache-Control"])
+
+
+class ProductionServerTest(TestCase):
+    """
+    Test suite for the health endpoint and the gunicorn configuration.
+
+    Methods:
+        test_health_ok():
+            Checks the response when the database is ready.
+        test_health_database_down():
+            Checks that a failing database gives 503.
+        test_health_pending_migrations():
+            Checks that unapplied migrations give 503.
+        test_gunicorn_config():
+            Checks the worker count, preloading and keep-alive.
+    """
+    def test_health_ok(self):
+        """
+        A migrated, reachable database reports ok and is never cached.
+        """
+        # Act
+        response = self.client.get(reverse("health"))
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                "status": "ok",
+                "checks": {"database": "ok", "migrations": "ok"},
+            },
+        )
+        self.assertIn("no-store", response["Cache-Control"])
+
+    def test_health_database_down(self):
+        """
+        The endpoint answers 503 when the database cannot be queried.
+        """
+        # Arrange
+        failure = DatabaseError("unable to open database file")
+
+        # Act
+        with mock.patch(
+            "myNotesApp.health.check_database", side_effect=failure
+        ):
+            response = self.client.get(reverse("health"))
+
+        # Assert
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["status"], "error")
+        self.assertIn("unable to open", response.json()["checks"]["database"])
+
+    def test_health_pending_migrations(self):
+        """
+        A database that still needs `migrate` is not ready.
+        """
+        # Act
+        with mock.patch(
+            "myNotesApp.health.check_migrations",
+            return_value=["myNotesApp.0099_future"],
+        ):
+            response = self.client.get(reverse("health"))
+
+        # Assert
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(
+            response.json()["checks"]["migrations"], "1 unapplied"
+        )
+
+    def test_gunicorn_config(self):
+        """
+        Workers follow the core count unless configured, the app is
+        preloaded, and workers drop inherited database connections.
+        """
+        # Arrange
+        path = os.path.join(settings.BASE_DIR, "gunicorn.conf.py")
+
+        # Act
+        with mock.patch.dict(os.environ, {"WSGI_KEEPALIVE": "10"}):
+            os.environ.pop("WSGI_WORKERS", None)
+            config = runpy.run_path(path)
+        with mock.patch("django.db.connections.close_all") as close_all:
+            config["post_fork"](server=None, worker=None)
+
+        # Assert
+        self.assertEqual(config["workers"], os.cpu_count() * 2 + 1)
+        self.assertTrue(config["preload_app"])
+        self.assertEqual(config["keepalive"], 10)
+        self.assertEqual(
+            config["wsgi_app"], "sticky_notes_project.wsgi:application"
+        )
+        close_all.assert_called_once()
+
+
+class NoteOwnershipTest(TestCase):
+    """
+    Test suite for per-user boards.
+
+    Methods:
+        setUp():
+            Creates two users with one note each and signs in the first.
+        test_anonymous_visitors_must_sign_in():
+            Checks the login redirect and the API's 401.
+        test_other_boards_are_not_visible():
+            Checks that another user's note is not listed or found.
+        test_other_boards_cannot_be_changed():
+            Checks that writes to another user's note are refused.
+        test_admin_scopes_staff_to_their_notes():
+            Checks which notes staff and superusers see in the admin.
+    """
+    def setUp(self):
+        """
+        Creates two users with one note each and signs in the first.
+        """
+        self.user = create_user()
+        self.other = create_user("other")
+        self.mine = Note.objects.create(
+            owner=self.user, title="Mine", content="Body"
+        )
+        self.theirs = Note.objects.create(
+            owner=self.other, title="Theirs", content="Body"
+        )
+        self.client.force_login(self.user)
+
+    def test_anonymous_visitors_must_sign_in(self):
+        """
+        Pages redirect to the login form and the API answers 401.
+        """
+        # Arrange
+        self.client.logout()
+
+        # Act
+        page = self.client.get(reverse("note_list"))
+        api = self.client.get(reverse("api_note_list"))
+
+        # Assert
+        self.assertRedirects(
+            page, f"{reverse('login')}?next={reverse('note_list')}"
+        )
+        self.assertEqual(api.status_code, 401)
+
+    def test_other_boards_are_not_visible(self):
+        """
+        The list, detail page, search, API and sync only show own notes.
+        """
+        # Act
+        page = self.client.get(reverse("note_list"))
+        detail = self.client.get(
+            reverse("note_detail", args=[self.theirs.pk])
+        )
+        search = self.client.get(reverse("note_search"), {"q": "Theirs"})
+        api = self.client.get(reverse("api_note_list")).json()
+        sync = self.client.get(reverse("api_note_sync")).json()
+
+        # Assert
+        self.assertContains(page, "Mine")
+        self.assertNotContains(page, "Theirs")
+        self.assertEqual(detail.status_code, 404)
+        self.assertEqual(list(search.context["notes"]), [])
+        self.assertEqual(
+            [note["id"] for note in api["results"]], [self.mine.pk]
+        )
+        self.assertEqual(
+            [note["id"] for note in sync["changes"]], [self.mine.pk]
+        )
+
+    def test_other_boards_cannot_be_changed(self):
+        """
+        Updating, pinning or deleting another user's note is a 404.
+        """
+        # Act
+        responses = [
+            self.client.post(
+                reverse("note_update", args=[self.theirs.pk]),
+                {"title": "Taken", "content": "Body"},
+            ),
+            self.client.post(
+                reverse("note_toggle_pin", args=[self.theirs.pk])
+            ),
+            self.client.post(reverse("note_delete", args=[self.theirs.pk])),
+        ]
+
+        # Assert
+        self.assertEqual(
+            [response.status_code for response in responses], [404] * 3
+        )
+        self.theirs.refresh_from_db()
+        self.assertEqual(self.theirs.title, "Theirs")
+        self.assertFalse(self.theirs.pinned)
+
+    def test_admin_scopes_staff_to_their_notes(self):
+        """
+        Staff see their own notes in the admin; superusers see all.
+        """
+        # Arrange
+        model_admin = admin.site._registry[Note]
+        staff = RequestFactory().get("/")
+        staff.user = self.user
+        superuser = RequestFactory().get("/")
+        superuser.user = get_user_model().objects.create_superuser(
+            "admin", password="correct horse battery staple"
+        )
+
+        # Act
+        staff_notes = model_admin.get_queryset(staff)
+        all_notes = model_admin.get_queryset(superuser)
+
+        # Assert
+        self.assertEqual(list(staff_notes), [self.mine])
+        self.assertEqual(set(all_notes), {self.mine, self.theirs})
+
+
+class NoteOwnerMigrationTest(TransactionTestCase):
+    """
+    Test suite for migrations 0008 and 0009, which add the note owner.
+
+    Migrating commits, so this suite does not run inside a transaction.
+
+    Methods:
+        test_existing_notes_get_the_default_owner():
+            Migrates notes and tombstones created before 0008.
+        test_0009_does_not_rebuild_the_note_table():
+            Checks that 0009 only swaps indexes.
+    """
+    serialized_rollback = True
+
+    def tearDown(self):
+        """
+        Leaves the database fully migrated for the other tests.
+
+        The notes are deleted while the sequence row still exists: the
+        flush that follows empties that row first, and the tombstone
+        trigger could not number the deletions.
+        """
+        call_command("migrate", "myNotesApp", verbosity=0)
+        Note.objects.all().delete()
+
+    def test_existing_notes_get_the_default_owner(self):
+        """
+        Existing notes and tombstones are assigned to the default owner in
+        batches, and later deletions record the owner in the tombstone.
+        """
+        # Arrange
+        call_command("migrate", "myNotesApp", "0007", verbosity=0)
+        with connection.cursor() as cursor:
+            for title in ("One", "Two", "Three"):
+                cursor.execute(
+                    "INSERT INTO myNotesApp_note (title, content, pinned, "
+                    "created_at, updated_at, preview, change_seq) "
+                    "VALUES (%s, '', 0, '2026-01-01', '2026-01-01', '', 0)",
+                    [title],
+                )
+            cursor.execute(
+                "DELETE FROM myNotesApp_note WHERE title = 'Three'"
+            )
+        migration = import_module("myNotesApp.migrations.0008_note_owner")
+
+        # Act
+        with mock.patch.object(migration, "BATCH_SIZE", 1):
+            call_command("migrate", "myNotesApp", verbosity=0)
+        Note.objects.get(title="Two").delete()
+
+        # Assert
+        owner = get_user_model().objects.get(username="notes")
+        self.assertFalse(owner.has_usable_password())
+        self.assertEqual(Note.objects.filter(owner=owner).count(), 1)
+        self.assertEqual(
+            list(
+                NoteTombstone.objects.order_by("change_seq").values_list(
+                    "owner_id", flat=True
+                )
+            ),
+            [owner.pk, owner.pk],
+        )
+
+    def test_0009_does_not_rebuild_the_note_table(self):
+        """
+        Copying the table would undo the batches of 0008 by locking the
+        whole table in one transaction.
+        """
+        # Act
+        out = StringIO()
+        call_command(
+            "sqlmigrate", "myNotesApp", "0009_note_owner_required", stdout=out
+        )
+
+        # Assert
+        self.assertNotIn("CREATE TABLE", out.getvalue())
+        self.assertIn("CREATE INDEX", out.getvalue())
+
+
+class NoteTrashTest(TestCase):
+    """
+    Test suite for soft deletion, the trash and the purge.
+
+    Methods:
+        setUp():
+            Creates a note and signs its owner in.
+        test_delete_moves_note_to_trash():
+            Checks that a deleted note leaves the board for the trash.
+        test_restore_returns_note_to_board():
+            Checks the restore endpoint and its sync change.
+        test_purge_deletes_expired_trash_in_batches():
+            Checks which notes the purge deletes and its tombstones.
+    """
+    def setUp(self):
+        """
+        Creates a note and signs its owner in.
+        """
+        self.user = create_user()
+        self.client.force_login(self.user)
+        self.note = Note.objects.create(
+            owner=self.user, title="Groceries", content="Buy milk"
+        )
+
+    def test_delete_moves_note_to_trash(self):
+        """
+        The note is hidden from the list, detail page, search and sync,
+        and listed in the trash.
+        """
+        # Arrange
+        cursor = self.client.get(reverse("api_note_sync")).json()["cursor"]
+
+        # Act
+        response = self.client.post(
+            reverse("note_delete", kwargs={"pk": self.note.pk})
+        )
+
+        # Assert
+        self.assertRedirects(response, reverse("note_list"))
+        self.note.refresh_from_db()
+        self.assertIsNotNone(self.note.deleted_at)
+        self.assertNotContains(self.client.get(reverse("note_list")), "Buy")
+        self.assertEqual(
+            self.client.get(
+                reverse("note_detail", kwargs={"pk": self.note.pk})
+            ).status_code,
+            404,
+        )
+        search = self.client.get(reverse("note_search"), {"q": "milk"})
+        self.assertEqual(list(search.context["notes"]), [])
+        sync = self.client.get(
+            reverse("api_note_sync"), {"since": cursor}
+        ).json()
+        self.assertEqual(sync["deleted"], [self.note.pk])
+        self.assertEqual(sync["changes"], [])
+        self.assertContains(self.client.get(reverse("note_trash")), "Buy")
+
+    def test_restore_returns_note_to_board(self):
+        """
+        A restored note is listed again and synced as a change; restoring
+        a live note is a 404.
+        """
+        # Arrange
+        trash_notes(Note.objects.filter(pk=self.note.pk))
+        cursor = self.client.get(reverse("api_note_sync")).json()["cursor"]
+        url = reverse("note_restore", kwargs={"pk": self.note.pk})
+
+        # Act
+        restored = self.client.post(url)
+        again = self.client.post(url)
+
+        # Assert
+        self.assertRedirects(restored, reverse("note_trash"))
+        self.assertEqual(again.status_code, 404)
+        self.assertContains(self.client.get(reverse("note_list")), "Buy")
+        sync = self.client.get(
+            reverse("api_note_sync"), {"since": cursor}
+        ).json()
+        self.assertEqual(
+            [note["id"] for note in sync["changes"]], [self.note.pk]
+        )
+
+    def test_purge_deletes_expired_trash_in_batches(self):
+        """
+        Only notes trashed before the retention period are deleted, in
+        batches, and each deletion leaves a sync tombstone.
+        """
+        # Arrange
+        old = timezone.now() - timedelta(days=31)
+        expired = [
+            Note.objects.create(owner=self.user, title=f"Old {i}", content="")
+            for i in range(3)
+        ]
+        Note.objects.filter(pk__in=[n.pk for n in expired]).update(
+            deleted_at=old
+        )
+        recent = Note.objects.create(owner=self.user, title="New", content="")
+        trash_notes(Note.objects.filter(pk=recent.pk))
+        out = StringIO()
+
+        # Act
+        call_command(
+            "purge_trash", "--days", "30", "--batch-size", "2", stdout=out
+        )
+
+        # Assert
+        self.assertIn("Purged 3 notes", out.getvalue())
+        self.assertEqual(
+            set(Note.objects.values_list("pk", flat=True)),
+            {self.note.pk, recent.pk},
+        )
+        self.assertEqual(
+            set(NoteTombstone.objects.values_list("note_id", flat=True)),
+            {note.pk for note in expired},
+        )
+
+
+class NoteTagTest(TestCase):
+    """
+    Test suite for note tags, the tag filters and the facet counts.
+
+    Methods:
+        setUp():
+            Creates three tagged notes and signs their owner in.
+        test_form_saves_normalised_tags():
+            Checks that the form creates, normalises and replaces tags.
+        test_filter_all_and_any():
+            Checks the AND and OR filters of the note list.
+        test_facets_count_live_notes_in_one_query():
+            Checks the sidebar counts and that trashed notes are left out.
+        test_pagination_keeps_the_filter():
+            Checks that the next-page link carries the tag filter.
+        test_tag_with_comma_is_cached_apart():
+            Checks that a tag named "a,b" and the tags "a" and "b" do not
+            share cached pages.
+        test_async_list_filters_by_tag():
+            Checks the tag filter through the async views.
+    """
+    def setUp(self):
+        """
+        Creates three tagged notes and signs their owner in.
+        """
+        # Arrange
+        self.user = create_user()
+        self.client.force_login(self.user)
+        self.both = Note.objects.create(
+            owner=self.user, title="Both", content="Body"
+        )
+        self.work = Note.objects.create(
+            owner=self.user, title="Work only", content="Body"
+        )
+        self.ideas = Note.objects.create(
+            owner=self.user, title="Ideas only", content="Body"
+        )
+        set_note_tags(self.both, ["work", "ideas"])
+        set_note_tags(self.work, ["work"])
+        set_note_tags(self.ideas, ["ideas"])
+
+    def titles(self, response):
+        """Returns the titles of the notes listed by a response."""
+        return {note.title for note in response.context["notes"]}
+
+    def test_form_saves_normalised_tags(self):
+        """
+        Tags typed in the form are trimmed, lowercased and deduplicated,
+        and editing the note replaces them.
+        """
+        # Act
+        self.client.post(
+            reverse("note_create"),
+            {"title": "New", "content": "Text", "tags": " Work , TODO,work"},
+        )
+        note = Note.objects.get(title="New")
+        created = set(note.tags.values_list("name", flat=True))
+        self.client.post(
+            reverse("note_update", kwargs={"pk": note.pk}),
+            {"title": "New", "content": "Text", "tags": "todo"},
+        )
+
+        # Assert
+        self.assertEqual(created, {"work", "todo"})
+        self.assertEqual(
+            list(note.tags.values_list("name", flat=True)), ["todo"]
+        )
+        self.assertEqual(
+            self.user.tags.filter(name="work").count(), 1
+        )
+
+    def test_filter_all_and_any(self):
+        """
+        Repeated `tag` parameters match notes with every tag, or with any
+        of them when `match=any`.
+        """
+        # Act
+        every = self.client.get(
+            reverse("note_list"), {"tag": ["work", "ideas"]}
+        )
+        either = self.client.get(
+            reverse("note_list"), {"tag": ["work", "ideas"], "match": "any"}
+        )
+
+        # Assert
+        self.assertEqual(self.titles(every), {"Both"})
+        self.assertEqual(
+            self.titles(either), {"Both", "Work only", "Ideas only"}
+        )
+
+    def test_facets_count_live_notes_in_one_query(self):
+        """
+        The facets count each tag's live notes in a single query.
+        """
+        # Arrange
+        trash_notes(Note.objects.filter(pk=self.ideas.pk))
+
+        # Act
+        with self.assertNumQueries(1):
+            facets = tag_facets(self.user)
+
+        # Assert
+        self.assertEqual(
+            facets,
+            [{"name": "ideas", "count": 1}, {"name": "work", "count": 2}],
+        )
+        self.assertContains(
+            self.client.get(reverse("note_list")), "?tag=work"
+        )
+
+    def test_pagination_keeps_the_filter(self):
+        """
+        The next page of a filtered list stays filtered.
+        """
+        # Act
+        first = self.client.get(
+            reverse("note_list"), {"tag": "work", "page_size": 1}
+        )
+        next_url = re.search(
+            r'href="(\?[^"]*cursor=[^"]*)"', first.content.decode()
+        ).group(1)
+        second = self.client.get(
+            reverse("note_list") + next_url.replace("&amp;", "&")
+        )
+
+        # Assert
+        self.assertIn("tag=work", next_url)
+        self.assertEqual(
+            self.titles(first) | self.titles(second), {"Both", "Work only"}
+        )
+
+    def test_tag_with_comma_is_cached_apart(self):
+        """
+        `?tag=ideas,work` asks for one tag named "ideas,work", which no
+        note has; it must not be served the cached page of
+        `?tag=ideas&tag=work`.
+        """
+        # Arrange
+        get_cache().clear()
+        both = self.client.get(
+            reverse("note_list") + "?tag=ideas&tag=work"
+        )
+
+        # Act
+        one = self.client.get(reverse("note_list"), {"tag": "ideas,work"})
+
+        # Assert
+        self.assertContains(both, "Both")
+        self.assertNotContains(one, "Both")
+
+    async def test_async_list_filters_by_tag(self):
+        """
+        The async note list applies the filter and renders the tags.
+        """
+        # Arrange
+        await self.async_client.aforce_login(self.user)
+
+        # Act
+        with self.settings(ROOT_URLCONF=notes_urlconf(async_views)):
+            response = await self.async_client.get(
+                reverse("note_list"), {"tag": "ideas"}
+            )
+
+        # Assert
+        self.assertEqual(self.titles(response), {"Both", "Ideas only"})
+        self.assertContains(response, "ideas")
+
+
+class NoteBulkActionTest(TestCase):
+    """
+    Test suite for the multi-select bulk actions and the admin actions.
+
+    Methods:
+        setUp():
+            Creates three notes and signs their owner in.
+        test_bulk_pin_is_a_single_update():
+            Checks that pinning many notes takes one UPDATE.
+        test_bulk_tag_and_trash():
+            Checks the tag and trash actions and the JSON response.
+        test_selection_is_capped():
+            Checks that oversized selections are refused.
+        test_result_message_is_not_answered_with_304():
+            Checks that the redirected list page shows the message.
+        test_tagging_respects_tag_limit():
+            Checks that no note ends up with too many tags.
+        test_async_bulk_action():
+            Checks the bulk action through the async views.
+        test_admin_actions_update_in_batches():
+            Checks the admin actions and their batching.
+    """
+    def setUp(self):
+        """
+        Creates three notes and signs their owner in.
+        """
+        # Arrange
+        self.user = create_user()
+        self.client.force_login(self.user)
+        self.notes = [
+            Note.objects.create(owner=self.user, title=f"Note {i}", content="")
+            for i in range(3)
+        ]
+        self.ids = [note.pk for note in self.notes]
+
+    def test_bulk_pin_is_a_single_update(self):
+        """
+        The selected notes are pinned with one UPDATE; another user's
+        note in the selection is left alone.
+        """
+        # Arrange
+        other = Note.objects.create(
+            owner=create_user("other"), title="Other", content=""
+        )
+        next_url = reverse("note_list") + "?select=1"
+
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("note_bulk"),
+                {
+                    "action": "pin",
+                    "ids": [*self.ids, other.pk],
+                    "next": next_url,
+                },
+            )
+
+        # Assert: read the queries before the next request resets them
+        updates = [
+            q["sql"] for q in queries if q["sql"].startswith("UPDATE")
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertRedirects(response, next_url, fetch_redirect_response=False)
+        self.assertEqual(Note.objects.filter(pinned=True).count(), 3)
+        self.assertContains(self.client.get(next_url), "Pinned 3 notes.")
+
+    def test_bulk_tag_and_trash(self):
+        """
+        Tags are added next to the notes' existing ones, and trashed notes
+        can be restored; JSON clients get the number of notes changed.
+        """
+        # Arrange
+        set_note_tags(self.notes[0], ["old"])
+
+        # Act
+        tagged = self.client.post(
+            reverse("note_bulk"),
+            {"action": "tag", "ids": self.ids[:2], "tags": "Work"},
+            headers={"accept": "application/json"},
+        )
+        trashed = self.client.post(
+            reverse("note_bulk"),
+            {"action": "delete", "ids": self.ids[1:]},
+            headers={"accept": "application/json"},
+        )
+
+        # Assert
+        self.assertEqual(tagged.json(), {"action": "tag", "changed": 2})
+        self.assertEqual(
+            set(self.notes[0].tags.values_list("name", flat=True)),
+            {"old", "work"},
+        )
+        self.assertEqual(
+            list(self.notes[1].tags.values_list("name", flat=True)),
+            ["work"],
+        )
+        self.assertEqual(trashed.json()["changed"], 2)
+        self.assertEqual(
+            list(Note.objects.live().values_list("pk", flat=True)),
+            self.ids[:1],
+        )
+        self.assertEqual(tag_facets(self.user), [
+            {"name": "old", "count": 1},
+            {"name": "work", "count": 1},
+        ])
+
+    @override_settings(NOTES_BULK_MAX_NOTES=2)
+    def test_selection_is_capped(self):
+        """
+        A selection above `NOTES_BULK_MAX_NOTES` changes nothing.
+        """
+        # Act
+        response = self.client.post(
+            reverse("note_bulk"),
+            {"action": "pin", "ids": self.ids},
+            headers={"accept": "application/json"},
+        )
+        missing_tags = self.client.post(
+            reverse("note_bulk"),
+            {"action": "tag", "ids": self.ids[:1]},
+            follow=True,
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("ids", response.json()["errors"])
+        self.assertFalse(Note.objects.filter(pinned=True).exists())
+        self.assertRedirects(missing_tags, reverse("note_list"))
+        self.assertContains(missing_tags, "Enter the tags to add.")
+
+    def test_result_message_is_not_answered_with_304(self):
+        """
+        An empty selection leaves the list unchanged, but the browser's
+        conditional GET after the redirect must still get the page with
+        the error, and without validators for it to be cached under.
+        """
+        # Arrange
+        url = reverse("note_list")
+        etag = self.client.get(url)["ETag"]
+
+        # Act
+        self.client.post(reverse("note_bulk"), {"action": "pin"})
+        with_message = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        after = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertContains(with_message, "Select at least one note.")
+        self.assertNotIn("ETag", with_message)
+        self.assertEqual(after.status_code, 304)
+
+    def test_tagging_respects_tag_limit(self):
+        """
+        A note that already has `MAX_TAGS_PER_NOTE` tags is not tagged,
+        so its edit form still validates; the other notes are.
+        """
+        # Arrange
+        full = [f"tag{i}" for i in range(MAX_TAGS_PER_NOTE)]
+        set_note_tags(self.notes[0], full)
+
+        # Act
+        response = self.client.post(
+            reverse("note_bulk"),
+            {"action": "tag", "ids": self.ids[:2], "tags": "extra"},
+            headers={"accept": "application/json"},
+        )
+
+        # Assert
+        self.assertEqual(response.json()["changed"], 1)
+        self.assertEqual(
+            sorted(self.notes[0].tags.values_list("name", flat=True)),
+            sorted(full),
+        )
+        self.assertEqual(
+            list(self.notes[1].tags.values_list("name", flat=True)),
+            ["extra"],
+        )
+
+    async def test_async_bulk_action(self):
+        """
+        The async view applies the action and renders the select mode.
+        """
+        # Arrange
+        await self.async_client.aforce_login(self.user)
+
+        # Act
+        with self.settings(ROOT_URLCONF=notes_urlconf(async_views)):
+            response = await self.async_client.post(
+                reverse("note_bulk"),
+                {"action": "pin", "ids": self.ids[:2]},
+                headers={"accept": "application/json"},
+            )
+            page = await self.async_client.get(
+                reverse("note_list"), {"select": "1"}
+            )
+
+        # Assert
+        self.assertEqual(response.json()["changed"], 2)
+        self.assertEqual(await Note.objects.filter(pinned=True).acount(), 2)
+        self.assertContains(page, 'id="note-bulk"')
+
+    @override_settings(NOTES_BULK_MAX_NOTES=2)
+    def test_admin_actions_update_in_batches(self):
+        """
+        The admin actions update the selection in batches of at most
+        `NOTES_BULK_MAX_NOTES` notes.
+        """
+        # Arrange
+        admin_user = get_user_model().objects.create_superuser(
+            "admin", password="correct horse battery staple"
+        )
+        self.client.force_login(admin_user)
+        url = reverse("admin:myNotesApp_note_changelist")
+
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(
+                url, {"action": "pin_selected", "_selected_action": self.ids}
+            )
+        updates = [
+            q["sql"] for q in queries if q["sql"].startswith("UPDATE")
+        ]
+        self.client.post(
+            url, {"action": "trash_selected", "_selected_action": self.ids}
+        )
+        self.client.post(
+            url,
+            {"action": "restore_selected", "_selected_action": self.ids[:1]},
+        )
+
+        # Assert
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(Note.objects.filter(pinned=True).count(), 3)
+        self.assertEqual(
+            list(Note.objects.live().values_list("pk", flat=True)),
+            self.ids[:1],
+        )
+
+
+class ReadReplicaTest(TestCase):
+    """
+    Test suite for the read replica router and its refresh command.
+
+    Methods:
+        setUp():
+            Configures a replica backed by a temporary file.
+        mark_refreshed():
+            Records a replica refresh.
+        route():
+            Routes a read of `model` within `request`.
+        test_refresh_copies_primary_and_records_time():
+            Checks the online backup copy and the refresh marker.
+        test_only_eligible_reads_use_the_replica():
+            Checks which views and models read from the replica.
+        test_writes_stick_to_primary_until_refreshed():
+            Checks the read-after-write cookie.
+        test_lagging_replica_falls_back_to_primary():
+            Checks the replication lag guard.
+    """
+    def setUp(self):
+        """
+        Configures a replica backed by a temporary file.
+        """
+        # Arrange
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.primary = os.path.join(tmp.name, "primary.sqlite3")
+        self.replica = os.path.join(tmp.name, "replica.sqlite3")
+        databases = {
+            "default": {**settings.DATABASES["default"], "NAME": self.primary},
+            "replica": {**settings.DATABASES["default"], "NAME": self.replica},
+        }
+        # Only the router and the refresh read these settings; the test
+        # connections keep using the test database.
+        override = override_settings(DATABASES=databases)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            override.enable()
+
+        def disable():
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                override.disable()
+
+        self.addCleanup(disable)
+        self.factory = RequestFactory()
+
+    def mark_refreshed(self, seconds_ago=0.0):
+        """Records a replica refresh `seconds_ago` seconds ago."""
+        with open(marker_path("replica"), "w") as marker:
+            marker.write(str(time.time() - seconds_ago))
+
+    def route(self, request, model=Note):
+        """
+        Routes a read of `model` within `request`.
+
+        Returns:
+            tuple: (alias or None, read generation, response).
+        """
+        request.resolver_match = resolve(request.path)
+        seen = {}
+
+        def view(request):
+            seen["db"] = ReplicaRouter().db_for_read(model)
+            seen["generation"] = read_generation()
+            return HttpResponse()
+
+        response = ReplicaRoutingMiddleware(view)(request)
+        return seen["db"], seen["generation"], response
+
+    def test_refresh_copies_primary_and_records_time(self):
+        """
+        The refresh copies the primary's rows and records its start time.
+        """
+        # Arrange
+        with sqlite3.connect(self.primary) as primary:
+            primary.execute("CREATE TABLE t (x)")
+            primary.executemany("INSERT INTO t VALUES (?)", [(1,), (2,)])
+        primary.close()
+        before = time.time()
+
+        # Act
+        call_command("refresh_replica", "--pages", "1", stdout=StringIO())
+
+        # Assert
+        replica = sqlite3.connect(self.replica)
+        self.addCleanup(replica.close)
+        self.assertEqual(
+            replica.execute("SELECT count(*) FROM t").fetchone(), (2,)
+        )
+        self.assertGreaterEqual(replica_refreshed_at("replica"), before)
+
+    def test_only_eligible_reads_use_the_replica(self):
+        """
+        Page reads of notes use a fresh replica; users, sync and writes
+        stay on the primary, and without a refresh nothing moves.
+        """
+        # Arrange
+        never_refreshed, _, _ = self.route(
+            self.factory.get(reverse("note_list"))
+        )
+        self.mark_refreshed()
+
+        # Act
+        page, generation, _ = self.route(
+            self.factory.get(reverse("note_list"))
+        )
+        user, _, _ = self.route(
+            self.factory.get(reverse("note_list")), get_user_model()
+        )
+        sync, _, _ = self.route(self.factory.get(reverse("api_note_sync")))
+        post, _, _ = self.route(self.factory.post(reverse("note_list")))
+
+        # Assert
+        self.assertIsNone(never_refreshed)
+        self.assertEqual(page, "replica")
+        self.assertTrue(generation.startswith("@r"))
+        self.assertEqual([user, sync, post], [None, None, None])
+
+    def test_writes_stick_to_primary_until_refreshed(self):
+        """
+        A write sets a cookie that keeps the session's reads on the
+        primary until the replica is refreshed after it.
+        """
+        # Arrange
+        self.mark_refreshed(seconds_ago=1)
+
+        # Act
+        _, _, response = self.route(self.factory.post(reverse("note_list")))
+        cookie = response.cookies[WRITE_COOKIE].value
+        self.factory.cookies[WRITE_COOKIE] = cookie
+        sticky, generation, _ = self.route(
+            self.factory.get(reverse("note_list"))
+        )
+        self.mark_refreshed()
+        refreshed, _, _ = self.route(self.factory.get(reverse("note_list")))
+
+        # Assert
+        self.assertIsNone(sticky)
+        self.assertEqual(generation, "")
+        self.assertEqual(refreshed, "replica")
+
+    @override_settings(NOTES_REPLICA_MAX_LAG=5)
+    def test_lagging_replica_falls_back_to_primary(self):
+        """
+        A replica last refreshed longer ago than the allowed lag is not
+        read.
+        """
+        # Arrange
+        self.mark_refreshed(seconds_ago=6)
+
+        # Act
+        db, generation, _ = self.route(
+            self.factory.get(reverse("note_detail", kwargs={"pk": 1}))
+        )
+
+        # Assert
+        self.assertIsNone(db)
+        self.assertEqual(generation, "")
+
+
+class DatabaseBackupTest(TestCase):
+    """
+    Test suite for the online backup and restore commands.
+
+    Methods:
+        setUp():
+            Creates a small SQLite database in a temporary directory.
+        count_rows():
+            Counts the rows of the test table in a database file.
+        test_backup_writes_checksummed_snapshots_and_rotates():
+            Checks the snapshots, checksums, report and rotation.
+        test_restore_replaces_database_and_rejects_damage():
+            Checks a restore and the checksum verification.
+        test_restore_expires_sync_cursors():
+            Checks that delta sync clients must resynchronise.
+    """
+    def setUp(self):
+        """
+        Creates a small SQLite database in a temporary directory.
+        """
+        # Arrange
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = os.path.join(tmp.name, "backups")
+        self.db = os.path.join(tmp.name, "live.sqlite3")
+        connection = sqlite3.connect(self.db)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("CREATE TABLE t (x)")
+        connection.executemany(
+            "INSERT INTO t VALUES (?)", [(i,) for i in range(500)]
+        )
+        connection.commit()
+        connection.close()
+        # Only the backup functions read these settings; the test
+        # connections keep using the test database.
+        databases = {
+            "default": {**settings.DATABASES["default"], "NAME": self.db}
+        }
+        override = override_settings(DATABASES=databases)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            override.enable()
+
+        def disable():
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                override.disable()
+
+        self.addCleanup(disable)
+
+    def count_rows(self, path):
+        """Counts the rows of the test table in a database file."""
+        connection = sqlite3.connect(path)
+        try:
+            return connection.execute("SELECT count(*) FROM t").fetchone()[0]
+        finally:
+            connection.close()
+
+    def test_backup_writes_checksummed_snapshots_and_rotates(self):
+        """
+        Each run writes a compressed snapshot with a matching checksum
+        and reports its throughput; only the newest `--keep` remain.
+        """
+        # Act
+        out = StringIO()
+        for _ in range(3):
+            call_command(
+                "backup_db", "--dir", self.dir, "--keep", "2",
+                "--pages", "1", stdout=out,
+            )
+
+        # Assert
+        snapshots = list_snapshots(self.dir)
+        self.assertEqual(len(snapshots), 2)
+        self.assertEqual(len(os.listdir(self.dir)), 4)
+        for path in snapshots:
+            verify_snapshot(path)
+        copy = os.path.join(self.dir, "copy.sqlite3")
+        with gzip.open(snapshots[-1]) as packed, open(copy, "wb") as raw:
+            raw.write(packed.read())
+        self.assertEqual(self.count_rows(copy), 500)
+        self.assertIn("MB/s", out.getvalue())
+        self.assertIn("Writers paused", out.getvalue())
+        self.assertEqual(out.getvalue().count("Removed old snapshot"), 1)
+
+    def test_restore_replaces_database_and_rejects_damage(self):
+        """
+        Restoring brings back the snapshot's rows; a snapshot that does
+        not match its checksum is refused before the database is touched.
+        """
+        # Arrange
+        call_command("backup_db", "--dir", self.dir, stdout=StringIO())
+        connection = sqlite3.connect(self.db)
+        connection.execute("DELETE FROM t")
+        connection.commit()
+        connection.close()
+
+        # Act
+        call_command(
+            "restore_db", "--dir", self.dir, "--noinput", stdout=StringIO()
+        )
+        restored = self.count_rows(self.db)
+        snapshot = list_snapshots(self.dir)[-1]
+        with open(snapshot, "ab") as damaged:
+            damaged.write(b"x")
+
+        # Assert
+        self.assertEqual(restored, 500)
+        with self.assertRaisesMessage(CommandError, "Checksum mismatch"):
+            call_command("restore_db", str(snapshot), "--noinput")
+
+    def test_restore_expires_sync_cursors(self):
+        """
+        After a restore, the change sequence is past every cursor handed
+        out before it, and compacted up to there: a client ahead of the
+        snapshot gets "cursor expired" instead of "up to date".
+        """
+        # Arrange
+        connection = sqlite3.connect(self.db)
+        with connection:
+            connection.execute(
+                "CREATE TABLE myNotesApp_syncstate (id INTEGER PRIMARY KEY,"
+                " change_seq INTEGER, compacted_seq INTEGER)"
+            )
+            connection.execute(
+                "INSERT INTO myNotesApp_syncstate VALUES (1, 10, 0)"
+            )
+        call_command("backup_db", "--dir", self.dir, stdout=StringIO())
+        with connection:
+            connection.execute(
+                "UPDATE myNotesApp_syncstate SET change_seq = 25"
+            )
+
+        # Act
+        call_command(
+            "restore_db", "--dir", self.dir, "--noinput", stdout=StringIO()
+        )
+        state = connection.execute(
+            "SELECT change_seq, compacted_seq FROM myNotesApp_syncstate"
+        ).fetchone()
+        connection.close()
+
+        # Assert
+        self.assertEqual(state, (26, 26))
+
+
+class NoteRevisionTest(TestCase):
+    """
+    Test suite for the revision history of notes.
+
+    Methods:
+        setUp():
+            Creates a note and signs its owner in.
+        edit():
+            Saves a new content on a freshly loaded copy of the note.
+        test_edits_store_deltas_between_keyframes():
+            Checks the keyframe pattern, the rebuilt versions and the
+            constant number of queries per revision.
+        test_first_edit_keeps_baseline_and_pin_is_skipped():
+            Checks notes without history and saves that change no text.
+        test_stale_base_writes_keyframe():
+            Checks that concurrent edits never store a wrong delta.
+        test_history_view_is_paginated_and_lazy():
+            Checks the history pages and that the detail page does not
+            read them.
+        test_async_history_view():
+            Checks the history through the async views.
+    """
+    def setUp(self):
+        """
+        Creates a note and signs its owner in.
+        """
+        # Arrange
+        self.user = create_user()
+        self.client.force_login(self.user)
+        self.note = Note.objects.create(
+            owner=self.user, title="Draft", content="Version 0 of the note."
+        )
+
+    def edit(self, content):
+        """Saves a new content on a freshly loaded copy of the note."""
+        note = Note.objects.get(pk=self.note.pk)
+        note.content = content
+        note.save()
+
+    @override_settings(NOTES_REVISION_KEYFRAME_INTERVAL=3)
+    def test_edits_store_deltas_between_keyframes(self):
+        """
+        Every third revision is a keyframe and the others are deltas;
+        every version rebuilds exactly, and each revision costs the same
+        two queries however long the history is.
+        """
+        # Act
+        counts = []
+        for i in range(1, 8):
+            with CaptureQueriesContext(connection) as queries:
+                self.edit(f"Version {i} of the note.")
+            counts.append(sum("noterevision" in q["sql"] for q in queries))
+        revisions = NoteRevision.objects.filter(note=self.note)
+        history = revision_page(self.note, page_size=10).versions
+
+        # Assert
+        self.assertEqual(
+            list(revisions.order_by("number").values_list(
+                "keyframe", flat=True
+            )),
+            [True, False, False, True, False, False, True, False],
+        )
+        self.assertEqual(
+            [version.content for version in history],
+            [f"Version {i} of the note." for i in range(7, -1, -1)],
+        )
+        self.assertEqual(
+            get_version(self.note, 3).content, "Version 2 of the note."
+        )
+        self.assertIsNone(get_version(self.note, 9))
+        self.assertEqual(set(counts), {2})
+        # Only the changed character is stored.
+        delta = unpack(revisions.get(number=2).data)
+        self.assertEqual(delta, {"t": [[0, 5]], "c": [[0, 8], "1", [9, 22]]})
+
+    def test_first_edit_keeps_baseline_and_pin_is_skipped(self):
+        """
+        A note created without history keeps the text it had as
+        revision 1 on its first edit; saving only the pin adds nothing.
+        """
+        # Arrange
+        note = Note.objects.bulk_create(
+            [Note(owner=self.user, title="Imported", content="Old text")]
+        )[0]
+
+        # Act
+        self.client.post(
+            reverse("note_update", kwargs={"pk": note.pk}),
+            {"title": "Imported", "content": "New text"},
+        )
+        pinned = Note.objects.get(pk=note.pk)
+        pinned.pinned = True
+        pinned.save()
+
+        # Assert
+        versions = revision_page(note).versions
+        self.assertEqual(
+            [(v.number, v.content, v.keyframe) for v in versions],
+            [(2, "New text", False), (1, "Old text", True)],
+        )
+
+    def test_stale_base_writes_keyframe(self):
+        """
+        When another edit was saved since a copy was loaded, that copy's
+        revision is stored in full rather than as a delta against text
+        that is no longer the latest revision.
+        """
+        # Arrange
+        first = Note.objects.get(pk=self.note.pk)
+        second = Note.objects.get(pk=self.note.pk)
+
+        # Act
+        first.content = "First edit."
+        first.save()
+        second.content = "Second edit."
+        second.save()
+
+        # Assert
+        latest = NoteRevision.objects.get(note=self.note, number=3)
+        self.assertTrue(latest.keyframe)
+        self.assertEqual(
+            [v.content for v in revision_page(self.note).versions],
+            ["Second edit.", "First edit.", "Version 0 of the note."],
+        )
+
+    @override_settings(NOTES_HISTORY_PAGE_SIZE=5)
+    def test_history_view_is_paginated_and_lazy(self):
+        """
+        The history comes a page at a time, as a fragment for scripts;
+        the detail page only links to it and reads no revisions.
+        """
+        # Arrange
+        for i in range(1, 7):
+            self.edit(f"Version {i} of the note.")
+        url = reverse("note_history", kwargs={"pk": self.note.pk})
+
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            detail = self.client.get(
+                reverse("note_detail", kwargs={"pk": self.note.pk})
+            )
+            detail_sql = [q["sql"] for q in queries]
+        first = self.client.get(url, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+        older = self.client.get(url, {"before": 3})
+        invalid = self.client.get(url, {"before": "x"})
+        self.client.force_login(create_user("other"))
+        foreign = self.client.get(url)
+
+        # Assert
+        self.assertContains(detail, url)
+        self.assertFalse(any("noterevision" in sql for sql in detail_sql))
+        self.assertNotContains(first, "<html")
+        self.assertContains(first, "Version 6 of the note.")
+        self.assertContains(first, "Version 2 of the note.")
+        self.assertNotContains(first, "Version 1 of the note.")
+        self.assertContains(first, f"{url}?before=3")
+        self.assertContains(older, "<html")
+        self.assertContains(older, "Version 1 of the note.")
+        self.assertContains(older, "Version 0 of the note.")
+        self.assertNotContains(older, "?before=")
+        self.assertContains(invalid, "Version 6 of the note.")
+        self.assertEqual(foreign.status_code, 404)
+
+    async def test_async_history_view(self):
+        """
+        The async view shows the same history.
+        """
+        # Arrange
+        await self.async_client.aforce_login(self.user)
+        note = await Note.objects.aget(pk=self.note.pk)
+        note.content = "Edited asynchronously."
+        await note.asave()
+
+        # Act
+        with self.settings(ROOT_URLCONF=notes_urlconf(async_views)):
+            response = await self.async_client.get(
+                reverse("note_history", kwargs={"pk": self.note.pk})
+            )
+
+        # Assert
+        self.assertContains(response, "Edited asynchronously.")
+        self.assertContains(response, "Version 0 of the note.")
@@ -0,0 +1,268 @@
+"""
+This file streams notes in and out of the app as NDJSON or CSV.
+
+→ Exports walk the table in primary key order with
+  `QuerySet.iterator(chunk_size=...)`, yielding one line at a time, so
+  memory stays constant however many notes there are. An export can be
+  resumed with `after_id`.
+→ Imports read rows lazily, validate each one with `NoteForm` and insert
+  valid rows with `bulk_create` in batches, one short transaction per
+  batch. The id of the last imported source row is reported after every
+  batch so an interrupted import can be resumed.
+→ Both work on one user's notes: exports read the (owner, ...) indexes
+  and imported notes are given to the importing user.
+→ Imported notes keep their exported `created_at`, so a round trip does
+  not reorder the board. `bulk_create` fills `auto_now_add` fields with
+  the current time, so the batch sets it back with one `bulk_update`.
+  `updated_at` records the import, the note's latest write here.
+→ Only the first `MAX_REPORTED_ERRORS` rejected rows are kept in the
+  report, so a bad file cannot grow it without limit; all of them are
+  counted.
+"""
+
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .cache import bump_notes_version
+from .events import publish_reset
+from .forms import NoteForm
+from .models import Note
+
+FORMATS = ("ndjson", "csv")
+EXPORT_FIELDS = (
+    "id",
+    "title",
+    "content",
+    "pinned",
+    "created_at",
+    "updated_at",
+)
+
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_BATCH_SIZE = 500
+
+# Rejected rows whose errors are kept in the report.
+MAX_REPORTED_ERRORS = 100
+
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+class _Echo:
+    """A file-like object whose write() returns the value, for csv."""
+
+    def write(self, value):
+        return value
+
+
+def _export_row(note):
+    return {
+        "id": note.pk,
+        "title": note.title,
+        "content": note.content,
+        "pinned": note.pinned,
+        "created_at": note.created_at.isoformat(),
+        "updated_at": note.updated_at.isoformat(),
+    }
+
+
+def iter_export(
+    fmt="ndjson", after_id=0, chunk_size=DEFAULT_CHUNK_SIZE, owner=None
+):
+    """
+    Yields the live notes (not those in the trash) as lines of NDJSON or
+    CSV.
+
+    Args:
+        fmt (str): "ndjson" or "csv".
+        after_id (int): Only export notes with a larger id (for resuming).
+        chunk_size (int): Rows fetched from the database per round trip.
+        owner (User | None): Only export this user's notes; None exports
+            every note.
+
+    Yields:
+        str: One line of output, including the trailing newline. CSV
+        output starts with a header line.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}.")
+    notes = Note.objects.live().filter(pk__gt=after_id)
+    if owner is not None:
+        notes = notes.filter(owner=owner)
+    notes = notes.order_by("pk").iterator(chunk_size=chunk_size)
+    if fmt == "csv":
+        writer = csv.writer(_Echo())
+        yield writer.writerow(EXPORT_FIELDS)
+        for note in notes:
+            row = _export_row(note)
+            yield writer.writerow([row[name] for name in EXPORT_FIELDS])
+    else:
+        for note in notes:
+            yield json.dumps(_export_row(note), ensure_ascii=False) + "\n"
+
+
+def iter_import_rows(lines, fmt="ndjson"):
+    """
+    Parses exported lines back into row dictionaries.
+
+    Args:
+        lines (iterable): Lines of an NDJSON or CSV export.
+        fmt (str): "ndjson" or "csv".
+
+    Yields:
+        dict | None: One row per line, or None for a line that is not
+        valid JSON.
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(lines)
+        return
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row if isinstance(row, dict) else None
+
+
+@dataclass
+class ImportReport:
+    """
+    Progress of an import, updated after every batch.
+
+    Attributes:
+        imported (int): Rows inserted so far.
+        skipped (int): Rows skipped because they were already imported.
+        rejected (int): Rows rejected by validation.
+        errors (list): (row number, errors) for the first
+            `MAX_REPORTED_ERRORS` rejected rows.
+        last_id (int | None): Source id of the last inserted row.
+        elapsed (float): Seconds spent so far.
+    """
+    imported: int = 0
+    skipped: int = 0
+    rejected: int = 0
+    errors: list = field(default_factory=list)
+    last_id: int = None
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.imported / self.elapsed if self.elapsed else 0.0
+
+
+def _created_at(row):
+    """Returns the exported creation time of a row, or None."""
+    value = row.get("created_at")
+    try:
+        created_at = parse_datetime(value) if value else None
+    except (TypeError, ValueError):
+        return None
+    if created_at is not None and timezone.is_naive(created_at):
+        created_at = timezone.make_aware(created_at)
+    return created_at
+
+
+def _to_note(row, owner):
+    """Validates one row with NoteForm and returns (note, errors)."""
+    if row is None:
+        return None, {"__all__": ["Row is not a JSON object."]}
+    form = NoteForm(
+        data={"title": row.get("title"), "content": row.get("content")}
+    )
+    if not form.is_valid():
+        return None, dict(form.errors)
+    note = form.save(commit=False)
+    note.owner = owner
+    pinned = row.get("pinned")
+    note.pinned = (
+        pinned
+        if isinstance(pinned, bool)
+        else str(pinned).lower() in TRUE_VALUES
+    )
+    note.created_at = _created_at(row)
+    # bulk_create does not call save(), which fills the preview.
+    note.refresh_preview()
+    return note, {}
+
+
+def _source_id(row):
+    try:
+        return int(row.get("id"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def import_notes(
+    rows, owner, batch_size=DEFAULT_BATCH_SIZE, after_id=None, progress=None
+):
+    """
+    Validates and inserts rows in batches.
+
+    Args:
+        rows (iterable): Row dictionaries, e.g. from `iter_import_rows`.
+        owner (User): The user the imported notes belong to.
+        batch_size (int): Rows inserted per `bulk_create` / transaction.
+        after_id (int | None): Skip rows whose source id is not larger
+            than this (resume after the last imported id).
+        progress (callable | None): Called with the `ImportReport` after
+            every committed batch.
+
+    Returns:
+        ImportReport: The final report.
+    """
+    report = ImportReport()
+    started = time.perf_counter()
+    batch, batch_last_id = [], None
+
+    def flush():
+        created = [note.created_at for note in batch]
+        with transaction.atomic():
+            Note.objects.bulk_create(batch)
+            dated = []
+            for note, created_at in zip(batch, created):
+                if created_at is not None:
+                    note.created_at = created_at
+                    dated.append(note)
+            if dated:
+                Note.objects.bulk_update(dated, ["created_at"])
+        report.imported += len(batch)
+        report.last_id = batch_last_id
+        report.elapsed = time.perf_counter() - started
+        batch.clear()
+        if progress is not None:
+            progress(report)
+
+    for number, row in enumerate(rows, start=1):
+        source_id = _source_id(row)
+        if after_id is not None and source_id is not None:
+            if source_id <= after_id:
+                report.skipped += 1
+                continue
+        note, errors = _to_note(row, owner)
+        if errors:
+            report.rejected += 1
+            if len(report.errors) < MAX_REPORTED_ERRORS:
+                report.errors.append((number, errors))
+            continue
+        batch.append(note)
+        batch_last_id = source_id
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    report.elapsed = time.perf_counter() - started
+    if report.imported:
+        # bulk_create does not send post_save, so invalidate explicitly
+        # and have the owner's live boards reload rather than stream every
+        # note.
+        bump_notes_version()
+        publish_reset(owner.pk)
+    return report
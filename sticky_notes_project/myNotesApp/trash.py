@@ -0,0 +1,139 @@
+"""
+This file implements the trash: soft deletion, restore and purge.
+
+Deleting a note from the board or the API only sets its `deleted_at`.
+The note leaves the board, search, export and sync right away and can be
+restored from the trash until it expires.
+
+→ Trashing and restoring are single UPDATE statements. update() sends no
+  signals, so the list cache is invalidated and the board events are
+  published here: "deleted" when a note is trashed and "created" when it
+  comes back.
+→ Both also stamp `updated_at`, like every other write. The list ETag
+  is built from the newest `updated_at` and the note count, which
+  trashing one note and restoring another would otherwise leave as they
+  were.
+→ Live queries use `Note.objects.live()`, whose condition matches the
+  partial list indexes, so a growing trash does not slow the board.
+→ `purge_trash` hard-deletes the notes trashed more than
+  `NOTES_TRASH_RETENTION_DAYS` ago, `batch_size` notes per transaction,
+  so writers are never blocked for longer than one short batch. Each
+  deletion leaves a sync tombstone, like any other delete.
+"""
+
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import bump_notes_version
+from .events import publish
+from .models import CARD_FIELDS, Note
+
+DEFAULT_TRASH_RETENTION_DAYS = 30
+DEFAULT_PURGE_BATCH = 500
+
+
+def get_trash_retention():
+    """Returns how many days notes stay in the trash before the purge."""
+    return getattr(
+        settings, "NOTES_TRASH_RETENTION_DAYS", DEFAULT_TRASH_RETENTION_DAYS
+    )
+
+
+def trash_notes(queryset):
+    """
+    Moves the live notes of a queryset to the trash.
+
+    Args:
+        queryset (QuerySet): The notes to trash, e.g. one user's note.
+            Notes already in the trash are left alone.
+
+    Returns:
+        int: The number of notes moved to the trash.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        notes = list(queryset.live().only("id", "owner_id"))
+        trashed = Note.objects.live().filter(
+            pk__in=[note.pk for note in notes]
+        ).update(deleted_at=now, updated_at=now)
+    if not trashed:
+        return 0
+    bump_notes_version()
+    for note in notes:
+        publish("deleted", note)
+    return trashed
+
+
+def restore_notes(queryset):
+    """
+    Moves the trashed notes of a queryset back to the board.
+
+    Args:
+        queryset (QuerySet): The notes to restore. Live notes are left
+            alone.
+
+    Returns:
+        int: The number of notes restored.
+    """
+    with transaction.atomic():
+        ids = list(queryset.trashed().values_list("pk", flat=True))
+        restored = Note.objects.trashed().filter(pk__in=ids).update(
+            deleted_at=None, updated_at=timezone.now()
+        )
+        notes = list(
+            Note.objects.filter(pk__in=ids).only("owner_id", *CARD_FIELDS)
+        )
+    if not restored:
+        return 0
+    bump_notes_version()
+    for note in notes:
+        publish("created", note)
+    return restored
+
+
+atrash_notes = sync_to_async(trash_notes)
+arestore_notes = sync_to_async(restore_notes)
+
+
+def purge_trash(days=None, batch_size=DEFAULT_PURGE_BATCH, pause=0.0):
+    """
+    Permanently deletes the notes that expired in the trash.
+
+    Expired notes are read from the trash expiry index and deleted
+    `batch_size` at a time, each batch in its own short transaction. A
+    note restored while the purge runs is not deleted.
+
+    Args:
+        days (int | None): How long notes stay in the trash; defaults to
+            `NOTES_TRASH_RETENTION_DAYS`.
+        batch_size (int): Notes deleted per transaction.
+        pause (float): Seconds to sleep between batches, leaving the
+            database to other writers.
+
+    Returns:
+        int: The number of notes deleted.
+    """
+    if days is None:
+        days = get_trash_retention()
+    expired = Note.objects.filter(
+        deleted_at__lt=timezone.now() - timedelta(days=days)
+    )
+    purged = 0
+    while True:
+        ids = list(
+            expired.order_by("deleted_at").values_list("pk", flat=True)[
+                :batch_size
+            ]
+        )
+        if not ids:
+            return purged
+        with transaction.atomic():
+            _, deleted = expired.filter(pk__in=ids).delete()
+        purged += deleted.get(Note._meta.label, 0)
+        if pause:
+            time.sleep(pause)
@@ -2,17 +2,58 @@
 This file maps URL patterns to the views.
 
 → URL patterns follow RESTful conventions.
+→ With `NOTES_ASYNC_VIEWS` on (the default under ASGI), the note pages
+  are served by the async views in async_views.py.
 """
 
+from django.conf import settings
 from django.urls import path
-from . import views
-from .views import note_list, note_delete, note_toggle_pin
-
-urlpatterns = [
-    path("", note_list, name="note_list"),
-    path("note/<int:pk>/", views.note_detail, name="note_detail"),
-    path("note/new/", views.note_create, name="note_create"),
-    path("note/<int:pk>/edit/", views.note_update, name="note_update"),
-    path("note/<int:pk>/delete/", note_delete, name="note_delete"),
-    path("note/<int:pk>/toggle_pin/", note_toggle_pin, name="note_toggle_pin"),
-]
+from . import api, async_views, views
+
+
+def build_urlpatterns(pages):
+    """
+    Builds the app's URL patterns.
+
+    Args:
+        pages (module): `views` or `async_views`, the module serving the
+            note pages.
+
+    Returns:
+        list: The URL patterns.
+    """
+    return [
+        path("", pages.note_list, name="note_list"),
+        path("search/", views.note_search, name="note_search"),
+        path("export/", views.note_export, name="note_export"),
+        path("events/", pages.note_events, name="note_events"),
+        path("trash/", pages.note_trash, name="note_trash"),
+        path("bulk/", pages.note_bulk, name="note_bulk"),
+        path("note/<int:pk>/", pages.note_detail, name="note_detail"),
+        path("note/new/", pages.note_create, name="note_create"),
+        path("note/<int:pk>/edit/", pages.note_update, name="note_update"),
+        path(
+            "note/<int:pk>/history/", pages.note_history, name="note_history"
+        ),
+        path("note/<int:pk>/delete/", pages.note_delete, name="note_delete"),
+        path(
+            "note/<int:pk>/toggle_pin/",
+            pages.note_toggle_pin,
+            name="note_toggle_pin",
+        ),
+        path(
+            "note/<int:pk>/restore/", pages.note_restore, name="note_restore"
+        ),
+        # JSON API
+        path("api/notes/", api.api_note_list, name="api_note_list"),
+        path("api/notes/batch/", api.api_note_batch, name="api_note_batch"),
+        path("api/notes/sync/", api.api_note_sync, name="api_note_sync"),
+        path(
+            "api/notes/<int:pk>/", api.api_note_detail, name="api_note_detail"
+        ),
+    ]
+
+
+urlpatterns = build_urlpatterns(
+    async_views if settings.NOTES_ASYNC_VIEWS else views
+)
@@ -9,22 +9,75 @@ invalid user requests.
 → The POST methods are checked, and in case of invalid form data
   the form is re-rendered with error messages.
 → For deletion, a confirmation page is rendered if the request is
-  not POST.
+  not POST. Deleting moves the note to the trash, from where it can be
+  restored until it is purged (see trash.py).
+→ `note_history` shows the earlier versions of a note, a page at a time;
+  the detail page loads it on demand (see revisions.py).
+→ `note_bulk` pins, unpins, tags or trashes all the notes selected on
+  the board in one request (see bulk.py).
+→ Every view requires a signed-in user and only reads and writes that
+  user's notes; another user's note is answered with 404, exactly like a
+  missing one.
 """
 
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.db.models import F
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
-from .models import Note
-from .forms import NoteForm
-
-
+from django.template.defaultfilters import pluralize
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
+from .models import CARD_FIELDS, Note
+from .bulk import (
+    ACTION_PIN,
+    ACTION_TAG,
+    ACTION_TRASH,
+    ACTION_UNPIN,
+    apply_bulk_action,
+)
+from .forms import BulkActionForm, NoteForm
+from .pagination import paginate_notes, get_page_size
+from .cache import (
+    bump_notes_version,
+    get_cache_mode,
+    get_or_build,
+    list_cache_key,
+    render_note_cards,
+)
+from .events import iter_events, parse_cursor, publish, stream_response
+from .conditional import (
+    note_detail_etag,
+    note_detail_last_modified,
+    note_list_etag,
+)
+from .revisions import parse_before, revision_page
+from .search import search_notes
+from .tags import TagFilter, filter_by_tags, tag_facets, tag_filter_context
+from .transfer import FORMATS, iter_export
+from .trash import get_trash_retention, restore_notes, trash_notes
+
+
+# Clients must revalidate on every use; unchanged pages then cost a 304.
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=note_list_etag)
 def note_list(request):
     """
     Handles the display and creation of notes.
     This view function processes both GET and POST requests. For GET requests,
-    it renders a list of notes ordered by their pinned status (descending) and
+    it renders a page of notes ordered by their pinned status (descending) and
     creation date (newest first). For POST requests, it processes the submitted
     form data to create a new note, and then redirects back to the note list.
 
+    Pages are selected with an opaque `cursor` query parameter (keyset
+    pagination), and `page_size` may be used to override the configured
+    number of notes per page. Repeated `tag` parameters show only the
+    notes with all of those tags, or any of them with `match=any`; the
+    sidebar lists the user's tags with their note counts.
+
     Args:
         request (HttpRequest): The HTTP request object containing metadata
         about the request.
@@ -32,23 +85,109 @@ def note_list(request):
     Returns:
         HttpResponse: Renders the 'note_list.html' template with the form and
         the list of notes, or redirects to the note list after a successful
-        form submission.
+        form submission. A conditional GET whose validators still match is
+        answered with 304 Not Modified.
     """
     if request.method == "POST":
         form = NoteForm(request.POST)
         if form.is_valid():
+            form.instance.owner = request.user
             form.save()
             return redirect("note_list")
     else:
         form = NoteForm()
 
     # Order by pinned (desc) first, then by newest creation
-    notes = Note.objects.all().order_by("-pinned", "-created_at")
-    return render(
-        request, "myNotesApp/note_list.html", {"form": form, "notes": notes}
+    tag_filter = TagFilter.from_params(request.GET)
+    page, cards_html = _note_list_page(
+        request.user,
+        request.GET.get("cursor"),
+        get_page_size(request.GET.get("page_size")),
+        tag_filter,
     )
+    context = {
+        "form": form,
+        "notes": page.notes,
+        "page": page,
+        "cards_html": cards_html,
+        "bulk_form": BulkActionForm(
+            initial={"next": request.get_full_path()}
+        ),
+        **tag_filter_context(tag_filter, _tag_facets(request.user)),
+    }
+    return render(request, "myNotesApp/note_list.html", context)
+
+
+def _tag_facets(owner):
+    """
+    Returns the user's tag facets, from the cache when enabled.
 
+    Args:
+        owner (User): The user whose tags are counted.
+
+    Returns:
+        list: The result of `tag_facets`.
+    """
+    if get_cache_mode() is None:
+        return tag_facets(owner)
+    return get_or_build(
+        list_cache_key("facets", owner.pk), lambda: tag_facets(owner)
+    )
 
+
+def _note_list_page(owner, cursor, page_size, tag_filter=TagFilter()):
+    """
+    Returns one page of a user's note list, from the cache when enabled.
+
+    Depending on `NOTES_CACHE_MODE`, either the page of notes or its
+    rendered card markup is cached under the current notes version and
+    the owner. In both modes the cards themselves come from the per-card
+    cache, so after a change only the changed cards are rendered again.
+
+    Args:
+        owner (User): The user whose notes are listed.
+        cursor (str | None): The pagination cursor.
+        page_size (int): The number of notes per page.
+        tag_filter (TagFilter): Only list the notes matching it.
+
+    Returns:
+        tuple: (KeysetPage, str | None) where the string is the card
+        markup, or None when caching is disabled.
+    """
+
+    def build_page():
+        notes = Note.objects.live().filter(owner=owner)
+        return paginate_notes(
+            filter_by_tags(notes, owner, tag_filter)
+            .only(*CARD_FIELDS)
+            .prefetch_related("tags"),
+            cursor,
+            page_size,
+        )
+
+    mode = get_cache_mode()
+    if mode is None:
+        return build_page(), None
+
+    key = list_cache_key(
+        owner.pk, cursor or "", page_size, tag_filter.cache_key
+    )
+    if mode == "queryset":
+        page = get_or_build(key, build_page)
+        return page, render_note_cards(page.notes)
+
+    def build_fragment():
+        page = build_page()
+        return page, render_note_cards(page.notes)
+
+    return get_or_build(key, build_fragment)
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(
+    etag_func=note_detail_etag, last_modified_func=note_detail_last_modified
+)
 def note_detail(request, pk):
     """
     View function to display the details of a specific note.
@@ -58,16 +197,125 @@ def note_detail(request, pk):
         pk (int): The primary key of the note to retrieve.
 
     Returns:
-        HttpResponse: The rendered HTML page displaying the note details.
+        HttpResponse: The rendered HTML page displaying the note details, or
+        304 Not Modified if the client's copy is still current.
 
     Raises:
-        Http404: If the note with the given primary key does not exist.
+        Http404: If the note with the given primary key does not exist or
+        belongs to another user.
     """
-    note = get_object_or_404(Note, pk=pk)
+    note = get_object_or_404(
+        Note.objects.live(), pk=pk, owner=request.user
+    )
     context = {"note": note}
     return render(request, "myNotesApp/note_detail.html", context)
 
 
+@login_required
+def note_history(request, pk):
+    """
+    Displays the revision history of a note, newest version first.
+
+    Each page rebuilds `NOTES_HISTORY_PAGE_SIZE` versions; the `before`
+    query parameter selects older pages. The detail page fetches this
+    view with XMLHttpRequest/fetch when the history is opened and gets
+    only the list fragment back, so the detail page itself never reads
+    the history.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        pk (int): The primary key of the note.
+
+    Returns:
+        HttpResponse: The history page, or its fragment for scripts.
+
+    Raises:
+        Http404: If the note does not exist or belongs to another user.
+    """
+    note = get_object_or_404(
+        Note.objects.live().only("id", "title"), pk=pk, owner=request.user
+    )
+    page = revision_page(note, parse_before(request.GET.get("before")))
+    return history_response(request, note, page)
+
+
+def history_response(request, note, page):
+    """
+    Renders a page of history, as a fragment for XMLHttpRequest/fetch.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        note (Note): The note.
+        page (HistoryPage): The versions to show.
+
+    Returns:
+        HttpResponse: The rendered page or fragment.
+    """
+    template = "myNotesApp/note_history.html"
+    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        template = "myNotesApp/_note_history.html"
+    return render(request, template, {"note": note, "page": page})
+
+
+@login_required
+def note_search(request):
+    """
+    Displays the notes matching the `q` query parameter.
+
+    Results come from the full-text index, ranked by relevance, and each
+    one carries a highlighted snippet of the matching content.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: The rendered search results page.
+    """
+    query = request.GET.get("q", "").strip()
+    notes = []
+    if query:
+        notes = search_notes(
+            query, Note.objects.live().filter(owner=request.user)
+        )
+    context = {"query": query, "notes": notes}
+    return render(request, "myNotesApp/note_search.html", context)
+
+
+@login_required
+def note_export(request):
+    """
+    Streams the user's notes as NDJSON (default) or CSV.
+
+    The response is generated line by line from a chunked iterator, so
+    memory stays constant however many notes are exported. Pass
+    `format=csv` for CSV and `after_id` to resume an interrupted download.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        StreamingHttpResponse: The export as a file download.
+
+    Raises:
+        Http404: If the requested format is not supported.
+    """
+    fmt = request.GET.get("format", "ndjson")
+    if fmt not in FORMATS:
+        raise Http404("Unknown export format.")
+    try:
+        after_id = int(request.GET.get("after_id", 0))
+    except ValueError:
+        after_id = 0
+    content_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    response = StreamingHttpResponse(
+        iter_export(fmt, after_id, owner=request.user),
+        content_type=content_type,
+    )
+    response["Content-Disposition"] = f'attachment; filename="notes.{fmt}"'
+    return response
+
+
+@login_required
 def note_create(request):
     """
     Handle the creation of a new note.
@@ -89,6 +337,7 @@ def note_create(request):
     if request.method == "POST":
         form = NoteForm(request.POST)
         if form.is_valid():
+            form.instance.owner = request.user
             note = form.save()
             return redirect("note_detail", pk=note.pk)
         else:
@@ -98,6 +347,7 @@ def note_create(request):
     return render(request, "myNotesApp/note_form.html", {"form": form})
 
 
+@login_required
 def note_update(request, pk):
     """
     Handle the update of an existing note.
@@ -117,8 +367,13 @@ def note_update(request, pk):
         HttpResponse: A redirect to the note detail page if the form is
         successfully submitted.
         Otherwise, renders the note form template with the form context.
+
+    Raises:
+        Http404: If the note does not exist or belongs to another user.
     """
-    note = get_object_or_404(Note, pk=pk)
+    note = get_object_or_404(
+        Note.objects.live(), pk=pk, owner=request.user
+    )
     if request.method == "POST":
         form = NoteForm(request.POST, instance=note)
         if form.is_valid():
@@ -131,36 +386,62 @@ def note_update(request, pk):
     return render(request, "myNotesApp/note_form.html", {"form": form})
 
 
+@login_required
+@require_POST
 def note_toggle_pin(request, pk):
     """
     Toggle the pinned status of a specific note.
 
-    This view retrieves a note by its primary key (pk) and flips its
-    pinned status (True to False or False to True). After updating
-    the note, it redirects the user to the note list or another
-    specified view.
+    The flip happens in the database with a single conditional
+    `UPDATE ... SET pinned = NOT pinned`, so concurrent toggles never
+    overwrite each other and only the `pinned` and `updated_at` columns are
+    written. The response depends on the caller:
+
+    → `Accept: application/json` returns `{"id": ..., "pinned": ...}`.
+    → An XMLHttpRequest/fetch call returns the re-rendered card fragment,
+      which scripts.js swaps into the page.
+    → A plain form submission redirects back to the note list.
 
     Args:
         request (HttpRequest): The HTTP request object.
         pk (int): The primary key of the note to be toggled.
 
     Returns:
-        HttpResponseRedirect: A redirect to the note list or another
-        specified view after toggling the pinned status.
-    """
-    note = get_object_or_404(Note, pk=pk)
-    # Flip the pinned status
-    note.pinned = not note.pinned
-    note.save()
-    return redirect("note_list")  # or wherever your note list is displayed
-
+        HttpResponse: JSON, the card fragment, or a redirect to the note
+        list.
 
+    Raises:
+        Http404: If the note with the given primary key does not exist or
+        belongs to another user.
+    """
+    with transaction.atomic():
+        updated = Note.objects.live().filter(
+            pk=pk, owner=request.user
+        ).update(
+            pinned=~F("pinned"), updated_at=timezone.now()
+        )
+        if not updated:
+            raise Http404("No Note matches the given query.")
+        note = Note.objects.get(pk=pk)
+    # update() does not send post_save, so invalidate and publish
+    # explicitly.
+    bump_notes_version()
+    publish("pinned", note)
+
+    if "application/json" in request.headers.get("Accept", ""):
+        return JsonResponse({"id": note.pk, "pinned": note.pinned})
+    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        return render(request, "myNotesApp/_note_card.html", {"note": note})
+    return redirect("note_list")
+
+
+@login_required
 def note_delete(request, pk):
     """
     Handles the deletion of a specific note.
-    This view retrieves a note by its primary key (pk) and deletes it if the
-    request method is POST. If the request method is GET, it renders a
-    confirmation page to ensure the user wants to delete the note.
+    This view retrieves a note by its primary key (pk) and moves it to the
+    trash if the request method is POST. If the request method is GET, it
+    renders a confirmation page to ensure the user wants to delete the note.
 
     Args:
         request (HttpRequest): The HTTP request object.
@@ -171,12 +452,160 @@ def note_delete(request, pk):
         deletion if the request method is POST.
         HttpResponse: A rendered confirmation page if the request method is
         GET. This ensures the user confirms the deletion.
+
+    Raises:
+        Http404: If the note does not exist or belongs to another user.
     """
-    note = get_object_or_404(Note, pk=pk)
+    note = get_object_or_404(
+        Note.objects.live(), pk=pk, owner=request.user
+    )
 
     if request.method == "POST":
-        note.delete()
+        trash_notes(Note.objects.filter(pk=note.pk))
         return redirect("note_list")  # or wherever you want to redirect
 
     # If GET request, render a confirmation page
     return render(request, "myNotesApp/note_delete.html", {"note": note})
+
+
+# Past-tense wording of each bulk action for the confirmation message.
+BULK_MESSAGES = {
+    ACTION_PIN: "Pinned {notes}.",
+    ACTION_UNPIN: "Unpinned {notes}.",
+    ACTION_TAG: "Tagged {notes}.",
+    ACTION_TRASH: "Moved {notes} to the trash.",
+}
+
+
+@login_required
+@require_POST
+def note_bulk(request):
+    """
+    Applies one action to the notes selected on the board.
+
+    The note list's multi-select mode posts the checked note ids with an
+    action (pin, unpin, add tags or move to the trash). However many
+    notes are selected, the action is a single UPDATE in one transaction
+    (see bulk.py); selections above `NOTES_BULK_MAX_NOTES` are refused.
+    Ids of notes that belong to another user are ignored.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: `{"action": ..., "changed": n}` (or the form errors
+        with status 400) for `Accept: application/json`, otherwise a
+        redirect back to the list with a confirmation or error message.
+    """
+    form = BulkActionForm(request.POST)
+    changed = None
+    if form.is_valid():
+        changed = apply_bulk_action(
+            Note.objects.filter(
+                owner=request.user, pk__in=form.cleaned_data["ids"]
+            ),
+            form.cleaned_data["action"],
+            form.cleaned_data["tags"],
+        )
+    return bulk_response(request, form, changed)
+
+
+def bulk_response(request, form, changed):
+    """
+    Answers a bulk action request.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        form (BulkActionForm): The validated form.
+        changed (int | None): The number of notes changed, or None if the
+            form was invalid.
+
+    Returns:
+        HttpResponse: JSON, or a redirect back to the list.
+    """
+    wants_json = "application/json" in request.headers.get("Accept", "")
+    if changed is None:
+        if wants_json:
+            return JsonResponse({"errors": form.errors}, status=400)
+        for errors in form.errors.values():
+            for error in errors:
+                messages.error(request, error)
+    else:
+        action = form.cleaned_data["action"]
+        if wants_json:
+            return JsonResponse({"action": action, "changed": changed})
+        notes = f"{changed} note{pluralize(changed)}"
+        messages.success(request, BULK_MESSAGES[action].format(notes=notes))
+    return redirect(form.cleaned_data.get("next") or "note_list")
+
+
+@login_required
+def note_trash(request):
+    """
+    Lists the notes in the user's trash.
+
+    The trash is paginated like the note list (same cursor and
+    `page_size` parameters), reading the partial index over trashed
+    notes.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: The rendered trash page.
+    """
+    page = paginate_notes(
+        Note.objects.trashed()
+        .filter(owner=request.user)
+        .only("deleted_at", *CARD_FIELDS),
+        request.GET.get("cursor"),
+        get_page_size(request.GET.get("page_size")),
+    )
+    context = {"page": page, "retention_days": get_trash_retention()}
+    return render(request, "myNotesApp/note_trash.html", context)
+
+
+@login_required
+@require_POST
+def note_restore(request, pk):
+    """
+    Moves a note from the trash back to the board.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        pk (int): The primary key of the note to restore.
+
+    Returns:
+        HttpResponse: A redirect to the trash.
+
+    Raises:
+        Http404: If the note is not in the user's trash.
+    """
+    if not restore_notes(Note.objects.filter(pk=pk, owner=request.user)):
+        raise Http404("No Note matches the given query.")
+    return redirect("note_trash")
+
+
+@login_required
+def note_events(request):
+    """
+    Streams live updates of the user's board as Server-Sent Events.
+
+    Each event is a small JSON object (`type`, note `id`, `pinned` and the
+    rendered card) that scripts.js applies to the board, so open pages stay
+    current without reloading the list. Browsers reconnect on their own
+    and resume after the `Last-Event-ID` they last received.
+
+    Under WSGI every open stream holds a worker thread until it ends, so
+    streams are closed after `NOTES_EVENTS_STREAM_SECONDS`; under ASGI the
+    async version in async_views.py holds no thread while waiting.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        StreamingHttpResponse: A text/event-stream response.
+    """
+    return stream_response(
+        iter_events(*parse_cursor(request), owner_id=request.user.pk)
+    )
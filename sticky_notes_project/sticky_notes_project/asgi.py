@@ -2,6 +2,7 @@
 ASGI config for sticky_notes_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Run it in production with ``python -m sticky_notes_project.asgi_server``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -14,5 +15,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault(
     "DJANGO_SETTINGS_MODULE", "sticky_notes_project.settings"
 )
+# Serve the async note views (myNotesApp/async_views.py) under ASGI.
+os.environ.setdefault("NOTES_ASYNC_VIEWS", "1")
 
 application = get_asgi_application()
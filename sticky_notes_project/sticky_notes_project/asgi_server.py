@@ -0,0 +1,73 @@
+"""
+Production ASGI server for sticky_notes_project.
+
+Runs ``asgi.application`` under uvicorn, where the async note views hold
+many slow or idle client connections on one event loop per worker
+instead of one thread per connection.
+
+Usage:
+    python -m sticky_notes_project.asgi_server
+
+It uses the production settings unless DJANGO_SETTINGS_MODULE says
+otherwise, and refuses to start with DEBUG on: debug pages leak settings
+and source code, and DEBUG keeps every SQL query in memory.
+
+All options come from the environment:
+→ ASGI_HOST / ASGI_PORT: where to listen (default 0.0.0.0:8000).
+→ ASGI_WORKERS: worker processes (default: one per CPU core).
+→ ASGI_KEEPALIVE: seconds an idle keep-alive connection stays open.
+→ ASGI_LIMIT_CONCURRENCY: connections per worker before new ones get
+  503, so overload is shed instead of queued without bound.
+→ ASGI_BACKLOG: pending connections the socket queues.
+"""
+
+import os
+
+import uvicorn
+
+SETTINGS_MODULE = "sticky_notes_project.settings_production"
+
+
+def server_options():
+    """
+    Reads the uvicorn options from the environment.
+
+    Returns:
+        dict: Keyword arguments for `uvicorn.run`.
+    """
+    return {
+        "host": os.environ.get("ASGI_HOST", "0.0.0.0"),
+        "port": int(os.environ.get("ASGI_PORT", "8000")),
+        "workers": int(os.environ.get("ASGI_WORKERS", os.cpu_count() or 1)),
+        "timeout_keep_alive": int(os.environ.get("ASGI_KEEPALIVE", "5")),
+        "limit_concurrency": int(
+            os.environ.get("ASGI_LIMIT_CONCURRENCY", "1000")
+        ),
+        "backlog": int(os.environ.get("ASGI_BACKLOG", "2048")),
+        "proxy_headers": True,
+        "lifespan": "off",
+        "access_log": False,
+    }
+
+
+def check_settings():
+    """
+    Loads the Django settings and rejects those unfit for production.
+
+    Raises:
+        SystemExit: If DEBUG is on.
+    """
+    from django.conf import settings
+
+    if settings.DEBUG:
+        raise SystemExit(
+            f"Refusing to start: DEBUG is on in {settings.SETTINGS_MODULE}. "
+            "Use sticky_notes_project.settings_production with "
+            "DJANGO_DEBUG=0."
+        )
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", SETTINGS_MODULE)
+    check_settings()
+    uvicorn.run("sticky_notes_project.asgi:application", **server_options())
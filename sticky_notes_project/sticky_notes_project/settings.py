@@ -12,16 +12,26 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 Purpose of this file:
 → The settings file installs our “myNotesApp” and sets
   up global and app-level templates and static files.
+→ DEBUG, ALLOWED_HOSTS and the database path can be set with the
+  DJANGO_DEBUG, DJANGO_ALLOWED_HOSTS and DJANGO_DB_PATH environment
+  variables, so the same code runs locally and in the container.
 
 
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
+def env_list(name, default=""):
+    """Splits a comma-separated environment variable into a list."""
+    value = os.environ.get(name, default)
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
 
@@ -31,9 +41,9 @@ SECRET_KEY = (
 )
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.environ.get("DJANGO_DEBUG", "1") == "1"
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = env_list("DJANGO_ALLOWED_HOSTS")
 
 
 # Application definition
@@ -50,6 +60,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so that its timings cover the whole middleware stack.
+    "myNotesApp.metrics.RequestMetricsMiddleware",
+    "myNotesApp.replica.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -84,10 +97,79 @@ WSGI_APPLICATION = "sticky_notes_project.wsgi.application"
 # Database: uses the default SQLite database for simplicity.
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# → CONN_MAX_AGE keeps connections open between requests (persistent
+#   connections), so the PRAGMAs below are applied once per connection.
+# → "transaction_mode": IMMEDIATE takes the write lock when a transaction
+#   starts, so concurrent writers queue on the busy timeout instead of
+#   failing with "database is locked" when upgrading a read lock.
+# → "timeout" is the sqlite3 busy timeout in seconds, kept in step with
+#   the busy_timeout PRAGMA below.
+
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "20000"))
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "NAME": os.environ.get("DJANGO_DB_PATH", BASE_DIR / "db.sqlite3"),
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", "600")),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+            "transaction_mode": "IMMEDIATE",
+        },
+    }
+}
+
+# Optional read replica (see myNotesApp/replica.py): a copy of the
+# database refreshed with `manage.py refresh_replica --interval 2`. GET
+# requests of the note pages read from it while it lags less than
+# NOTES_REPLICA_MAX_LAG seconds; everything else uses "default".
+if os.environ.get("DJANGO_REPLICA_DB_PATH"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": os.environ["DJANGO_REPLICA_DB_PATH"],
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["myNotesApp.replica.ReplicaRouter"]
+
+NOTES_REPLICA_DATABASE = "replica"
+NOTES_REPLICA_MAX_LAG = float(os.environ.get("NOTES_REPLICA_MAX_LAG", "10"))
+NOTES_REPLICA_VIEWS = ["note_list", "note_detail", "note_search", "note_trash"]
+
+# Online backups (see myNotesApp/backup.py): where `backup_db` writes its
+# compressed snapshots, and how many of them it keeps.
+NOTES_BACKUP_DIR = os.environ.get("NOTES_BACKUP_DIR", BASE_DIR / "backups")
+NOTES_BACKUP_KEEP = int(os.environ.get("NOTES_BACKUP_KEEP", "7"))
+
+# PRAGMAs applied to every new SQLite connection (see myNotesApp/db.py).
+# Each one can be overridden with an environment variable.
+
+SQLITE_PRAGMAS = {
+    "journal_mode": os.environ.get("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+    # Negative values are KiB: -20000 is about 20 MB of page cache.
+    "cache_size": int(os.environ.get("SQLITE_CACHE_SIZE", "-20000")),
+    "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", "134217728")),
+    "temp_store": os.environ.get("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+
+# Cache: in-memory per process by default. With several worker processes,
+# switch to the file-based backend so all workers share the notes version
+# (settings_production.py does):
+#   "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+#   "LOCATION": BASE_DIR / "cache",
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "sticky-notes",
+        # Room for the per-card cache as well as the list pages; the
+        # default of 300 entries would cull cards of a large board.
+        "OPTIONS": {"MAX_ENTRIES": 20000},
     }
 }
 
@@ -122,6 +204,13 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Authentication: every note belongs to a user, and the note pages
+# redirect anonymous visitors to the login page.
+LOGIN_URL = "login"
+LOGIN_REDIRECT_URL = "note_list"
+LOGOUT_REDIRECT_URL = "login"
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
@@ -137,10 +226,11 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.1/howto/static-files/
 
+# myNotesApp/static is found by the app directories finder. Third-party
+# assets (Bootstrap, Bootstrap Icons) are vendored under
+# myNotesApp/static/myNotesApp/vendor. settings_production.py adds
+# fingerprinting, compression and far-future caching.
 STATIC_URL = "/static/"
-STATICFILES_DIRS = [
-    BASE_DIR / "myNotesApp" / "static",
-]
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -149,3 +239,102 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Sticky notes app settings
+# → NOTES_PAGE_SIZE: notes per page on the note list (keyset pagination).
+# → NOTES_MAX_PAGE_SIZE: upper bound for the `page_size` query parameter.
+# → NOTES_SEARCH_LIMIT: maximum number of full-text search results.
+
+NOTES_PAGE_SIZE = 20
+NOTES_MAX_PAGE_SIZE = 100
+NOTES_SEARCH_LIMIT = 50
+
+# Note list cache (see myNotesApp/cache.py)
+# → NOTES_CACHE_MODE: "queryset" caches each page of notes, "fragment"
+#   caches the rendered card markup, None disables the cache.
+# → NOTES_CACHE_ALIAS: which entry of CACHES to use.
+# → NOTES_CACHE_TIMEOUT: lifetime of a cached page, in seconds.
+# → NOTES_CARD_CACHE: also cache each rendered card, keyed on the note's
+#   (pk, updated_at), so a changed note only re-renders its own card.
+# → NOTES_CARD_CACHE_TIMEOUT: lifetime of a cached card, in seconds.
+# → NOTES_CARD_CACHE_ALIAS: which entry of CACHES holds the cards; None
+#   uses NOTES_CACHE_ALIAS.
+
+NOTES_CACHE_MODE = "fragment"
+NOTES_CACHE_ALIAS = "default"
+NOTES_CACHE_TIMEOUT = 300
+NOTES_CARD_CACHE = True
+NOTES_CARD_CACHE_ALIAS = None
+NOTES_CARD_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Notes that existed before notes had owners are assigned to this user
+# by migration 0008 (created without a usable password if missing).
+NOTES_DEFAULT_OWNER = os.environ.get("NOTES_DEFAULT_OWNER", "notes")
+
+# JSON API: maximum number of notes per batch request.
+NOTES_API_MAX_BATCH = 100
+
+# Bulk actions (see myNotesApp/bulk.py): maximum number of notes one
+# multi-select action may change, and per transaction in admin actions.
+NOTES_BULK_MAX_NOTES = 500
+
+# Delta sync (see myNotesApp/sync.py): maximum changes per response, and
+# how long deletions are kept for clients that have not synced recently.
+NOTES_SYNC_LIMIT = 500
+NOTES_TOMBSTONE_RETENTION_DAYS = 30
+
+# Trash (see myNotesApp/trash.py): days a deleted note can be restored
+# before `purge_trash` deletes it for good.
+NOTES_TRASH_RETENTION_DAYS = 30
+
+# Revision history (see myNotesApp/revisions.py): every how many
+# revisions a full keyframe is stored instead of a delta (bounding the
+# deltas applied to rebuild a version), and versions per history page.
+NOTES_REVISION_KEYFRAME_INTERVAL = 20
+NOTES_HISTORY_PAGE_SIZE = 10
+
+# Async views (see myNotesApp/async_views.py): serve the note pages as
+# coroutines using the async ORM. asgi.py turns this on; WSGI deployments
+# keep the sync views, which avoid an async-to-sync hop per request there.
+NOTES_ASYNC_VIEWS = os.environ.get("NOTES_ASYNC_VIEWS", "0") == "1"
+
+# Live board updates (see myNotesApp/events.py)
+# → NOTES_EVENTS_BACKEND: the event log. The database backend is shared by
+#   all worker processes; "myNotesApp.events.MemoryEventBackend" only works
+#   with a single process.
+# → NOTES_EVENTS_RETENTION: seconds of events kept for reconnecting clients.
+# → NOTES_EVENTS_POLL_INTERVAL: seconds between checks for events published
+#   by other processes.
+# → NOTES_EVENTS_HEARTBEAT: seconds of silence before a keep-alive comment.
+# → NOTES_EVENTS_STREAM_SECONDS: lifetime of one stream before the browser
+#   reconnects (and resumes from Last-Event-ID).
+
+NOTES_EVENTS_BACKEND = "myNotesApp.events.DatabaseEventBackend"
+NOTES_EVENTS_RETENTION = 3600
+NOTES_EVENTS_POLL_INTERVAL = 1.0
+NOTES_EVENTS_HEARTBEAT = 15
+NOTES_EVENTS_STREAM_SECONDS = 300
+
+# Request metrics (see myNotesApp/metrics.py):
+# → NOTES_SLOW_REQUEST_MS: requests slower than this many milliseconds are
+#   logged to "myNotesApp.slow_requests".
+# → NOTES_TEMPLATE_TIMING: wrap template rendering at startup to report
+#   template time per request.
+NOTES_SLOW_REQUEST_MS = int(os.environ.get("NOTES_SLOW_REQUEST_MS", "500"))
+NOTES_TEMPLATE_TIMING = os.environ.get("NOTES_TEMPLATE_TIMING", "1") == "1"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "myNotesApp.slow_requests": {
+            "handlers": ["console"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+    },
+}
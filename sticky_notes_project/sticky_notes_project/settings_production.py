@@ -0,0 +1,98 @@
+"""
+Production settings for sticky_notes_project.
+
+Select them with:
+    DJANGO_SETTINGS_MODULE=sticky_notes_project.settings_production
+
+Purpose of this file:
+→ Starts from settings.py and turns off everything meant for development:
+  DEBUG, template debug information and the built-in secret key.
+→ Pins the cached template loader, so every template is read and
+  compiled once per process instead of on each render. Django already
+  uses it when DEBUG is off and no loaders are configured; listing it
+  here keeps that true if loaders are ever customised.
+→ Reads the secret key, allowed hosts and DEBUG from the environment
+  (DEBUG defaults to off here).
+→ Shares the notes cache between worker processes with the file-based
+  backend in `NOTES_CACHE_DIR`. gunicorn and the ASGI server both run
+  several workers; with a per-process cache, a write handled by one of
+  them would leave the others serving stale list pages. Rendered cards
+  stay in a per-process cache: their keys change with the note, so they
+  are never stale.
+→ Serves static files through WhiteNoise. `collectstatic` fingerprints
+  every file (bootstrap.min.css → bootstrap.min.<hash>.css, with the
+  URLs inside CSS rewritten to match) and writes .gz and .br copies next
+  to them. {% static %} returns the fingerprinted URLs, which are served
+  with a one-year `immutable` Cache-Control, so repeat visits load the
+  assets from the browser cache without revalidation requests. A changed
+  file gets a new hash and therefore a new URL.
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, MIDDLEWARE, TEMPLATES, env_list
+
+# Off unless DJANGO_DEBUG=1 is set explicitly, e.g. to debug a container.
+DEBUG = os.environ.get("DJANGO_DEBUG", "0") == "1"
+
+SECRET_KEY = os.environ["DJANGO_SECRET_KEY"]
+
+ALLOWED_HOSTS = env_list("DJANGO_ALLOWED_HOSTS")
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        # Loaders are listed explicitly below, which requires APP_DIRS off.
+        "APP_DIRS": False,
+        "OPTIONS": {
+            **TEMPLATES[0]["OPTIONS"],
+            "debug": False,
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
+        },
+    },
+]
+
+# Right after SecurityMiddleware, so static files skip the rest of the
+# stack.
+_static_at = MIDDLEWARE.index("django.middleware.security.SecurityMiddleware")
+MIDDLEWARE = [
+    *MIDDLEWARE[: _static_at + 1],
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+    *MIDDLEWARE[_static_at + 1:],
+]
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("NOTES_CACHE_DIR", BASE_DIR / "cache"),
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+    "cards": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "sticky-notes-cards",
+        "OPTIONS": {"MAX_ENTRIES": 20000},
+    },
+}
+NOTES_CARD_CACHE_ALIAS = "cards"
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
+
+# Templates only link fingerprinted names, so the unhashed copies are not
+# kept (or compressed); every file served is cacheable forever.
+WHITENOISE_KEEP_ONLY_HASHED_FILES = True
@@ -7,6 +7,8 @@ root URL to the app’s URLs.
 NOTE: Any URL not starting with “admin/” is passed to
 myNotesApp’s URL dispatcher.
 
+Login and logout are Django's auth views under “accounts/”.
+
 The `urlpatterns` list routes URLs to views. For more information please see:
     https://docs.djangoproject.com/en/5.1/topics/http/urls/
 Examples:
@@ -23,8 +25,13 @@ Including another URLconf
 
 from django.contrib import admin
 from django.urls import path, include
+from myNotesApp.health import health_view
+from myNotesApp.metrics import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics/", metrics_view, name="metrics"),
+    path("healthz/", health_view, name="health"),
+    path("accounts/", include("django.contrib.auth.urls")),
     path("", include("myNotesApp.urls")),
 ]